@@ -4,5 +4,13 @@
 from c2qa.circuit import CVCircuit
 from c2qa.qumoderegister import QumodeRegister
 
+import c2qa.cache
+import c2qa.evolution
+import c2qa.fusion
+import c2qa.gaussian
+import c2qa.mps
+import c2qa.sector
 import c2qa.util
+import c2qa.trajectories
+import c2qa.lindblad
 #import c2qa.kraus
@@ -0,0 +1,212 @@
+"""Process-wide memoization of CVOperators matrices."""
+import collections
+import functools
+import numbers
+import threading
+
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "entries", "size_bytes", "max_bytes"]
+)
+
+
+class OperatorCache:
+    """Bounded LRU cache of operator matrices keyed by (operator, parameters, cutoff).
+
+    Parameters are canonicalized before lookup, numeric values are cast to complex and rounded
+    to the given tolerance so that e.g. 0.5, 0.5 + 0j and numpy.float64(0.5) share one entry.
+    Cached matrices are shared between callers and must not be modified in place.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, tolerance: float = 1e-12):
+        """Initialize OperatorCache
+
+        Args:
+            max_bytes (int, optional): Memory budget for cached matrices, zero disables caching. Defaults to 256 MiB.
+            tolerance (float, optional): Grid used to round numeric parameters in cache keys. Defaults to 1e-12.
+        """
+        self.max_bytes = max_bytes
+        self.tolerance = tolerance
+
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def configure(self, max_bytes: int = None, tolerance: float = None):
+        """Change the memory budget and/or key rounding tolerance. Entries are evicted to fit a smaller budget.
+
+        Args:
+            max_bytes (int, optional): Memory budget for cached matrices, zero disables caching. Defaults to None (unchanged).
+            tolerance (float, optional): Grid used to round numeric parameters in cache keys. Defaults to None (unchanged).
+        """
+        with self._lock:
+            if tolerance is not None and tolerance != self.tolerance:
+                self.tolerance = tolerance
+                self.clear()
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+                self._evict(0)
+
+    def info(self):
+        """Return the hit/miss statistics and memory use as a CacheInfo named tuple."""
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._evictions, len(self._entries), self._size_bytes, self.max_bytes
+            )
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def key(self, name: str, owner_key, params):
+        """Build the cache key for an operator, or None if the parameters can't be canonicalized.
+
+        Args:
+            name (str): operator name
+            owner_key (hashable): key identifying the operator builder (e.g., cutoff)
+            params (iterable): operator parameters
+
+        Returns:
+            tuple: cache key
+        """
+        canonical = []
+        for param in params:
+            value = self._canonicalize(param)
+            if value is None and param is not None:
+                return None
+            canonical.append(value)
+
+        return (name, owner_key, tuple(canonical))
+
+    def get(self, key):
+        """Return the cached matrix for key (marking it most recently used), or None on a miss."""
+        with self._lock:
+            try:
+                matrix, _ = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return matrix
+
+    def put(self, key, matrix):
+        """Store the matrix, evicting least recently used entries to stay within the memory budget."""
+        size = _nbytes(matrix)
+
+        with self._lock:
+            if size > self.max_bytes:
+                return
+
+            if key in self._entries:
+                self._size_bytes -= self._entries.pop(key)[1]
+
+            self._evict(size)
+            self._entries[key] = (matrix, size)
+            self._size_bytes += size
+
+    def memoize(self, func):
+        """Decorate a CVOperators method so its results are memoized in this cache."""
+
+        @functools.wraps(func)
+        def wrapper(ops, *params, **kwargs):
+            if self.max_bytes <= 0 or kwargs:
+                return func(ops, *params, **kwargs)
+
+            key = self.key(func.__qualname__, getattr(ops, "cache_key", id(ops)), params)
+            if key is None:
+                return func(ops, *params)
+
+            matrix = self.get(key)
+            if matrix is None:
+                matrix = func(ops, *params)
+                self.put(key, matrix)
+
+            return matrix
+
+        return wrapper
+
+    def _evict(self, size: int):
+        """Evict least recently used entries until size more bytes fit in the budget."""
+        while self._entries and self._size_bytes + size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._size_bytes -= evicted_size
+            self._evictions += 1
+
+    def _canonicalize(self, param):
+        """Hashable, tolerance rounded representation of a single parameter"""
+        if isinstance(param, str):
+            return param
+        elif isinstance(param, numbers.Number):
+            value = complex(param)
+            return (round(value.real / self.tolerance), round(value.imag / self.tolerance))
+
+        try:
+            hash(param)
+        except TypeError:
+            return None
+
+        return param
+
+
+def _nbytes(matrix) -> int:
+    """Memory used by a dense ndarray or SciPy sparse matrix"""
+    if hasattr(matrix, "nbytes"):
+        return matrix.nbytes
+
+    size = 0
+    for attribute in ("data", "indices", "indptr", "row", "col", "offsets"):
+        array = getattr(matrix, attribute, None)
+        if hasattr(array, "nbytes"):
+            size += array.nbytes
+
+    return size
+
+
+class lazy:
+    """Read-only attribute calculated on first access and then stored on the instance (functools.cached_property is Python 3.8+)."""
+
+    def __init__(self, func):
+        self.func = func
+        functools.update_wrapper(self, func)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = self.func(instance)
+        instance.__dict__[self.func.__name__] = value
+        return value
+
+
+# Process-wide cache shared by all CVOperators instances
+operator_cache = OperatorCache()
+
+
+def configure(max_bytes: int = None, tolerance: float = None):
+    """Configure the process-wide operator cache, see OperatorCache.configure()"""
+    operator_cache.configure(max_bytes=max_bytes, tolerance=tolerance)
+
+
+def cache_info():
+    """Hit/miss statistics of the process-wide operator cache, see OperatorCache.info()"""
+    return operator_cache.info()
+
+
+def cache_clear():
+    """Clear the process-wide operator cache"""
+    operator_cache.clear()
+
+
+def memoize(func):
+    """Decorate a CVOperators method so its results are memoized in the process-wide operator cache"""
+    return operator_cache.memoize(func)
@@ -34,9 +34,9 @@ class CVCircuit(QuantumCircuit):
 
         for reg in regs:
             if isinstance(reg, QumodeRegister):
-                if len(self.qmregs) > 0:
+                if any(qmreg.cutoff != reg.cutoff for qmreg in self.qmregs):
                     warnings.warn(
-                        "More than one QumodeRegister provided. Using the last one for cutoff.",
+                        "QumodeRegisters with different cutoffs provided. Gates use the cutoff of the qumodes they act on, CVCircuit.cutoff and CVCircuit.ops the last one.",
                         UserWarning,
                     )
                 num_qumodes += reg.num_qumodes
@@ -61,7 +61,7 @@ class CVCircuit(QuantumCircuit):
 
         super().__init__(*registers, name=name)
 
-        self.ops = CVOperators(self.cutoff, num_qumodes)
+        self.ops = CVOperators.shared(self.cutoff)
 
     def merge(self, circuit: QuantumCircuit):
         """
@@ -104,9 +104,43 @@ class CVCircuit(QuantumCircuit):
 
     @property
     def cutoff(self):
-        """Integer cutoff size."""
+        """Integer cutoff size of the last QumodeRegister."""
         return self.qmregs[-1].cutoff
 
+    def get_qumode_cutoff(self, qumode):
+        """Cutoff of the QumodeRegister containing the qumode.
+
+        Args:
+            qumode (list): list of qubits representing qumode
+
+        Raises:
+            ValueError: If the qubits don't represent a qumode of this circuit.
+
+        Returns:
+            int: cutoff
+        """
+        for qmreg in self.qmregs:
+            if qumode[0] in qmreg.qreg:
+                return qmreg.cutoff
+
+        raise ValueError("The given qubits are not a qumode of this circuit.")
+
+    def get_ops(self, qumode_a, qumode_b=None):
+        """Shared CVOperators building matrices for the cutoffs of the given qumodes.
+
+        Args:
+            qumode_a (list): list of qubits representing the (first) qumode
+            qumode_b (list, optional): list of qubits representing the second qumode of two-qumode gates. Defaults to None.
+
+        Returns:
+            CVOperators: operators
+        """
+        if qumode_b is None:
+            return CVOperators.shared(self.get_qumode_cutoff(qumode_a))
+
+        # Qiskit orders qubits least significant first, so qumode_b is the first factor of the operators' kron(a1, a2)
+        return CVOperators.shared(self.get_qumode_cutoff(qumode_b), second_cutoff=self.get_qumode_cutoff(qumode_a))
+
     @property
     def num_qubits_per_qumode(self):
         """Integer number of qubits to represent a qumode."""
@@ -147,11 +181,12 @@ class CVCircuit(QuantumCircuit):
         if not isinstance(qumodes[0], list):
             modes = [qumodes]
 
-        if fock_state > self.qmregs[-1].cutoff:
+        if any(fock_state >= self.get_qumode_cutoff(qumode) for qumode in modes):
             raise ValueError("The given Fock state is greater than the cutoff.")
 
         for qumode in modes:
-            value = np.zeros((self.qmregs[-1].cutoff,), dtype=np.complex_)
+            # Qubit encoding of the Fock state, padded beyond the cutoff if the cutoff isn't a power of 2
+            value = np.zeros((2 ** len(qumode),), dtype=np.complex_)
             value[fock_state] = 1 +0j
 
             super().initialize(value, qumode)
@@ -164,23 +199,26 @@ class CVCircuit(QuantumCircuit):
             name (str): name of conditional gate
             op_0 (ndarray): operator matrix for 0 controlled gate
             op_1 (ndarray): operator matrix for 1 controlled gate
-            num_qubits_per_qumode (int): number of qubits representing a single qumode
+            num_qubits_per_qumode (int or list): number of qubits representing a single qumode, or a list of the number of qubits of each qumode
             num_qumodes (int, optional): number of qubodes used in this gate. Defaults to 1.
 
         Returns:
             Instruction: QisKit Instruction appended to the circuit
         """
+        if isinstance(num_qubits_per_qumode, int):
+            num_qumode_qubits = num_qubits_per_qumode * num_qumodes
+        else:
+            num_qumode_qubits = sum(num_qubits_per_qumode)
+
         sub_qr = QuantumRegister(1)
-        sub_qmr = QumodeRegister(num_qumodes, num_qubits_per_qumode)
-        sub_circ = QuantumCircuit(sub_qr, sub_qmr.qreg, name=name)
+        sub_qumodes = QuantumRegister(num_qumode_qubits)
+        sub_circ = QuantumCircuit(sub_qr, sub_qumodes, name=name)
 
         # TODO Use size of op_0 and op_1 to calculate the number of qumodes instead of using parameter
-        qargs = [sub_qr[0]]
-        for i in range(num_qumodes):
-            qargs += sub_qmr[i]
+        qargs = [sub_qr[0]] + sub_qumodes[:]
 
-        gate_0 = ParameterizedUnitaryGate(op, params_0, num_qubits=num_qubits_per_qumode * num_qumodes, duration=duration, unit=unit)
-        gate_1 = ParameterizedUnitaryGate(op, params_1, num_qubits=num_qubits_per_qumode * num_qumodes, duration=duration, unit=unit)
+        gate_0 = ParameterizedUnitaryGate(op, params_0, num_qubits=num_qumode_qubits, duration=duration, unit=unit)
+        gate_1 = ParameterizedUnitaryGate(op, params_1, num_qubits=num_qumode_qubits, duration=duration, unit=unit)
 
         sub_circ.append(gate_0.control(num_ctrl_qubits=1, ctrl_state=0), qargs)
         sub_circ.append(gate_1.control(num_ctrl_qubits=1, ctrl_state=1), qargs)
@@ -209,7 +247,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.d, [alpha], num_qubits=len(qumode), label="D"), qargs=qumode)
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode).d, [alpha], num_qubits=len(qumode), label="D"), qargs=qumode)
 
     def cv_cd(self, alpha, beta, qumode, qubit_ancilla):
         """Conditional displacement gate.
@@ -224,7 +262,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.cd, [alpha, beta], num_qubits=len(qumode) + 1, label="CD"), qargs=qumode + [qubit_ancilla])
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode).cd, [alpha, beta], num_qubits=len(qumode) + 1, label="CD"), qargs=qumode + [qubit_ancilla])
 
     def cv_cnd_d(self, alpha, beta, ctrl, qumode):
         """Conditional displacement gate.
@@ -240,7 +278,7 @@ class CVCircuit(QuantumCircuit):
             Instruction: QisKit instruction
         """
         return self.append(
-            CVCircuit.cv_conditional("Dc", self.ops.d, [alpha], [beta], self.num_qubits_per_qumode),
+            CVCircuit.cv_conditional("Dc", self.get_ops(qumode).d, [alpha], [beta], len(qumode)),
             [ctrl] + qumode,
         )
 
@@ -254,7 +292,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.ecd, [alpha], num_qubits=len(qumode) + 1, label="ECD"), qargs=qumode + [qubit_ancilla])
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode).ecd, [alpha], num_qubits=len(qumode) + 1, label="ECD"), qargs=qumode + [qubit_ancilla])
 
     def cv_s(self, z, qumode):
         """Squeezing gate.
@@ -266,7 +304,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.s, [z], num_qubits=len(qumode), label="S"), qargs=qumode)
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode).s, [z], num_qubits=len(qumode), label="S"), qargs=qumode)
 
     def cv_cnd_s(self, z_a, z_b, ctrl, qumode_a):
         """Conditional squeezing gate
@@ -281,7 +319,7 @@ class CVCircuit(QuantumCircuit):
             Instruction: QisKit instruction
         """
         return self.append(
-            CVCircuit.cv_conditional("Sc", self.ops.s, [z_a], [z_b], self.num_qubits_per_qumode),
+            CVCircuit.cv_conditional("Sc", self.get_ops(qumode_a).s, [z_a], [z_b], len(qumode_a)),
             [ctrl] + qumode_a,
         )
 
@@ -296,7 +334,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.s2, [z], num_qubits=len(qumode_a) + len(qumode_b), label="S2"), qargs=qumode_a + qumode_b)
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).s2, [z], num_qubits=len(qumode_a) + len(qumode_b), label="S2"), qargs=qumode_a + qumode_b)
 
     def cv_bs(self, phi, qumode_a, qumode_b):
         """Beam splitter gate.
@@ -309,7 +347,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.bs, [phi], num_qubits=len(qumode_a) + len(qumode_b), label="BS"), qargs=qumode_a + qumode_b)
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).bs, [phi], num_qubits=len(qumode_a) + len(qumode_b), label="BS"), qargs=qumode_a + qumode_b)
 
     def cv_cnd_bs(self, phi, chi, ctrl, qumode_a, qumode_b):
         """Conditional beam splitter gate.
@@ -326,7 +364,7 @@ class CVCircuit(QuantumCircuit):
         """
         return self.append(
             CVCircuit.cv_conditional(
-                "BSc", self.ops.bs, [phi], [chi], self.num_qubits_per_qumode, num_qumodes=2
+                "BSc", self.get_ops(qumode_a, qumode_b).bs, [phi], [chi], [len(qumode_a), len(qumode_b)], num_qumodes=2
             ),
             [ctrl] + qumode_a + qumode_b,
         )
@@ -343,7 +381,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.cpbs, [phi], num_qubits=len(qumode_a) + len(qumode_b) + 1, label="CPBS"), qargs=qumode_a + qumode_b + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).cpbs, [phi], num_qubits=len(qumode_a) + len(qumode_b) + 1, label="CPBS"), qargs=qumode_a + qumode_b + [qubit_ancilla])
 
     def cv_r(self, phi, qumode):
         """Phase space rotation gate.
@@ -355,7 +393,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.r, [phi], num_qubits=len(qumode), label="R"), qargs=qumode)
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode).r, [phi], num_qubits=len(qumode), label="R"), qargs=qumode)
 
     def cv_qdcr(self, theta, qumode_a, qubit_ancilla):
         """Qubit dependent cavity rotation gate.
@@ -368,7 +406,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.qubitDependentCavityRotation, [theta], num_qubits=len(qumode_a) + 1, label="QDCR"), qargs=qumode_a + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a).qubitDependentCavityRotation, [theta], num_qubits=len(qumode_a) + 1, label="QDCR"), qargs=qumode_a + [qubit_ancilla])
 
     def cv_qdcrX(self, theta, qumode_a, qubit_ancilla):
         """Qubit dependent cavity rotation gate.
@@ -381,7 +419,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.qubitDependentCavityRotationX, [theta], num_qubits=len(qumode_a) + 1, label="QDCR_X"), qargs=qumode_a + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a).qubitDependentCavityRotationX, [theta], num_qubits=len(qumode_a) + 1, label="QDCR_X"), qargs=qumode_a + [qubit_ancilla])
 
     def cv_qdcrY(self, theta, qumode_a, qubit_ancilla):
         """Qubit dependent cavity rotation gate.
@@ -394,7 +432,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.qubitDependentCavityRotationY, [theta], num_qubits=len(qumode_a) + 1, label="QDCR_Y"), qargs=qumode_a + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a).qubitDependentCavityRotationY, [theta], num_qubits=len(qumode_a) + 1, label="QDCR_Y"), qargs=qumode_a + [qubit_ancilla])
 
 
     def cv_cp(self, theta, qumode_a, qubit_ancilla):
@@ -407,7 +445,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.controlledparity, [theta], num_qubits=len(qumode_a) + 1, label="CP"), qargs=qumode_a + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a).controlledparity, [theta], num_qubits=len(qumode_a) + 1, label="CP"), qargs=qumode_a + [qubit_ancilla])
 
     def cv_snap(self, theta, n, qumode):
         """SNAP (Selective Number-dependent Arbitrary Phase) gate.
@@ -420,7 +458,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.snap, [theta, n], num_qubits=len(qumode), label="SNAP"), qargs=qumode)
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode).snap, [theta, n], num_qubits=len(qumode), label="SNAP"), qargs=qumode)
 
     def cv_eswap(self, theta, qumode_a, qumode_b):
         """Exponential SWAP gate.
@@ -433,7 +471,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.eswap, [theta], num_qubits=len(qumode_a) + len(qumode_b), label="eSWAP"), qargs=qumode_a + qumode_b)
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).eswap, [theta], num_qubits=len(qumode_a) + len(qumode_b), label="eSWAP"), qargs=qumode_a + qumode_b)
 
     def cv_pncqr(self, theta, n, qumode_a, qubit_ancilla, qubit_rotation):
         """Photon Number Controlled Qubit Rotation gate.
@@ -446,7 +484,7 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.photonNumberControlledQubitRotation, [theta, n, qubit_rotation], num_qubits=len(qumode_a) + 1, label="PNCQR"), qargs=qumode_a + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a).photonNumberControlledQubitRotation, [theta, n, qubit_rotation], num_qubits=len(qumode_a) + 1, label="PNCQR"), qargs=qumode_a + [qubit_ancilla])
 
 
     def cv_testqubitorderf(self, phi, qubit_1, qubit_2):
@@ -455,22 +493,22 @@ class CVCircuit(QuantumCircuit):
     def cv_schwinger_U4(self, phi, qumode_a, qumode_b, qubit_1, qubit_2):
         """Schwinger model gate.
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.schwinger_U4, [phi], label="Schwinger_U4", num_qubits=len(qumode_a) + len(qumode_b) + 2), qargs=qumode_a + qumode_b + [qubit_1] + [qubit_2])
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).schwinger_U4, [phi], label="Schwinger_U4", num_qubits=len(qumode_a) + len(qumode_b) + 2), qargs=qumode_a + qumode_b + [qubit_1] + [qubit_2])
 
     def cv_schwinger_U5(self, phi, qumode_a, qumode_b, qubit_1, qubit_2):
         """Schwinger model gate.
         """
-        return self.append(ParameterizedUnitaryGate(self.ops.schwinger_U5, [phi], label="Schwinger_U5", num_qubits=len(qumode_a) + len(qumode_b) + 2), qargs=qumode_a + qumode_b + [qubit_1] + [qubit_2])
+        return self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).schwinger_U5, [phi], label="Schwinger_U5", num_qubits=len(qumode_a) + len(qumode_b) + 2), qargs=qumode_a + qumode_b + [qubit_1] + [qubit_2])
 
     def cv_rh1(self, alpha, qumode_a, qumode_b, qubit_ancilla):
         """Z2 model gate.
         """
-        self.append(ParameterizedUnitaryGate(self.ops.rh1, [alpha], num_qubits=len(qumode_a) + len(qumode_b) + 1, label="Z2_rh1"), qargs=qumode_a + qumode_b + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).rh1, [alpha], num_qubits=len(qumode_a) + len(qumode_b) + 1, label="Z2_rh1"), qargs=qumode_a + qumode_b + [qubit_ancilla])
 
     def cv_rh2(self, alpha, qumode_a, qumode_b, qubit_ancilla):
         """Z2 model gate.
         """
-        self.append(ParameterizedUnitaryGate(self.ops.rh2, [alpha], num_qubits=len(qumode_a) + len(qumode_b) + 1, label="Z2_rh2"), qargs=qumode_a + qumode_b + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).rh2, [alpha], num_qubits=len(qumode_a) + len(qumode_b) + 1, label="Z2_rh2"), qargs=qumode_a + qumode_b + [qubit_ancilla])
 
     def cv_cpbs_z2vqe(self, phi, qumode_a, qumode_b, qubit_ancilla):
         """Controlled phase two-mode beam splitter
@@ -484,7 +522,20 @@ class CVCircuit(QuantumCircuit):
         Returns:
             Instruction: QisKit instruction
         """
-        self.append(ParameterizedUnitaryGate(self.ops.cpbs_z2vqe, [phi], num_qubits=len(qumode_a) + len(qumode_b) + 1, label="Z2_CPBS"), qargs=qumode_a + qumode_b + [qubit_ancilla])
+        self.append(ParameterizedUnitaryGate(self.get_ops(qumode_a, qumode_b).cpbs_z2vqe, [phi], num_qubits=len(qumode_a) + len(qumode_b) + 1, label="Z2_CPBS"), qargs=qumode_a + qumode_b + [qubit_ancilla])
+
+    def cv_evolve(self, hamiltonian, time):
+        """Time evolution exp(-i * time * H) under a Hamiltonian of this circuit's qumodes and qubits
+
+        Args:
+            hamiltonian (Hamiltonian): c2qa.evolution.Hamiltonian of this circuit
+            time (real): evolution time
+
+        Returns:
+            Instruction: QisKit instruction
+        """
+        qargs = hamiltonian.qargs
+        return self.append(ParameterizedUnitaryGate(hamiltonian.evolution, [time], num_qubits=len(qargs), label="evolve"), qargs=qargs)
 
     def measure_z(self, qubit, cbit):
         """Measure qubit in z using probe qubits
@@ -0,0 +1,270 @@
+"""Hamiltonian time evolution of a CVCircuit's state, stepping the state directly instead of simulating a growing
+Trotter circuit after every step.
+
+A Hamiltonian is a sum of local terms, each a (sparse) matrix on some of the circuit's qumodes and qubits, built
+from CVOperators matrices (e.g., circuit.get_ops(qumode_a, qumode_b).a1_dag * ops.a2) or qubit Pauli labels.
+"""
+import numpy
+from qiskit.quantum_info import Pauli
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+
+import c2qa.native
+
+
+class Hamiltonian:
+    """Sum of local terms acting on a CVCircuit's qumodes and qubits"""
+
+    def __init__(self, circuit):
+        """Initialize an empty Hamiltonian
+
+        Args:
+            circuit (CVCircuit): circuit whose qumodes and qubits the terms act on
+        """
+        self.circuit = circuit
+        self.terms = []
+
+        self._simulator = c2qa.native.NativeSimulator(circuit)
+
+    def add(self, operator, qargs, coefficient: complex = 1):
+        """Add a term
+
+        Args:
+            operator (ndarray, sparse matrix or str): matrix on the qargs, indexed like a gate matrix with the first
+                                                      qumode or qubit least significant, or a Pauli label on qubits
+                                                      (e.g., "ZZ", the rightmost letter acting on the first qubit)
+            qargs (list): circuit qubits the term acts on, e.g. qumode_a + qumode_b + [qubit]
+            coefficient (complex, optional): coefficient of the term. Defaults to 1.
+
+        Raises:
+            ValueError: If the qargs don't cover whole qumodes or the operator dimension doesn't match the qargs.
+
+        Returns:
+            Hamiltonian: self, to chain calls
+        """
+        axes = self._simulator._axes(list(qargs))
+        if axes is None:
+            raise ValueError("Hamiltonian terms must act on whole qumodes.")
+
+        if isinstance(operator, str):
+            operator = Pauli(operator).to_matrix(sparse=True)
+        operator = scipy.sparse.csr_matrix(operator, dtype=complex)
+
+        dimension = int(numpy.prod([self._simulator.shape[axis] for axis in axes]))
+        if operator.shape != (dimension, dimension):
+            raise ValueError(f"Operator of shape {operator.shape} doesn't match the qargs dimension {dimension}.")
+
+        self.terms.append((coefficient, operator, axes))
+        return self
+
+    @property
+    def qargs(self):
+        """Circuit qubits of the qumodes and qubits the Hamiltonian acts on, in the order they were first added"""
+        return [qubit for axis in self._local_axes() for qubit in self._simulator.groups[axis]]
+
+    def matrix(self):
+        """Sparse matrix acting on the state tensor of the native simulator, flattened (see NativeSimulator.shape)"""
+        shape = self._simulator.shape
+        dims = list(shape[::-1])
+        return self._sum(dims, [[len(shape) - 1 - axis for axis in axes] for _, _, axes in self.terms])
+
+    def local_matrix(self):
+        """Sparse matrix on qargs, indexed like a gate matrix with the first qumode or qubit least significant"""
+        local = self._local_axes()
+        dims = [self._simulator.shape[axis] for axis in local]
+        return self._sum(dims, [[local.index(axis) for axis in axes] for _, _, axes in self.terms])
+
+    def evolution(self, time):
+        """Operator exp(-i * time * H) on qargs, see local_matrix()
+
+        Args:
+            time (real): evolution time
+
+        Returns:
+            csc_matrix: operator matrix
+        """
+        return scipy.sparse.csc_matrix(scipy.sparse.linalg.expm(self.evolution_generator(time)))
+
+    def evolution_generator(self, time):
+        """Generator -i * time * H of evolution(time), see ParameterizedUnitaryGate.generator()"""
+        return scipy.sparse.csc_matrix(-1j * time * self.local_matrix())
+
+    def apply(self, state):
+        """Multiply the Hamiltonian into the state tensor of the native simulator
+
+        Args:
+            state (ndarray): state tensor
+
+        Returns:
+            ndarray: H |state>
+        """
+        result = numpy.zeros_like(state)
+        for coefficient, operator, axes in self.terms:
+            result += coefficient * c2qa.native._apply(state, operator, axes)
+        return result
+
+    def expectation(self, state) -> float:
+        """Expectation value of the Hamiltonian in the state tensor of the native simulator
+
+        Args:
+            state (ndarray): state tensor
+
+        Returns:
+            float: real part of <state|H|state>
+        """
+        return numpy.real(numpy.vdot(state, self.apply(state)))
+
+    def _local_axes(self):
+        axes = []
+        for _, _, term_axes in self.terms:
+            axes.extend(axis for axis in term_axes if axis not in axes)
+        return axes
+
+    def _sum(self, dims, positions):
+        matrix = scipy.sparse.csr_matrix((int(numpy.prod(dims)),) * 2, dtype=complex)
+        for (coefficient, operator, _), term_positions in zip(self.terms, positions):
+            matrix = matrix + coefficient * _embed(operator, term_positions, dims)
+        return matrix
+
+
+class TimeEvolution:
+    """Step the native simulator's state tensor under a Hamiltonian.
+
+    The "exact" method propagates with scipy.sparse.linalg.expm_multiply on the Hamiltonian's sparse matrix. The
+    "trotter" method applies the exponential of each term in turn (first order), or symmetrically (second order),
+    caching the small dense term exponentials for the step size. Each step costs the same, so N steps cost O(N).
+    """
+
+    def __init__(self, hamiltonian: Hamiltonian, state, method: str = "exact", order: int = 2):
+        """Initialize TimeEvolution
+
+        Args:
+            hamiltonian (Hamiltonian): Hamiltonian
+            state (ndarray): initial state tensor of the native simulator
+            method (str, optional): "exact" or "trotter". Defaults to "exact".
+            order (int, optional): Trotter splitting order, 1 or 2. Defaults to 2.
+
+        Raises:
+            ValueError: If the method or order isn't supported.
+        """
+        if method not in ("exact", "trotter"):
+            raise ValueError(f"Unsupported time evolution method {method}, use 'exact' or 'trotter'.")
+        if order not in (1, 2):
+            raise ValueError("Trotter splitting order must be 1 or 2.")
+
+        self.hamiltonian = hamiltonian
+        self.state = state
+        self.method = method
+        self.order = order
+        self.time = 0.0
+
+        self._matrix = None
+        self._exponentials = {}
+
+    def step(self, dt: float):
+        """Evolve the state by dt
+
+        Args:
+            dt (float): time step
+        """
+        if self.method == "exact":
+            if self._matrix is None:
+                self._matrix = scipy.sparse.csc_matrix(-1j * self.hamiltonian.matrix())
+            shape = self.state.shape
+            self.state = scipy.sparse.linalg.expm_multiply(dt * self._matrix, self.state.reshape(-1)).reshape(shape)
+        elif self.order == 1:
+            for index in range(len(self.hamiltonian.terms)):
+                self._apply_term(index, dt)
+        else:
+            last = len(self.hamiltonian.terms) - 1
+            for index in range(last):
+                self._apply_term(index, dt / 2)
+            self._apply_term(last, dt)
+            for index in reversed(range(last)):
+                self._apply_term(index, dt / 2)
+
+        self.time += dt
+
+    def _apply_term(self, index: int, dt: float):
+        key = (index, dt)
+        coefficient, operator, axes = self.hamiltonian.terms[index]
+        if key not in self._exponentials:
+            self._exponentials[key] = scipy.linalg.expm(-1j * dt * coefficient * operator.toarray())
+        self.state = c2qa.native._apply(self.state, self._exponentials[key], axes)
+
+
+def evolve(
+    circuit,
+    hamiltonian: Hamiltonian,
+    dt: float,
+    steps: int,
+    observables: dict = None,
+    method: str = "exact",
+    order: int = 2,
+    qubit_encoded: bool = True,
+):
+    """Evolve the circuit's final state under the Hamiltonian, recording observables at each time
+
+    Args:
+        circuit (CVCircuit): circuit preparing the initial state
+        hamiltonian (Hamiltonian): Hamiltonian
+        dt (float): time step
+        steps (int): number of time steps
+        observables (dict, optional): Hamiltonian instances keyed by name, whose expectation values are recorded at
+                                      time 0 and after every step. Defaults to None.
+        method (str, optional): "exact" or "trotter", see TimeEvolution. Defaults to "exact".
+        order (int, optional): Trotter splitting order, 1 or 2. Defaults to 2.
+        qubit_encoded (bool, optional): Set to False to return the final state vector with the exact qumode cutoff
+                                        dimensions, instead of the qubit encoding. Defaults to True.
+
+    Returns:
+        tuple: (times, expectation values keyed by observable name, final Statevector)
+    """
+    if observables is None:
+        observables = {}
+
+    simulator = c2qa.native.NativeSimulator(circuit)
+    state, _ = simulator._run_instructions(simulator._initial_state(), simulator.data, {})
+
+    evolution = TimeEvolution(hamiltonian, state, method, order)
+
+    times = numpy.arange(steps + 1) * dt
+    expectations = {name: numpy.zeros(steps + 1) for name in observables}
+    for step in range(steps + 1):
+        if step > 0:
+            evolution.step(dt)
+        for name, observable in observables.items():
+            expectations[name][step] = observable.expectation(evolution.state)
+
+    return times, expectations, simulator.statevector(evolution.state, qubit_encoded)
+
+
+def _embed(operator, positions, dims):
+    """Sparse matrix of the operator on the positions of a tensor with dims (both least significant first)"""
+    strides = numpy.concatenate([[1], numpy.cumprod(dims[:-1])]).astype(numpy.int64)
+    local_dims = [dims[position] for position in positions]
+
+    coo = scipy.sparse.coo_matrix(operator)
+    rows = numpy.zeros(coo.nnz, dtype=numpy.int64)
+    columns = numpy.zeros(coo.nnz, dtype=numpy.int64)
+    scale = 1
+    for position, dim in zip(positions, local_dims):
+        rows += (coo.row // scale % dim) * strides[position]
+        columns += (coo.col // scale % dim) * strides[position]
+        scale *= dim
+
+    # Offsets of every state of the other positions
+    offsets = numpy.zeros(1, dtype=numpy.int64)
+    for position, dim in enumerate(dims):
+        if position not in positions:
+            offsets = (offsets[:, numpy.newaxis] + numpy.arange(dim) * strides[position]).reshape(-1)
+
+    size = int(numpy.prod(dims))
+    return scipy.sparse.csr_matrix(
+        (
+            numpy.tile(coo.data, len(offsets)),
+            ((offsets[:, numpy.newaxis] + rows).reshape(-1), (offsets[:, numpy.newaxis] + columns).reshape(-1)),
+        ),
+        shape=(size, size),
+    )
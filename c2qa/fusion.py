@@ -0,0 +1,157 @@
+"""Transpiler pass fusing adjacent CV gates into single unitary gates, so simulators apply one matrix per block.
+
+Fused blocks are precomputed with qiskit.quantum_info.Operator and emitted as UnitaryGate instructions that both Aer
+and c2qa.native.NativeSimulator apply directly (see the fusion_pass argument of c2qa.util.simulate).
+"""
+import numpy
+from qiskit.circuit import ControlledGate, Gate
+from qiskit.extensions.unitary import UnitaryGate
+from qiskit.quantum_info import Operator
+from qiskit.transpiler.basepasses import TransformationPass
+
+from c2qa.operators import ParameterizedUnitaryGate
+
+
+class CVGateFusionPass(TransformationPass):
+    """Merge runs of adjacent CV gates on overlapping qubits into single precomputed unitary gates.
+
+    Gates are collected into blocks in topological order. A gate joins (and merges) the blocks sharing any of its
+    qubits as long as the merged block acts on at most max_fused_qubits qubits, otherwise those blocks are emitted
+    and the gate starts a new block. Any other instruction emits the blocks it overlaps before it is emitted itself.
+
+    Blocks containing more than one instruction and at least one CV gate (ParameterizedUnitaryGate or
+    CVCircuit.cv_conditional instruction) are emitted as one UnitaryGate, with the summed duration of the fused
+    gates. Qubit gates without parameters (e.g., H on an ancilla between conditional displacements) are fused
+    with them. Gates with unbound parameters or classical conditions are never fused.
+
+    Run the pass after any noise pass, so that noise is still applied per gate.
+    """
+
+    def __init__(self, max_fused_qubits: int = 6):
+        """Initialize CVGateFusionPass
+
+        Args:
+            max_fused_qubits (int, optional): Maximum number of qubits a fused gate may act on. Defaults to 6.
+        """
+        super().__init__()
+
+        self.max_fused_qubits = max_fused_qubits
+
+    def run(self, dag):
+        """Run the pass on the DAG, returning a new DAG with the fused gates"""
+        result = dag._copy_circuit_metadata()
+
+        blocks = []  # Open blocks, each acting on a set of qubits disjoint from the others
+        for node in dag.topological_op_nodes():
+            qubits = set(node.qargs)
+            overlapping = [block for block in blocks if block.qubits & qubits]
+
+            if self._fusable(node.op):
+                merged = _Block.merge(overlapping)
+                if merged.accepts(node, self.max_fused_qubits):
+                    merged.append(node)
+                    blocks = [block for block in blocks if block not in overlapping]
+                    blocks.append(merged)
+                    continue
+
+            for block in overlapping:
+                block.apply(result)
+                blocks.remove(block)
+
+            if self._fusable(node.op):
+                block = _Block()
+                block.append(node)
+                blocks.append(block)
+            else:
+                result.apply_operation_back(node.op, node.qargs, node.cargs)
+
+        for block in blocks:
+            block.apply(result)
+
+        return result
+
+    def _fusable(self, op) -> bool:
+        """True if the op is a unitary without unbound parameters or classical conditions that fits in a fused gate"""
+        if not (isinstance(op, Gate) or _is_cv(op)):
+            return False
+
+        return op.num_qubits <= self.max_fused_qubits and not op.is_parameterized() and not op.condition
+
+
+class _Block:
+    """DAG op nodes (in topological order) to be fused into a single unitary gate"""
+
+    def __init__(self):
+        self.nodes = []
+        self.qubits = set()
+        self.unit = None
+
+    @staticmethod
+    def merge(blocks):
+        """Merge blocks acting on disjoint qubits (so their relative order is irrelevant) into a new block"""
+        merged = _Block()
+        for block in blocks:
+            merged.nodes += block.nodes
+            merged.qubits |= block.qubits
+            merged.unit = merged.unit or block.unit
+        return merged
+
+    def accepts(self, node, max_fused_qubits: int) -> bool:
+        """True if the node can be appended without exceeding the qubit limit or mixing duration units"""
+        if len(self.qubits | set(node.qargs)) > max_fused_qubits:
+            return False
+
+        return node.op.duration is None or self.unit is None or node.op.unit == self.unit
+
+    def append(self, node):
+        self.nodes.append(node)
+        self.qubits |= set(node.qargs)
+        if node.op.duration is not None:
+            self.unit = node.op.unit
+
+    def apply(self, dag):
+        """Apply the block to the end of the DAG, as a single UnitaryGate if anything is fused"""
+        if len(self.nodes) == 1 or not any(_is_cv(node.op) for node in self.nodes):
+            for node in self.nodes:
+                dag.apply_operation_back(node.op, node.qargs, node.cargs)
+            return
+
+        # Order fused qubits by their index in the circuit
+        qubits = [qubit for qubit in dag.qubits if qubit in self.qubits]
+
+        operator = Operator(numpy.eye(2 ** len(qubits)))
+        duration = 0
+        for node in self.nodes:
+            operator = operator.compose(_matrix(node.op), qargs=[qubits.index(qubit) for qubit in node.qargs])
+            duration += node.op.duration or 0
+
+        gate = UnitaryGate(operator, label="fused")
+        gate.duration = duration
+        gate.unit = self.unit or "dt"
+
+        dag.apply_operation_back(gate, qubits, [])
+
+
+def _is_cv(op) -> bool:
+    """True if the op is a CV gate built by CVCircuit"""
+    return isinstance(op, ParameterizedUnitaryGate) or getattr(op, "cv_conditional", False)
+
+
+def _matrix(op):
+    """Operator matrix of the op, without Qiskit decomposing the controlled gates of cv_conditional instructions"""
+    if isinstance(op, ControlledGate) and isinstance(op.base_gate, ParameterizedUnitaryGate) and op.num_ctrl_qubits == 1:
+        # The control qubit is the first (least significant) qubit
+        projector = numpy.zeros((2, 2))
+        projector[op.ctrl_state, op.ctrl_state] = 1
+
+        base = op.base_gate.to_matrix()
+        return numpy.kron(base, projector) + numpy.kron(numpy.eye(len(base)), numpy.eye(2) - projector)
+    elif getattr(op, "cv_conditional", False):
+        definition = op.definition
+
+        operator = Operator(numpy.eye(2 ** op.num_qubits))
+        for inst, qargs, _ in definition.data:
+            operator = operator.compose(_matrix(inst), qargs=[definition.qubits.index(qubit) for qubit in qargs])
+        return operator.data
+
+    return Operator(op).data
@@ -0,0 +1,380 @@
+"""Gaussian (mean vector and covariance matrix) simulation of CVCircuit containing only Gaussian gates.
+
+Circuits built from displacements, squeezing, two-mode squeezing, beam splitters and phase space rotations acting
+on the vacuum stay in a pure Gaussian state, so they are simulated exactly in O(modes^3) whatever the cutoff.
+Fock amplitudes are only calculated on request, with the recurrence of the state's Bargmann representation.
+
+Quadratures use hbar = 2 (x = a + a_dag, p = -i * (a - a_dag)), so the vacuum covariance matrix is the identity,
+matching the Wigner functions in c2qa.util.
+"""
+import time
+
+import numpy
+
+import c2qa.native
+from c2qa.operators import ParameterizedUnitaryGate
+
+# Gates (by CVCircuit label) the Gaussian backend simulates
+GAUSSIAN_GATES = ("D", "S", "S2", "BS", "R")
+
+
+class GaussianState:
+    """Pure Gaussian state of a number of qumodes.
+
+    The state is kept both as its first and second moments (means and covariance of the quadratures, ordered
+    x_0, ..., x_n-1, p_0, ..., p_n-1) and as its Bargmann representation: the state is
+    vacuum_amplitude * exp(a_dag^T * B * a_dag / 2 + gamma^T * a_dag) |0>, from which Fock amplitudes follow
+    by recurrence.
+
+    The gate methods match the operators of c2qa.operators.CVOperators, including the global phase.
+    """
+
+    def __init__(self, num_modes: int):
+        """Initialize the vacuum state
+
+        Args:
+            num_modes (int): number of qumodes
+        """
+        self.num_modes = num_modes
+
+        self.means = numpy.zeros(2 * num_modes)
+        self.covariance = numpy.eye(2 * num_modes)
+
+        self.bargmann = numpy.zeros((num_modes, num_modes), dtype=complex)
+        self.gamma = numpy.zeros(num_modes, dtype=complex)
+        self.vacuum_amplitude = 1 + 0j
+
+    def displace(self, alpha, mode: int):
+        """Displacement exp(alpha * a_dag - conj(alpha) * a)
+
+        Args:
+            alpha (complex): displacement
+            mode (int): qumode index
+        """
+        alpha = complex(alpha)
+
+        self.means[mode] += 2 * alpha.real
+        self.means[mode + self.num_modes] += 2 * alpha.imag
+
+        # D = exp(-|alpha|^2 / 2) * exp(alpha * a_dag) * exp(-conj(alpha) * a), where a acts as d/dw on the Bargmann function
+        shift = alpha.conjugate()
+        self.vacuum_amplitude *= numpy.exp(
+            -abs(alpha) ** 2 / 2 + shift ** 2 * self.bargmann[mode, mode] / 2 - shift * self.gamma[mode]
+        )
+        self.gamma = self.gamma - shift * self.bargmann[:, mode]
+        self.gamma[mode] += alpha
+
+    def squeeze(self, zeta, mode: int):
+        """Single-mode squeezing exp((conj(zeta) * a^2 - zeta * a_dag^2) / 2)
+
+        Args:
+            zeta (complex): squeeze
+            mode (int): qumode index
+        """
+        zeta = complex(zeta)
+        r = abs(zeta)
+        phase = numpy.exp(1j * numpy.angle(zeta))
+
+        # Heisenberg picture a -> cosh(r) * a - exp(i * phi) * sinh(r) * a_dag
+        self._transform([mode], numpy.array([[numpy.cosh(r)]]), numpy.array([[-phase * numpy.sinh(r)]]))
+
+        # Normal ordered S = exp(-exp(i * phi) * tanh(r) * a_dag^2 / 2) * cosh(r)^-(N + 1/2) * exp(exp(-i * phi) * tanh(r) * a^2 / 2)
+        tanh = numpy.tanh(r)
+        self._bargmann_lowering(mode, tanh / phase)
+
+        scale = 1 / numpy.cosh(r)
+        self.vacuum_amplitude *= numpy.sqrt(scale)
+        self.bargmann[mode, :] *= scale
+        self.bargmann[:, mode] *= scale
+        self.gamma[mode] *= scale
+
+        self.bargmann[mode, mode] -= phase * tanh
+
+    def rotate(self, theta, mode: int):
+        """Phase space rotation exp(i * theta * N)
+
+        Args:
+            theta (real): rotation
+            mode (int): qumode index
+        """
+        self._passive([mode], numpy.array([[numpy.exp(1j * float(numpy.real(theta)))]]))
+
+    def beam_splitter(self, theta, mode_a: int, mode_b: int):
+        """Beam splitter exp(theta * a1_dag * a2 - conj(theta) * a1 * a2_dag), on modes ordered as the qumodes of
+        CVCircuit.cv_bs() (i.e., a1 acts on mode_b and a2 on mode_a)
+
+        Args:
+            theta (complex): phase
+            mode_a (int): first qumode index
+            mode_b (int): second qumode index
+        """
+        theta = complex(theta)
+        r = abs(theta)
+        phase = numpy.exp(1j * numpy.angle(theta))
+
+        # Heisenberg picture (a1, a2) -> exp([[0, theta], [-conj(theta), 0]]) (a1, a2)
+        unitary = numpy.array([[numpy.cos(r), phase * numpy.sin(r)], [-numpy.sin(r) / phase, numpy.cos(r)]])
+        self._passive([mode_b, mode_a], unitary)
+
+    def two_mode_squeeze(self, g, mode_a: int, mode_b: int):
+        """Two-mode squeezing exp(conj(i * g) * a1_dag * a2_dag - i * g * a1 * a2)
+
+        Args:
+            g (complex): squeeze
+            mode_a (int): first qumode index
+            mode_b (int): second qumode index
+        """
+        g = complex(g)
+
+        # With b1 = (a1 + a2) / sqrt(2) and b2 = (a1 - a2) / sqrt(2), a1 * a2 = (b1^2 - b2^2) / 2, so two-mode
+        # squeezing is single-mode squeezing of b1 by i * conj(g) and b2 by -i * conj(g)
+        hadamard = numpy.array([[1, 1], [1, -1]]) / numpy.sqrt(2)
+        self._passive([mode_a, mode_b], hadamard)
+        self.squeeze(1j * g.conjugate(), mode_a)
+        self.squeeze(-1j * g.conjugate(), mode_b)
+        self._passive([mode_a, mode_b], hadamard)
+
+    def mean_photon_numbers(self):
+        """Mean photon number of each qumode
+
+        Returns:
+            ndarray: mean photon numbers
+        """
+        n = self.num_modes
+        variances = numpy.diagonal(self.covariance)
+        return (variances[:n] + variances[n:] + self.means[:n] ** 2 + self.means[n:] ** 2) / 4 - 0.5
+
+    def reduced(self, mode: int):
+        """Means and covariance matrix of the (generally mixed) reduced state of a qumode
+
+        Args:
+            mode (int): qumode index
+
+        Returns:
+            tuple: (means, covariance) of the qumode's (x, p) quadratures
+        """
+        indices = [mode, mode + self.num_modes]
+        return self.means[indices], self.covariance[numpy.ix_(indices, indices)]
+
+    def wigner(self, mode: int, xvec, pvec=None):
+        """Wigner function of the reduced state of a qumode, calculated directly from its Gaussian moments
+
+        Args:
+            mode (int): qumode index
+            xvec (ndarray): x quadrature values
+            pvec (ndarray, optional): p quadrature values. Defaults to None (xvec).
+
+        Returns:
+            ndarray: Wigner function values with shape (len(pvec), len(xvec)), as c2qa.util.wigner()
+        """
+        if pvec is None:
+            pvec = xvec
+
+        means, covariance = self.reduced(mode)
+        x, p = numpy.meshgrid(xvec, pvec)
+        delta = numpy.stack([x - means[0], p - means[1]], axis=-1)
+
+        exponent = numpy.einsum("...i,ij,...j->...", delta, numpy.linalg.inv(covariance), delta)
+        return numpy.exp(-exponent / 2) / (2 * numpy.pi * numpy.sqrt(numpy.linalg.det(covariance)))
+
+    def fock_amplitudes(self, cutoffs):
+        """Fock amplitudes <n_0, ..., n_n-1|psi> of every photon number below the cutoffs
+
+        Amplitudes are built with the Bargmann recurrence
+        psi(n + e_i) = (gamma_i * psi(n) + sum_j B_ij * sqrt(n_j) * psi(n - e_j)) / sqrt(n_i + 1), one mode at a time.
+
+        Args:
+            cutoffs (list): cutoff of each qumode
+
+        Returns:
+            ndarray: amplitudes with shape tuple(cutoffs), indexed by the photon number of each qumode
+        """
+        return _recurrence(self.bargmann, self.gamma, self.vacuum_amplitude, list(cutoffs))
+
+    def fock_probabilities(self, cutoffs):
+        """Photon number probabilities of every photon number below the cutoffs, see fock_amplitudes()
+
+        Returns:
+            ndarray: probabilities with shape tuple(cutoffs)
+        """
+        return numpy.abs(self.fock_amplitudes(cutoffs)) ** 2
+
+    def _passive(self, modes, unitary):
+        """Apply the passive (photon number conserving) gate with Heisenberg picture a -> unitary * a on the modes"""
+        self._transform(modes, unitary, numpy.zeros_like(unitary))
+
+        # The vacuum is unchanged and a_dag -> unitary^T * a_dag in the Bargmann function
+        full = numpy.eye(self.num_modes, dtype=complex)
+        full[numpy.ix_(modes, modes)] = unitary
+        self.bargmann = full @ self.bargmann @ full.T
+        self.gamma = full @ self.gamma
+
+    def _transform(self, modes, lowering, raising):
+        """Update the moments for the Heisenberg picture a -> lowering * a + raising * a_dag on the modes"""
+        # With a = (x + i * p) / 2, x -> Re(L + R) * x - Im(L - R) * p and p -> Im(L + R) * x + Re(L - R) * p
+        plus = lowering + raising
+        minus = lowering - raising
+        local = numpy.block([[plus.real, -minus.imag], [plus.imag, minus.real]])
+
+        indices = list(modes) + [mode + self.num_modes for mode in modes]
+        symplectic = numpy.eye(2 * self.num_modes)
+        symplectic[numpy.ix_(indices, indices)] = local
+
+        self.means = symplectic @ self.means
+        self.covariance = symplectic @ self.covariance @ symplectic.T
+
+    def _bargmann_lowering(self, mode: int, tau):
+        """Apply exp(tau * a^2 / 2) to the Bargmann representation, i.e. a Gaussian convolution along the mode"""
+        column = self.bargmann[:, mode].copy()
+        denominator = 1 - tau * column[mode]
+        gamma = self.gamma[mode]
+
+        self.vacuum_amplitude *= numpy.exp(tau * gamma ** 2 / (2 * denominator)) / numpy.sqrt(denominator)
+        self.bargmann = self.bargmann + tau * numpy.outer(column, column) / denominator
+        self.gamma = self.gamma + tau * gamma * column / denominator
+
+
+def is_gaussian(circuit) -> bool:
+    """True if the circuit only applies Gaussian gates (see GAUSSIAN_GATES) with bound parameters to its qumodes,
+    initialized to the vacuum
+
+    Args:
+        circuit (CVCircuit): circuit to check
+
+    Returns:
+        bool: True if the circuit can be simulated with the Gaussian backend
+    """
+    qumode_qubits = set(circuit.qumode_qubits)
+    touched = set()
+    for inst, qargs, _ in circuit.data:
+        if inst.name in ("barrier", "delay") or inst.name.startswith("save_"):
+            continue
+        if inst.condition or not set(qargs) <= qumode_qubits:
+            return False
+
+        if inst.name == "initialize":
+            # Preparing the vacuum (e.g., cv_initialize(0, qumode)) on qumodes not yet acted on is a no-op
+            if touched & set(qargs) or len(inst.params) == 1 or not numpy.isclose(abs(complex(inst.params[0])), 1):
+                return False
+            continue
+
+        if not isinstance(inst, ParameterizedUnitaryGate) or inst.name not in GAUSSIAN_GATES or inst.is_parameterized():
+            return False
+        if inst.name == "R" and numpy.imag(complex(inst.params[0])) != 0:
+            return False
+
+        touched |= set(qargs)
+
+    return True
+
+
+def simulate(circuit) -> GaussianState:
+    """Simulate a Gaussian circuit
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+
+    Raises:
+        ValueError: If the circuit is not Gaussian, see is_gaussian().
+
+    Returns:
+        GaussianState: final state, with qumodes indexed in circuit order (QumodeRegisters in order, each qumode in order)
+    """
+    if not is_gaussian(circuit):
+        raise ValueError("Only circuits of Gaussian gates (D, S, S2, BS, R) on the vacuum can be simulated as Gaussian states.")
+
+    # Qumode index of the first (least significant) qubit of each qumode
+    mode = {}
+    for qmreg in circuit.qmregs:
+        for qumode in qmreg:
+            mode[qumode[0]] = len(mode)
+
+    state = GaussianState(len(mode))
+    for inst, qargs, _ in circuit.data:
+        if not isinstance(inst, ParameterizedUnitaryGate):
+            continue
+
+        values = inst.bound_values()
+        mode_a = mode[qargs[0]]
+        if inst.name == "D":
+            state.displace(values[0], mode_a)
+        elif inst.name == "S":
+            state.squeeze(values[0], mode_a)
+        elif inst.name == "R":
+            state.rotate(values[0], mode_a)
+        else:
+            # Two-qumode gates act on qumode_a + qumode_b, find the first qubit of qumode_b
+            mode_b = next(mode[qubit] for qubit in qargs if mode.get(qubit, mode_a) != mode_a)
+            if inst.name == "BS":
+                state.beam_splitter(values[0], mode_a, mode_b)
+            else:
+                state.two_mode_squeeze(values[0], mode_a, mode_b)
+
+    return state
+
+
+def run(circuit, shots: int = 1024, qubit_encoded: bool = True):
+    """Simulate a Gaussian circuit, returning its state vector like c2qa.util.simulate()
+
+    Fock amplitudes are calculated up to each qumode register's cutoff. Unlike Fock-space simulation, the amplitudes
+    below the cutoff are exact, the state vector is only truncated.
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+        shots (int, optional): Number of shots reported in the result. Defaults to 1024.
+        qubit_encoded (bool, optional): Set to False to return the state vector with the exact qumode cutoff
+                                        dimensions, instead of the qubit encoding. Defaults to True.
+
+    Returns:
+        tuple: (state, result) tuple from simulation
+    """
+    start = time.time()
+
+    state = simulate(circuit)
+
+    simulator = c2qa.native.NativeSimulator(circuit)
+    num_modes = state.num_modes
+    amplitudes = state.fock_amplitudes(simulator.shape[:num_modes])
+
+    # Qubits not representing qumodes are in their 0 state
+    tensor = numpy.zeros(simulator.shape, dtype=complex)
+    tensor[(Ellipsis,) + (0,) * (len(simulator.shape) - num_modes)] = amplitudes
+
+    statevector = simulator.statevector(tensor, qubit_encoded)
+    return statevector, c2qa.native.build_result(circuit, statevector, None, shots, time.time() - start, "c2qa_gaussian")
+
+
+def _recurrence(bargmann, gamma, vacuum_amplitude, cutoffs):
+    """Fock amplitudes of the Bargmann representation, see GaussianState.fock_amplitudes().
+
+    The amplitudes with n_0 = 0 follow the same recurrence on the remaining modes. Amplitudes with n_0 = k + 1 are
+    then built from those with n_0 = k and k - 1, shifting along each other mode to get psi(n - e_j).
+    """
+    if not cutoffs:
+        return numpy.array(vacuum_amplitude, dtype=complex)
+
+    result = numpy.zeros(cutoffs, dtype=complex)
+    result[0] = _recurrence(bargmann[1:, 1:], gamma[1:], vacuum_amplitude, cutoffs[1:])
+
+    for k in range(cutoffs[0] - 1):
+        current = result[k]
+        value = gamma[0] * current
+        if k > 0:
+            value = value + bargmann[0, 0] * numpy.sqrt(k) * result[k - 1]
+
+        for axis, cutoff in enumerate(cutoffs[1:]):
+            # sqrt(n_j) * psi(n - e_j), with n_j along the axis
+            shape = [1] * current.ndim
+            shape[axis] = cutoff - 1
+            shifted = numpy.zeros_like(current)
+            index = [slice(None)] * current.ndim
+            index[axis] = slice(1, None)
+            source = [slice(None)] * current.ndim
+            source[axis] = slice(None, -1)
+            shifted[tuple(index)] = numpy.sqrt(numpy.arange(1, cutoff)).reshape(shape) * current[tuple(source)]
+
+            value = value + bargmann[0, axis + 1] * shifted
+
+        result[k + 1] = value / numpy.sqrt(k + 1)
+
+    return result
@@ -4,15 +4,22 @@ import warnings
 
 
 import c2qa
-from qiskit.circuit import Instruction
+import c2qa.cache
+import numpy
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate, Instruction
+from qiskit.converters import circuit_to_dag
+from qiskit.dagcircuit import DAGCircuit, DAGOpNode
+from qiskit.exceptions import QiskitError
 from qiskit.providers.aer.noise.passes.local_noise_pass import LocalNoisePass
 from qiskit.providers.aer.noise import kraus_error
 from qiskit.providers.aer.noise.noiseerror import NoiseError
+from qiskit.quantum_info import Kraus, Operator
 from qiskit.utils.units import apply_prefix
-import scipy
+import scipy.special
 
 
-def calculate_kraus(photon_loss_rate: float, time: float, circuit: c2qa.CVCircuit):
+def calculate_kraus(photon_loss_rate: float, time: float, circuit: c2qa.CVCircuit, tolerance: float = 0):
     """
     Calculate Kraus operator given number of photons and photon loss rate over specified time. 
 
@@ -22,28 +29,130 @@ def calculate_kraus(photon_loss_rate: float, time: float, circuit: c2qa.CVCircui
         photon_loss_rakte (float): kappa, the rate of photon loss in Qiskit standard time units (seconds)
         time (float): current duration of time (in Qiskit standard time units)
         circuit (CVCircuit): cq2a.CVCircuit with ops for N and a
+        tolerance (float, optional): drop Kraus operators whose largest probability is below the tolerance,
+                                     see photon_loss_kraus(). Defaults to 0 (keep all operators).
     
     Returns:
-        List of Kraus operators for all qubits up to circuit.cutoff
+        List of Kraus operators losing 0 to circuit.cutoff - 1 photons, see photon_loss_kraus()
     """
-    operators = []
+    return list(photon_loss_kraus(photon_loss_rate, time, circuit.cutoff, tolerance))
 
-    for photons in range(circuit.cutoff + 1):
-        kraus = math.sqrt( math.pow( (1 - math.exp(-1 * photon_loss_rate * time)), photons ) / math.factorial(photons) )
-        kraus = kraus * scipy.sparse.linalg.expm( -1 * (photon_loss_rate / 2) * time * circuit.ops.N )
-        kraus = kraus.dot( circuit.ops.a ** photons )
-        operators.append(kraus.toarray())
+
+def photon_loss_kraus(photon_loss_rate: float, time: float, cutoff: int, tolerance: float = 0):
+    """
+    Kraus operators K_k = sqrt((1 - eta)^k / k!) eta^(N / 2) a^k of losing k = 0 .. cutoff - 1 photons,
+    with eta = exp(-kappa * time), from their closed-form matrix elements
+    <n - k|K_k|n> = sqrt(binomial(n, k)) (1 - eta)^(k / 2) eta^((n - k) / 2).
+
+    With a tolerance, operators whose largest probability max_n ||K_k|n>||^2 is below it are dropped, and the
+    remaining ones rescaled column by column so that sum_k K_k^dagger K_k = I still holds (the channel stays CPTP).
+    Each K_k^dagger K_k is diagonal in the Fock basis, so the rescaling doesn't change their relative weights.
+
+    Memoized by (rate, time, cutoff, tolerance) in the process-wide c2qa.cache operator cache. The returned array is
+    shared by all callers and must not be modified in place.
+
+    Args:
+        photon_loss_rate (float): kappa, the rate of photon loss in Qiskit standard time units (seconds)
+        time (float): current duration of time (in Qiskit standard time units)
+        cutoff (int): qumode cutoff
+        tolerance (float, optional): smallest largest probability of a kept operator. Defaults to 0 (keep all).
+
+    Returns:
+        ndarray: Kraus operators with shape (operators, cutoff, cutoff), in order of the number of lost photons
+    """
+    cache = c2qa.cache.operator_cache
+    key = cache.key("kraus.photon_loss_kraus", cutoff, (photon_loss_rate, time, tolerance))
+    if cache.max_bytes <= 0 or key is None:
+        return _photon_loss_kraus(photon_loss_rate, time, cutoff, tolerance)
+
+    operators = cache.get(key)
+    if operators is None:
+        operators = _photon_loss_kraus(photon_loss_rate, time, cutoff, tolerance)
+        operators.flags.writeable = False
+        cache.put(key, operators)
+
+    return operators
+
+
+def _photon_loss_kraus(photon_loss_rate: float, time: float, cutoff: int, tolerance: float = 0):
+    eta = math.exp(-1 * photon_loss_rate * time)
+
+    # Lost photons k (rows) and initial photons n (columns), only n >= k is possible
+    lost, photons = numpy.ogrid[:cutoff, :cutoff]
+    remaining = photons - lost
+    possible = remaining >= 0
+    remaining = numpy.where(possible, remaining, 0)
+
+    binomial = numpy.exp(scipy.special.gammaln(photons + 1) - scipy.special.gammaln(lost + 1) - scipy.special.gammaln(remaining + 1))
+    elements = numpy.sqrt(binomial) * numpy.power(1 - eta, lost / 2) * numpy.power(eta, remaining / 2)
+    elements = numpy.where(possible, elements, 0)
+
+    if tolerance > 0:
+        # Probability of losing k photons from Fock state n is elements[k, n]^2, K_0 is always kept
+        kept = numpy.max(elements ** 2, axis=1) >= tolerance
+        kept[0] = True
+        lost = lost[kept]
+        elements = elements[kept]
+        elements = elements / numpy.sqrt(numpy.sum(elements ** 2, axis=0))
+
+    operators = numpy.zeros((len(elements), cutoff, cutoff))
+    index, n = numpy.nonzero(elements)
+    k = lost.reshape(-1)[index]
+    operators[index, n - k, n] = elements[index, n]
 
     return operators
 
 
 class PhotonLossNoisePass(LocalNoisePass):
-    """Add photon loss noise model to a circuit during transpiler transformation pass."""
+    """Add photon loss noise model to a circuit during transpiler transformation pass.
+
+    After each instruction with a duration, a single-mode loss channel (sized by the cutoff of its QumodeRegister) is
+    added on every qumode the instruction acts on. Qubits that aren't part of a qumode (e.g., ancillas) get no noise.
+
+    With fuse=True, each unitary instruction and its loss channels are replaced by a single Kraus channel (loss after
+    the unitary), so the simulator makes one pass over the density matrix per instruction instead of two. Identity
+    gates (e.g., zero displacement animation segments) are dropped, and back-to-back loss channels on the same qumode
+    are merged into one, the loss of kappa_1 * t_1 then kappa_2 * t_2 being the loss of kappa_1 * t_1 + kappa_2 * t_2.
+    """
+
+    def __init__(
+        self, photon_loss_rate, circuit: c2qa.CVCircuit, dt: float = None, tolerance: float = 1e-12, fuse: bool = False
+    ):
+        """Initialize PhotonLossNoisePass
 
-    def __init__(self, photon_loss_rate: float, circuit: c2qa.CVCircuit, dt: float = None):
-        self._photon_loss_rate = photon_loss_rate
+        Args:
+            photon_loss_rate (float or list): kappa, the rate of photon loss in Qiskit standard time units (seconds),
+                                              for all qumodes or one per qumode (in the order of the circuit's qumodes)
+            circuit (CVCircuit): circuit the noise is added to
+            dt (float, optional): duration of a 'dt' time unit, for instructions with 'dt' durations. Defaults to None.
+            tolerance (float, optional): drop Kraus operators whose largest probability is below the tolerance, see
+                                         photon_loss_kraus(). Defaults to 1e-12.
+            fuse (bool, optional): Set to True to fuse unitary instructions with their loss channels and merge
+                                   back-to-back loss channels. Defaults to False.
+
+        Raises:
+            ValueError: If the number of rates doesn't match the qumodes.
+        """
         self._circuit = circuit
         self._dt = dt
+        self._tolerance = tolerance
+        self._fuse = fuse
+
+        # Circuit qubit indices of each qumode, with its cutoff and loss rate
+        qumodes = [(qmreg.cutoff, qumode) for qmreg in circuit.qmregs for qumode in qmreg]
+        self._photon_loss_rates = _per_qumode(photon_loss_rate, len(qumodes))
+        self._qumodes = {}
+        for (cutoff, qumode), rate in zip(qumodes, self._photon_loss_rates):
+            indices = tuple(circuit.find_bit(qubit).index for qubit in qumode)
+            for index in indices:
+                self._qumodes[index] = (indices, cutoff, rate)
+
+        # Label and QuantumError shared by all qumodes with the same loss rate * duration and cutoff
+        self._errors = {}
+        # (loss rate * duration, cutoff) of the loss channel instructions, by label
+        self._losses = {}
+        # Noise circuit shared by all instructions with the same duration, unit and qubits
+        self._noise = {}
 
         super().__init__(self._photon_loss_error)
 
@@ -52,25 +161,150 @@ class PhotonLossNoisePass(LocalNoisePass):
         op: Instruction,
         qubits: Sequence[int]
     ):
-        """Return photon loss error on each operand qubit"""
+        """Return photon loss errors on the qumodes of the operand qubits, None if the operands have no qumode"""
         if not op.duration:
             if op.duration is None:
                 warnings.warn("PhotonLossNoisePass ignores instructions without duration,"
                               " you may need to schedule circuit in advance.", UserWarning)
             return None
 
-        # Convert op duration to seconds
-        if op.unit == 'dt':
-            if self._dt is None:
-                raise NoiseError(
-                    "PhotonLossNoisePass cannot apply noise to a 'dt' unit duration"
-                    " without a dt time set.")
-            duration = op.duration * self._dt
-        else:
-            # Convert duration into standard unit used by Qiskit
-            duration = apply_prefix(op.duration, op.unit)
-
-        kraus_operators = calculate_kraus(self._photon_loss_rate, duration, self._circuit)
-        error = kraus_error(kraus_operators)
-
-        return error
+        key = (op.duration, op.unit, tuple(qubits))
+        if key not in self._noise:
+            self._noise[key] = self._noise_circuit(op, list(qubits))
+
+        return self._noise[key]
+
+    def _noise_circuit(self, op: Instruction, qubits: Sequence[int]):
+        """Circuit on the operand qubits with a loss channel on each whole qumode with a nonzero loss rate"""
+        qumodes = []
+        for index in qubits:
+            qumode = self._qumodes.get(index)
+            if qumode and qumode[2] and qumode not in qumodes and all(other in qubits for other in qumode[0]):
+                qumodes.append(qumode)
+
+        if not qumodes:
+            return None
+
+        duration = _duration(op, self._dt)
+        noise = QuantumCircuit(len(qubits))
+        for indices, cutoff, rate in qumodes:
+            noise.append(self._loss_instruction(rate * duration, cutoff), [qubits.index(index) for index in indices])
+
+        return noise
+
+    def _loss_instruction(self, loss: float, cutoff: int):
+        """Instruction of the loss channel for loss rate * duration, labelled to identify its loss and cutoff"""
+        key = (loss, cutoff)
+        if key not in self._errors:
+            label = f"photon_loss_{len(self._errors)}"
+            self._errors[key] = (label, kraus_error(list(photon_loss_kraus(loss, 1, cutoff, self._tolerance))))
+            self._losses[label] = key
+
+        label, error = self._errors[key]
+        instruction = error.to_instruction()
+        instruction.label = label
+        return instruction
+
+    def run(self, dag: DAGCircuit) -> DAGCircuit:
+        """Add the photon loss noise to the DAG, fusing it with the instructions if requested
+
+        Args:
+            dag (DAGCircuit): DAG to be changed
+
+        Returns:
+            DAGCircuit: the changed DAG
+        """
+        if not self._fuse:
+            return super().run(dag)
+
+        qubit_indices = {qubit: index for index, qubit in enumerate(dag.qubits)}
+        for node in list(dag.topological_op_nodes()):
+            noise = self._photon_loss_error(node.op, [qubit_indices[qubit] for qubit in node.qargs])
+            if noise is None:
+                continue
+
+            unitary = _unitary(node.op)
+            if unitary is not None and not numpy.allclose(unitary, numpy.eye(len(unitary))):
+                kraus_operators = [operator @ unitary for operator in Kraus(noise).data]
+                dag.substitute_node(node, kraus_error(kraus_operators).to_instruction(), inplace=True)
+                continue
+
+            # Keep instructions that aren't unitary, followed by their loss channels
+            noise_dag = DAGCircuit()
+            noise_dag.add_qubits(node.qargs)
+            noise_dag.add_clbits(node.cargs)
+            if unitary is None:
+                noise_dag.apply_operation_back(node.op, qargs=node.qargs, cargs=node.cargs)
+            noise_dag.compose(circuit_to_dag(noise), qubits=node.qargs)
+            dag.substitute_node_with_dag(node, noise_dag)
+
+        self._merge_losses(dag)
+
+        return dag
+
+    def _merge_losses(self, dag: DAGCircuit):
+        """Merge each loss channel into the next one if it directly follows on the same qumode"""
+        for node in list(dag.topological_op_nodes()):
+            loss = self._loss(node)
+            if loss is None:
+                continue
+
+            successors = list(dag.successors(node))
+            if len(successors) != 1 or not isinstance(successors[0], DAGOpNode):
+                continue
+
+            successor = successors[0]
+            successor_loss = self._loss(successor)
+            if successor_loss is None or successor.qargs != node.qargs:
+                continue
+
+            dag.substitute_node(successor, self._loss_instruction(loss[0] + successor_loss[0], loss[1]), inplace=True)
+            dag.remove_op_node(node)
+
+    def _loss(self, node):
+        """(loss rate * duration, cutoff) of a loss channel node, None for other nodes"""
+        return self._losses.get(getattr(node.op, "label", None))
+
+
+def _unitary(op: Instruction):
+    """Matrix of an unconditional gate, None for other instructions"""
+    if not isinstance(op, Gate) or op.condition is not None:
+        return None
+
+    try:
+        return Operator(op).data
+    except QiskitError:
+        return None
+
+
+def _per_qumode(value, num_qumodes: int, name: str = "photon loss rate"):
+    """List of one value (e.g., photon loss rate) per qumode, from a single value or one per qumode
+
+    Raises:
+        ValueError: If the number of values doesn't match the qumodes.
+    """
+    if numpy.ndim(value) == 0:
+        return [value] * num_qumodes
+    if len(value) != num_qumodes:
+        raise ValueError(f"Expected one {name} per qumode ({num_qumodes}), got {len(value)}.")
+    return list(value)
+
+
+def _duration(op: Instruction, dt: float = None):
+    """Duration of the instruction in seconds (Qiskit standard time units), None if it has no duration
+
+    Raises:
+        NoiseError: If the duration is in 'dt' units without a dt time set.
+    """
+    if not op.duration:
+        return None
+
+    if op.unit == 'dt':
+        if dt is None:
+            raise NoiseError(
+                "PhotonLossNoisePass cannot apply noise to a 'dt' unit duration"
+                " without a dt time set.")
+        return op.duration * dt
+
+    # Convert duration into standard unit used by Qiskit
+    return apply_prefix(op.duration, op.unit)
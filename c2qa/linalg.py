@@ -0,0 +1,327 @@
+"""Fock-basis linear algebra used by CVOperators to build operator matrices without scipy.sparse.linalg.expm."""
+import numpy
+import scipy.linalg
+import scipy.sparse
+
+
+def quadrature_eigensystem(cutoff: int):
+    """Eigen decomposition of the truncated quadrature operator (a + a_dag).
+
+    The truncated operator is the Jacobi matrix of the Hermite polynomials, so its eigenvalues are
+    sqrt(2) times the roots of H_cutoff and its eigenvectors are the normalized Hermite functions
+    evaluated at those roots. The tridiagonal solver computes both in O(cutoff^2).
+
+    Args:
+        cutoff (int): qumode cutoff level
+
+    Returns:
+        tuple: (eigenvalues, eigenvectors) ndarrays
+    """
+    off_diagonal = numpy.sqrt(numpy.arange(1, cutoff))
+
+    return _eigh_tridiagonal(numpy.zeros(cutoff), off_diagonal)
+
+
+def squeezing_eigensystem(cutoff: int):
+    """Eigen decomposition of the truncated (a^2 + a_dag^2) / 2 operator.
+
+    The operator only couples Fock states of equal parity, so it is decomposed as two independent
+    tridiagonal matrices (even and odd Fock states).
+
+    Args:
+        cutoff (int): qumode cutoff level
+
+    Returns:
+        tuple: (eigenvalues, eigenvectors) ndarrays
+    """
+    eigenvalues = numpy.zeros(cutoff)
+    eigenvectors = numpy.zeros((cutoff, cutoff))
+
+    for parity in (0, 1):
+        indices = numpy.arange(parity, cutoff, 2)
+        if len(indices) == 0:
+            continue
+
+        off_diagonal = numpy.sqrt((indices[:-1] + 1) * (indices[:-1] + 2)) / 2
+        values, vectors = _eigh_tridiagonal(numpy.zeros(len(indices)), off_diagonal)
+
+        eigenvalues[indices] = values
+        eigenvectors[numpy.ix_(indices, indices)] = vectors
+
+    return eigenvalues, eigenvectors
+
+
+def displacement(alpha, eigensystem):
+    """Displacement operator exp(alpha * a_dag - conj(alpha) * a) from the quadrature eigen decomposition.
+
+    With alpha = r * exp(i * phi), the generator is a diagonal phase rotation of i * r * (a + a_dag),
+    so the matrix is assembled as P * V * exp(i * r * Lambda) * V^T * P^dagger.
+
+    Args:
+        alpha (complex): displacement
+        eigensystem (tuple): (eigenvalues, eigenvectors) from quadrature_eigensystem()
+
+    Returns:
+        ndarray: operator matrix
+    """
+    return displacement_batch([alpha], eigensystem)[0]
+
+
+def displacement_batch(alphas, eigensystem):
+    """Displacement operators for each of the given alphas, see displacement().
+
+    Args:
+        alphas (array-like): 1-D array of displacements
+        eigensystem (tuple): (eigenvalues, eigenvectors) from quadrature_eigensystem()
+
+    Returns:
+        ndarray: stacked operator matrices with shape (len(alphas), cutoff, cutoff)
+    """
+    eigenvalues, eigenvectors = eigensystem
+    alphas = as_batch(alphas)
+
+    angles = numpy.angle(alphas) - numpy.pi / 2
+
+    return _phased_exponential(numpy.abs(alphas), angles, eigenvalues, eigenvectors)
+
+
+def squeezing(zeta, eigensystem):
+    """Squeezing operator exp((conj(zeta) * a^2 - zeta * a_dag^2) / 2) from the squeezing eigen decomposition.
+
+    With zeta = r * exp(i * theta), the generator is a diagonal phase rotation of i * r * (a^2 + a_dag^2) / 2.
+
+    Args:
+        zeta (complex): squeeze
+        eigensystem (tuple): (eigenvalues, eigenvectors) from squeezing_eigensystem()
+
+    Returns:
+        ndarray: operator matrix
+    """
+    return squeezing_batch([zeta], eigensystem)[0]
+
+
+def squeezing_batch(zetas, eigensystem):
+    """Squeezing operators for each of the given zetas, see squeezing().
+
+    Args:
+        zetas (array-like): 1-D array of squeezes
+        eigensystem (tuple): (eigenvalues, eigenvectors) from squeezing_eigensystem()
+
+    Returns:
+        ndarray: stacked operator matrices with shape (len(zetas), cutoff, cutoff)
+    """
+    eigenvalues, eigenvectors = eigensystem
+    zetas = as_batch(zetas)
+
+    angles = numpy.angle(zetas) / 2 + numpy.pi / 4
+
+    return _phased_exponential(numpy.abs(zetas), angles, eigenvalues, eigenvectors)
+
+
+def rotate(matrix, photons, angle):
+    """Conjugate the matrix by the diagonal phase rotation exp(i * angle * N), i.e. R * matrix * R^dagger.
+
+    Args:
+        matrix (ndarray or sparse matrix): operator matrix
+        photons (ndarray): diagonal of the number operator N
+        angle (float): rotation angle
+
+    Returns:
+        ndarray or sparse matrix: rotated operator matrix
+    """
+    if angle == 0:
+        return matrix
+
+    phase = numpy.exp(1j * angle * photons)
+
+    if scipy.sparse.issparse(matrix):
+        return scipy.sparse.diags(phase) @ matrix @ scipy.sparse.diags(numpy.conj(phase))
+
+    return phase[:, numpy.newaxis] * matrix * numpy.conj(phase)[numpy.newaxis, :]
+
+
+def rotate_batch(matrices, photons, angles):
+    """Conjugate each stacked matrix by its diagonal phase rotation exp(i * angle * N), see rotate().
+
+    Args:
+        matrices (ndarray): stacked operator matrices with shape (len(angles), dimension, dimension)
+        photons (ndarray): diagonal of the number operator N
+        angles (ndarray): 1-D array of rotation angles
+
+    Returns:
+        ndarray: stacked rotated operator matrices
+    """
+    phases = numpy.exp(1j * numpy.asarray(angles)[:, numpy.newaxis] * photons[numpy.newaxis, :])
+
+    return phases[:, :, numpy.newaxis] * matrices * numpy.conj(phases)[:, numpy.newaxis, :]
+
+
+class GeneratorSpectrum:
+    """Spectral decomposition of a fixed generator G, used to build exp(theta * G) for any theta.
+
+    Diagonal generators are kept as their diagonal (vectors is None), so exp(theta * G) is just the phases exp(theta * mu).
+    Hermitian and anti-Hermitian generators are diagonalized with eigh, so exp(theta * G) = V * exp(theta * mu) * V^dagger.
+    Other generators use the complex Schur form G = Z * T * Z^dagger and exponentiate only the triangular T.
+
+    Generators conserving a quantity (e.g., the total photon number of a beam splitter) can be given the
+    conserved label of each basis state. Each sector of equal label is then decomposed on its own (blocks
+    holds the (indices, GeneratorSpectrum) of each sector) and exp(theta * G) is returned block-sparse.
+    """
+
+    def __init__(self, generator, labels=None):
+        """Decompose the generator
+
+        Args:
+            generator (ndarray or sparse matrix): generator G
+            labels (ndarray, optional): conserved quantity of each basis state. Defaults to None (decompose G as a whole).
+
+        Raises:
+            ValueError: If the generator couples basis states with different labels.
+        """
+        self.blocks = None
+        self.dimension = generator.shape[0]
+
+        if labels is not None:
+            self.triangular = None
+            self.eigenvalues = None
+            self.vectors = None
+            self.blocks = _sector_blocks(generator, labels)
+            return
+
+        if hasattr(generator, "toarray"):
+            generator = generator.toarray()
+        generator = numpy.asarray(generator, dtype=complex)
+
+        self.triangular = None
+
+        adjoint = generator.conj().T
+        if numpy.count_nonzero(generator - numpy.diag(numpy.diagonal(generator))) == 0:
+            self.eigenvalues = numpy.diagonal(generator).copy()
+            self.vectors = None
+        elif numpy.allclose(generator, adjoint):
+            eigenvalues, self.vectors = scipy.linalg.eigh(generator)
+            self.eigenvalues = eigenvalues.astype(complex)
+        elif numpy.allclose(generator, -adjoint):
+            eigenvalues, self.vectors = scipy.linalg.eigh(-1j * generator)
+            self.eigenvalues = 1j * eigenvalues
+        else:
+            triangular, self.vectors = scipy.linalg.schur(generator, output="complex")
+            self.eigenvalues = numpy.diagonal(triangular).copy()
+            if not numpy.allclose(triangular, numpy.diag(self.eigenvalues)):
+                self.triangular = triangular  # Non-normal generator, keep the full Schur form
+
+    @property
+    def diagonal(self) -> bool:
+        """True if the generator is diagonal, its eigenvalues are then its diagonal."""
+        return self.blocks is None and self.vectors is None
+
+    def exp(self, theta):
+        """Return exp(theta * G)
+
+        Args:
+            theta (complex): generator coefficient
+
+        Returns:
+            ndarray or csr_matrix: operator matrix, block-sparse if decomposed by sector
+        """
+        if self.blocks is not None:
+            return self._exp_blocks(theta)
+        elif self.vectors is None:
+            return numpy.diag(numpy.exp(theta * self.eigenvalues))
+        elif self.triangular is not None:
+            return self.vectors @ scipy.linalg.expm(theta * self.triangular) @ self.vectors.conj().T
+
+        return (self.vectors * numpy.exp(theta * self.eigenvalues)) @ self.vectors.conj().T
+
+    def exp_batch(self, thetas):
+        """Return exp(theta * G) for each of the given thetas
+
+        Args:
+            thetas (array-like): 1-D array of generator coefficients
+
+        Returns:
+            ndarray: stacked dense operator matrices with shape (len(thetas), dimension, dimension)
+        """
+        thetas = as_batch(thetas)
+
+        if self.blocks is not None:
+            result = numpy.zeros((len(thetas), self.dimension, self.dimension), dtype=complex)
+            for indices, block in self.blocks:
+                result[:, indices[:, numpy.newaxis], indices[numpy.newaxis, :]] = block.exp_batch(thetas)
+            return result
+        elif self.triangular is not None:
+            return numpy.stack([self.exp(theta) for theta in thetas])
+
+        exponentials = numpy.exp(thetas[:, numpy.newaxis] * self.eigenvalues[numpy.newaxis, :])
+        if self.vectors is None:
+            result = numpy.zeros((len(thetas), self.dimension, self.dimension), dtype=complex)
+            diagonal = numpy.arange(self.dimension)
+            result[:, diagonal, diagonal] = exponentials
+            return result
+
+        return numpy.matmul(self.vectors[numpy.newaxis, :, :] * exponentials[:, numpy.newaxis, :], self.vectors.conj().T)
+
+    def _exp_blocks(self, theta):
+        """Assemble exp(theta * G) from the exponentials of each sector block"""
+        rows = []
+        cols = []
+        data = []
+        for indices, block in self.blocks:
+            rows.append(numpy.repeat(indices, len(indices)))
+            cols.append(numpy.tile(indices, len(indices)))
+            data.append(block.exp(theta).ravel())
+
+        return scipy.sparse.coo_matrix(
+            (numpy.concatenate(data), (numpy.concatenate(rows), numpy.concatenate(cols))),
+            shape=(self.dimension, self.dimension),
+        ).tocsr()
+
+
+def _sector_blocks(generator, labels):
+    """Split the generator into the blocks of basis states with equal labels and decompose each block"""
+    generator = scipy.sparse.csr_matrix(generator, dtype=complex)
+    generator.eliminate_zeros()
+    labels = numpy.asarray(labels)
+
+    coo = generator.tocoo()
+    if numpy.any(labels[coo.row] != labels[coo.col]):
+        raise ValueError("Generator couples basis states in different sectors, labels are not conserved.")
+
+    order = numpy.argsort(labels, kind="stable")
+    splits = numpy.flatnonzero(numpy.diff(labels[order])) + 1
+
+    blocks = []
+    for indices in numpy.split(order, splits):
+        blocks.append((indices, GeneratorSpectrum(generator[indices][:, indices])))
+
+    return blocks
+
+
+def as_batch(params):
+    """Convert the parameters of a batch operator call to a 1-D complex ndarray.
+
+    Raises:
+        ValueError: If the parameters are not one dimensional.
+    """
+    params = numpy.asarray(params, dtype=complex)
+    if params.ndim != 1:
+        raise ValueError("Batch parameters must be a 1-D array.")
+    return params
+
+
+def _phased_exponential(radii, angles, eigenvalues, eigenvectors):
+    """Return P_k * V * exp(i * r_k * Lambda) * V^T * P_k^dagger for each r_k, with P_k = diag(exp(i * n * angle_k))"""
+    exponentials = numpy.exp(1j * radii[:, numpy.newaxis] * eigenvalues[numpy.newaxis, :])
+    matrices = numpy.matmul(eigenvectors[numpy.newaxis, :, :] * exponentials[:, numpy.newaxis, :], eigenvectors.T)
+
+    phases = numpy.exp(1j * angles[:, numpy.newaxis] * numpy.arange(len(eigenvalues))[numpy.newaxis, :])
+
+    return phases[:, :, numpy.newaxis] * matrices * numpy.conj(phases)[:, numpy.newaxis, :]
+
+
+def _eigh_tridiagonal(diagonal, off_diagonal):
+    """scipy.linalg.eigh_tridiagonal, also handling the 1x1 case."""
+    if len(diagonal) == 1:
+        return diagonal.copy(), numpy.ones((1, 1))
+
+    return scipy.linalg.eigh_tridiagonal(diagonal, off_diagonal)
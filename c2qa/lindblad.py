@@ -0,0 +1,309 @@
+"""Native density matrix simulation of a CVCircuit with photon loss, dephasing and thermal noise on its qumodes.
+
+Instead of inserting discrete Kraus channels after gates (see c2qa.kraus.PhotonLossNoisePass), the Lindblad master
+equation of each qumode is integrated over the duration of every instruction acting on it. Gates are applied as
+instantaneous unitaries, followed by the qumode's noise for the gate's duration:
+
+    d rho / dt = kappa (n_th + 1) D[a] rho + kappa n_th D[a^dagger] rho + gamma D[N] rho,
+    D[L] rho = L rho L^dagger - (L^dagger L rho + rho L^dagger L) / 2
+
+with the photon loss rate kappa, thermal photon number n_th and dephasing rate gamma of the qumode (dephasing decays
+the coherence between Fock states n and m at gamma (n - m)^2 / 2). Each qumode's Liouvillian is a sparse matrix on
+its vectorized reduced density matrix, built from CVOperators.a and N, and its exponential is applied to the density
+matrix tensor with scipy.sparse.linalg.expm_multiply, without building the exponential.
+"""
+import time
+
+import numpy
+from qiskit.circuit import Gate
+from qiskit.quantum_info import DensityMatrix, Operator
+import scipy.sparse
+
+import c2qa.kraus
+import c2qa.native
+from c2qa.operators import CVOperators, ParameterizedUnitaryGate
+
+
+def liouvillian(cutoff: int, photon_loss_rate: float = 0, dephasing_rate: float = 0, thermal_photons: float = 0):
+    """Lindblad superoperator of a single qumode's photon loss, thermal excitation and dephasing
+
+    The superoperator acts on the density matrix flattened row-major, i.e. on index row * cutoff + column.
+
+    Args:
+        cutoff (int): qumode cutoff
+        photon_loss_rate (float, optional): kappa, the rate of photon loss in Qiskit standard time units (seconds).
+                                            Defaults to 0.
+        dephasing_rate (float, optional): gamma, the rate of Fock state dephasing. Defaults to 0.
+        thermal_photons (float, optional): n_th, the thermal photon number of the qumode's bath. Defaults to 0.
+
+    Returns:
+        csc_matrix: superoperator of shape (cutoff ** 2, cutoff ** 2)
+    """
+    ops = CVOperators.shared(cutoff)
+
+    superoperator = scipy.sparse.csc_matrix((cutoff ** 2, cutoff ** 2), dtype=complex)
+    for rate, operator in (
+        (photon_loss_rate * (thermal_photons + 1), ops.a),
+        (photon_loss_rate * thermal_photons, ops.a_dag),
+        (dephasing_rate, ops.N),
+    ):
+        if rate:
+            superoperator = superoperator + rate * _dissipator(scipy.sparse.csc_matrix(operator, dtype=complex))
+
+    return superoperator
+
+
+def _dissipator(operator):
+    """Superoperator of D[L], with vec(A X B) = kron(A, B^T) vec(X) for the row-major flattening"""
+    eye = scipy.sparse.identity(operator.shape[0], dtype=complex, format="csc")
+    number = (operator.conj().T @ operator).tocsc()
+
+    return scipy.sparse.kron(operator, operator.conj()) - 0.5 * scipy.sparse.kron(number, eye) - 0.5 * scipy.sparse.kron(eye, number.T)
+
+
+class LindbladSimulator:
+    """Simulate a CVCircuit's density matrix, shaped as the native simulator's state tensor shape for rows then columns"""
+
+    def __init__(
+        self, circuit, photon_loss_rate=0, dephasing_rate=0, thermal_photons=0, dt: float = None
+    ):
+        """Initialize LindbladSimulator
+
+        Args:
+            circuit (CVCircuit): circuit to simulate
+            photon_loss_rate (float or list, optional): kappa, the rate of photon loss in Qiskit standard time units
+                                                        (seconds), for all qumodes or one per qumode (in the order of
+                                                        the circuit's qumodes). Defaults to 0.
+            dephasing_rate (float or list, optional): gamma, the rate of Fock state dephasing, for all qumodes or one
+                                                      per qumode. Defaults to 0.
+            thermal_photons (float or list, optional): n_th, the thermal photon number of the bath the qumodes lose
+                                                       photons to, for all qumodes or one per qumode. Defaults to 0.
+            dt (float, optional): duration of a 'dt' time unit, for instructions with 'dt' durations. Defaults to None.
+
+        Raises:
+            ValueError: If the number of rates doesn't match the qumodes.
+        """
+        self.circuit = circuit
+        self.dt = dt
+        self.simulator = c2qa.native.NativeSimulator(circuit)
+        self.shape = self.simulator.shape
+
+        self.num_qumodes = sum(qmreg.num_qumodes for qmreg in circuit.qmregs)
+        self.photon_loss_rates = c2qa.kraus._per_qumode(photon_loss_rate, self.num_qumodes)
+        self.dephasing_rates = c2qa.kraus._per_qumode(dephasing_rate, self.num_qumodes, "dephasing rate")
+        self.thermal_photons = c2qa.kraus._per_qumode(thermal_photons, self.num_qumodes, "thermal photon number")
+
+        self._liouvillians = {}
+
+    def run(self):
+        """Simulate the circuit
+
+        Raises:
+            NotImplementedError: If the circuit measures, resets or has classically conditioned instructions.
+
+        Returns:
+            ndarray: final density matrix tensor
+        """
+        rho = self._initial_density_matrix()
+        for inst, qargs, _ in self.simulator.data:
+            rho = self.apply(rho, inst, qargs)
+
+            duration = c2qa.kraus._duration(inst, self.dt)
+            if duration:
+                rho = self.evolve(rho, duration, self._qumode_axes(qargs))
+
+        return rho
+
+    def apply(self, rho, op, qargs):
+        """Apply the instruction (without its noise) to the density matrix tensor
+
+        Args:
+            rho (ndarray): density matrix tensor
+            op (Instruction): instruction to apply
+            qargs (list): circuit qubits the instruction acts on
+
+        Raises:
+            NotImplementedError: If the instruction can't be simulated (measurements, resets, conditions, channels).
+
+        Returns:
+            ndarray: density matrix tensor
+        """
+        if op.condition or op.name in ("measure", "reset"):
+            raise NotImplementedError(f"Instruction {op.name} is not supported by the Lindblad simulator")
+
+        if c2qa.native._ignored(op):
+            return rho
+        elif op.name == "initialize":
+            return self._initialize(rho, op, qargs)
+        elif isinstance(op, ParameterizedUnitaryGate):
+            return self._apply_unitary(rho, op.operator(), qargs)
+        elif isinstance(op, Gate):
+            return self._apply_unitary(rho, Operator(op).data, qargs)
+        elif op.definition is not None:
+            qubits = dict(zip(op.definition.qubits, qargs))
+            for inst, inner_qargs, _ in op.definition.data:
+                rho = self.apply(rho, inst, [qubits[qubit] for qubit in inner_qargs])
+            return rho
+
+        raise NotImplementedError(f"Instruction {op.name} is not supported by the Lindblad simulator")
+
+    def evolve(self, rho, time: float, axes=None):
+        """Integrate the qumodes' Lindblad equation
+
+        Args:
+            rho (ndarray): density matrix tensor
+            time (float): evolution time in Qiskit standard time units (seconds)
+            axes (list, optional): qumode axes of the native simulator to evolve. Defaults to None (all qumodes).
+
+        Returns:
+            ndarray: density matrix tensor
+        """
+        if axes is None:
+            axes = range(self.num_qumodes)
+
+        for axis in axes:
+            superoperator = self._liouvillian(axis)
+            if superoperator.nnz:
+                # Row axis most significant, as in the row-major flattening of the superoperator
+                rho = c2qa.native._expm_multiply(rho, time * superoperator, [len(self.shape) + axis, axis])
+
+        return rho
+
+    def density_matrix(self, rho, qubit_encoded: bool = True):
+        """Convert the density matrix tensor to a Qiskit DensityMatrix, ordered as the circuit qubits
+
+        Args:
+            rho (ndarray): density matrix tensor
+            qubit_encoded (bool, optional): True to pad qumodes to their qubit encoding, False to keep subsystems
+                                            with the exact qumode cutoff dimensions. Defaults to True.
+
+        Returns:
+            DensityMatrix: density matrix
+        """
+        groups = self.simulator.groups
+        positions = [self.circuit.qubits.index(group[0]) for group in groups]
+        order = sorted(range(len(groups)), key=lambda axis: positions[axis], reverse=True)
+
+        if qubit_encoded:
+            encoded_shape = self.simulator.encoded_shape
+            if encoded_shape != self.shape:
+                encoded = numpy.zeros(encoded_shape * 2, dtype=complex)
+                encoded[tuple(slice(0, dim) for dim in self.shape * 2)] = rho
+                rho = encoded
+            dims = None
+        else:
+            # Qiskit lists subsystem dimensions least significant first
+            dims = [self.shape[axis] for axis in reversed(order)]
+
+        dimension = int(numpy.prod(rho.shape[:len(self.shape)]))
+        rho = numpy.transpose(rho, order + [len(self.shape) + axis for axis in order])
+        return DensityMatrix(rho.reshape(dimension, dimension), dims=dims)
+
+    def _initial_density_matrix(self):
+        rho = numpy.zeros(self.shape * 2, dtype=complex)
+        rho[(0,) * (2 * len(self.shape))] = 1
+        return rho
+
+    def _qumode_axes(self, qargs):
+        """Axes of the qumodes whose qubits are all in qargs"""
+        axes = []
+        for qubit in qargs:
+            axis = self.simulator.axis[qubit]
+            if axis < self.num_qumodes and axis not in axes and all(
+                other in qargs for other in self.simulator.groups[axis]
+            ):
+                axes.append(axis)
+        return axes
+
+    def _liouvillian(self, axis: int):
+        key = (self.shape[axis], self.photon_loss_rates[axis], self.dephasing_rates[axis], self.thermal_photons[axis])
+        if key not in self._liouvillians:
+            self._liouvillians[key] = liouvillian(*key)
+        return self._liouvillians[key]
+
+    def _apply_unitary(self, rho, matrix, qargs):
+        """U rho U^dagger, with U applied to the row axes and its conjugate to the column axes"""
+        axes = self.simulator._axes(qargs)
+        view = rho
+        if axes is None:
+            if self.shape != self.simulator.encoded_shape:
+                raise NotImplementedError("Gates on a subset of the qubits of a qumode require a power of 2 cutoff")
+            view = rho.reshape(self.simulator.qubit_shape * 2)
+            axes = [self.simulator.qubit_axis[qubit] for qubit in qargs]
+
+        rows = view.ndim // 2
+        view = c2qa.native._apply(view, matrix, axes)
+        view = c2qa.native._apply(view, matrix.conj(), [rows + axis for axis in axes])
+        return view.reshape(self.shape * 2)
+
+    def _initialize(self, rho, op, qargs):
+        """Trace out the qargs and prepare the Initialize instruction's (pure) state on them"""
+        axes = self.simulator._axes(qargs)
+        if axes is None:
+            raise NotImplementedError("The Lindblad simulator only initializes whole qumodes and qubits")
+
+        # The native simulator prepares the state on the qargs of its vacuum state
+        state = self.simulator._initialize(self.simulator._initial_state(), op, qargs)
+        state = state[tuple(slice(None) if axis in axes else 0 for axis in range(len(self.shape)))]
+
+        # Einstein summation labels: rows, columns, and the new rows and columns of the qargs
+        count = len(self.shape)
+        labels = [axis if axis in axes else count + axis for axis in range(count)]
+        output = [2 * count + axis if axis in axes else axis for axis in range(count)]
+        output += [3 * count + axis if axis in axes else count + axis for axis in range(count)]
+        return numpy.einsum(
+            rho,
+            list(range(count)) + labels,
+            state,
+            [2 * count + axis for axis in sorted(axes)],
+            state.conj(),
+            [3 * count + axis for axis in sorted(axes)],
+            output,
+        )
+
+
+def simulate(
+    circuit,
+    photon_loss_rate=0,
+    dephasing_rate=0,
+    thermal_photons=0,
+    dt: float = None,
+    qubit_encoded: bool = True,
+):
+    """Simulate the circuit's density matrix with the Lindblad equation of its qumodes' noise, see LindbladSimulator
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+        photon_loss_rate (float or list, optional): kappa, the rate of photon loss in Qiskit standard time units
+                                                    (seconds), for all qumodes or one per qumode. Defaults to 0.
+        dephasing_rate (float or list, optional): gamma, the rate of Fock state dephasing, for all qumodes or one per
+                                                  qumode. Defaults to 0.
+        thermal_photons (float or list, optional): n_th, the thermal photon number of the qumodes' bath, for all
+                                                   qumodes or one per qumode. Defaults to 0.
+        dt (float, optional): duration of a 'dt' time unit, for instructions with 'dt' durations. Defaults to None.
+        qubit_encoded (bool, optional): Set to False to return the density matrix with the exact qumode cutoff
+                                        dimensions, instead of the qubit encoding. Defaults to True.
+
+    Returns:
+        DensityMatrix: final density matrix
+    """
+    simulator = LindbladSimulator(circuit, photon_loss_rate, dephasing_rate, thermal_photons, dt)
+    return simulator.density_matrix(simulator.run(), qubit_encoded)
+
+
+def run(circuit, shots: int = 1024, **kwargs):
+    """Simulate the circuit's density matrix, returning it and its result like c2qa.util.simulate()
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+        shots (int, optional): Number of shots reported in the result. Defaults to 1024.
+        kwargs: photon_loss_rate, dephasing_rate, thermal_photons, dt and qubit_encoded, see simulate()
+
+    Returns:
+        tuple: (DensityMatrix, result) tuple from simulation
+    """
+    start = time.time()
+
+    density_matrix = simulate(circuit, **kwargs)
+
+    return density_matrix, c2qa.native.build_result(circuit, None, None, shots, time.time() - start, "c2qa_lindblad")
@@ -0,0 +1,375 @@
+"""Matrix product state simulation of CVCircuit for 1D chains of qumodes (and qubits).
+
+Each qumode is a site of dimension cutoff and each qubit not part of a qumode a site of dimension 2. Gates are
+applied to the window of consecutive sites spanning their qumodes and qubits, then the window is split back into
+sites with truncated SVDs. Nearest-neighbour circuits (e.g., beam splitters along a chain) keep the windows small,
+while the bond dimension, instead of cutoff^num_qumodes, bounds the memory.
+"""
+import time
+
+import numpy
+from qiskit.circuit import ControlledGate
+from qiskit.quantum_info import DensityMatrix, Operator, Statevector
+
+import c2qa.fusion
+import c2qa.native
+from c2qa.operators import ParameterizedUnitaryGate
+
+
+class MPSState:
+    """Matrix product state in mixed canonical form.
+
+    Site tensors have shape (left bond, site dimension, right bond). Tensors left of the orthogonality center are left
+    isometries and tensors right of it are right isometries.
+    """
+
+    def __init__(self, tensors, groups, circuit=None):
+        """Initialize MPSState
+
+        Args:
+            tensors (list): site tensors, in chain order
+            groups (list): circuit qubits of each site (all qubits of a qumode, or a single qubit)
+            circuit (CVCircuit, optional): simulated circuit, needed by statevector(). Defaults to None.
+        """
+        self.tensors = tensors
+        self.groups = groups
+        self.circuit = circuit
+        self.center = 0
+        self.truncation_error = 0.0
+
+        self.site = {qubit: index for index, group in enumerate(groups) for qubit in group}
+
+    @property
+    def dims(self):
+        """Dimension of each site"""
+        return [tensor.shape[1] for tensor in self.tensors]
+
+    def bond_dimensions(self):
+        """Dimension of each bond between neighbouring sites"""
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def move_center(self, site: int):
+        """Move the orthogonality center to the site with QR decompositions
+
+        Args:
+            site (int): site index
+        """
+        while self.center < site:
+            tensor = self.tensors[self.center]
+            left, dim, right = tensor.shape
+            q, r = numpy.linalg.qr(tensor.reshape(left * dim, right))
+            self.tensors[self.center] = q.reshape(left, dim, -1)
+            self.tensors[self.center + 1] = numpy.tensordot(r, self.tensors[self.center + 1], axes=(1, 0))
+            self.center += 1
+
+        while self.center > site:
+            tensor = self.tensors[self.center]
+            left, dim, right = tensor.shape
+            q, r = numpy.linalg.qr(tensor.reshape(left, dim * right).T)
+            self.tensors[self.center] = q.T.reshape(-1, dim, right)
+            self.tensors[self.center - 1] = numpy.tensordot(self.tensors[self.center - 1], r.T, axes=(2, 0))
+            self.center -= 1
+
+    def apply(self, matrix, sites, max_bond_dimension: int = None, truncation_error: float = 1e-12):
+        """Apply the matrix to the sites, splitting the window of sites it spans with truncated SVDs
+
+        Args:
+            matrix (ndarray or sparse matrix): gate matrix, indexed by the sites' states with the first site least
+                                               significant
+            sites (list): site indices the matrix acts on
+            max_bond_dimension (int, optional): Maximum bond dimension kept by each SVD. Defaults to None (no limit).
+            truncation_error (float, optional): Largest discarded weight (sum of the squared discarded singular values
+                                                relative to the total) of each SVD. Defaults to 1e-12.
+        """
+        first = min(sites)
+        last = max(sites)
+
+        if first == last:
+            # Unitaries on a single site keep the canonical form
+            self.tensors[first] = c2qa.native._apply(self.tensors[first], matrix, [1])
+            return
+
+        self.move_center(first)
+
+        theta = self.tensors[first]
+        for index in range(first + 1, last + 1):
+            theta = numpy.tensordot(theta, self.tensors[index], axes=(-1, 0))
+        theta = c2qa.native._apply(theta, matrix, [site - first + 1 for site in sites])
+
+        for index in range(first, last):
+            left = theta.shape[0]
+            dim = theta.shape[1]
+            rest = theta.shape[2:]
+
+            u, s, vh = numpy.linalg.svd(theta.reshape(left * dim, -1), full_matrices=False)
+            keep = self._truncate(s, max_bond_dimension, truncation_error)
+
+            total = numpy.sum(s ** 2)
+            self.truncation_error += numpy.sum(s[keep:] ** 2) / total
+            s = s[:keep] * numpy.sqrt(total / numpy.sum(s[:keep] ** 2))
+
+            self.tensors[index] = u[:, :keep].reshape(left, dim, keep)
+            theta = (s[:, numpy.newaxis] * vh[:keep]).reshape((keep,) + rest)
+
+        self.tensors[last] = theta
+        self.center = last
+
+    def occupations(self):
+        """Mean photon number of each qumode, in the order of the circuit's qumodes
+
+        Returns:
+            ndarray: mean photon numbers
+        """
+        qumodes = [qumode for qmreg in self.circuit.qmregs for qumode in qmreg]
+        left, right = self._environments()
+
+        occupations = []
+        for qumode in qumodes:
+            site = self.site[qumode[0]]
+            tensor = self.tensors[site]
+            density = numpy.einsum("ab,asc,btd,cd->st", left[site], tensor, tensor.conj(), right[site + 1])
+            occupations.append(numpy.real(numpy.trace(density @ numpy.diag(numpy.arange(tensor.shape[1])))))
+
+        return numpy.array(occupations)
+
+    def reduced_density_matrix(self, qargs):
+        """Density matrix of the qumodes and qubits, tracing out the other sites
+
+        Args:
+            qargs (list): qumodes (lists of qubits) and qubits to keep, the first least significant
+
+        Returns:
+            DensityMatrix: reduced density matrix with the exact qumode cutoff dimensions
+        """
+        sites = [self.site[qarg[0] if isinstance(qarg, list) else qarg] for qarg in qargs]
+        first = min(sites)
+        last = max(sites)
+        left, right = self._environments()
+
+        # Environment with open ket and bra indices of the kept sites (in chain order), then the ket and bra bonds
+        environment = left[first]
+        kept = 0
+        for index in range(first, last + 1):
+            tensor = self.tensors[index]
+            environment = numpy.tensordot(environment, tensor, axes=(-2, 0))
+            environment = numpy.tensordot(environment, tensor.conj(), axes=(2 * kept, 0))
+            if index in sites:
+                # (kets, bras, site ket, ket bond, site bra, bra bond) -> (kets, site ket, bras, site bra, bonds)
+                environment = numpy.moveaxis(environment, [2 * kept, 2 * kept + 2], [kept, 2 * kept + 1])
+                kept += 1
+            else:
+                environment = numpy.trace(environment, axis1=2 * kept, axis2=2 * kept + 2)
+
+        density = numpy.tensordot(environment, right[last + 1], axes=([-2, -1], [0, 1]))
+
+        # Order the kets and bras most significant first
+        chain = sorted(sites)
+        order = [chain.index(site) for site in reversed(sites)]
+        density = numpy.transpose(density, order + [kept + axis for axis in order])
+
+        dims = [self.tensors[site].shape[1] for site in sites]
+        size = int(numpy.prod(dims))
+        return DensityMatrix(density.reshape(size, size), dims=dims)
+
+    def statevector(self, qubit_encoded: bool = True):
+        """Contract the MPS to a Qiskit Statevector ordered as the circuit qubits, only feasible for small circuits
+
+        Args:
+            qubit_encoded (bool, optional): True to pad qumodes to their qubit encoding, False to keep subsystems
+                                            with the exact qumode cutoff dimensions. Defaults to True.
+
+        Returns:
+            Statevector: state vector
+        """
+        simulator = c2qa.native.NativeSimulator(self.circuit)
+
+        tensor = self.tensors[0]
+        for index in range(1, len(self.tensors)):
+            tensor = numpy.tensordot(tensor, self.tensors[index], axes=(-1, 0))
+        tensor = tensor.reshape(self.dims)
+
+        # Reorder the chain's sites as the native simulator's axes
+        order = [self.site[group[0]] for group in simulator.groups]
+        return simulator.statevector(numpy.transpose(tensor, order), qubit_encoded)
+
+    def _environments(self):
+        """Contractions of the sites left of each site and right of each site with their conjugates"""
+        left = [numpy.ones((1, 1))]
+        for tensor in self.tensors:
+            left.append(numpy.einsum("ab,asc,bsd->cd", left[-1], tensor, tensor.conj()))
+
+        right = [numpy.ones((1, 1))]
+        for tensor in reversed(self.tensors):
+            right.append(numpy.einsum("asc,bsd,cd->ab", tensor, tensor.conj(), right[-1]))
+
+        return left, right[::-1]
+
+    @staticmethod
+    def _truncate(s, max_bond_dimension, truncation_error) -> int:
+        """Number of singular values kept within the bond dimension and discarded weight limits"""
+        weights = s ** 2
+        # discarded[k] is the relative weight discarded keeping k singular values
+        discarded = numpy.concatenate([numpy.cumsum(weights[::-1])[::-1], [0]]) / numpy.sum(weights)
+        keep = max(1, int(numpy.argmax(discarded <= truncation_error)))
+
+        if max_bond_dimension:
+            keep = min(keep, max_bond_dimension)
+
+        return keep
+
+
+class MPSSimulator:
+    """Simulate a CVCircuit as a matrix product state"""
+
+    def __init__(self, circuit, max_bond_dimension: int = None, truncation_error: float = 1e-12, sites=None):
+        """Initialize MPSSimulator
+
+        Args:
+            circuit (CVCircuit): circuit to simulate
+            max_bond_dimension (int, optional): Maximum bond dimension. Defaults to None (no limit).
+            truncation_error (float, optional): Largest discarded weight of each SVD. Defaults to 1e-12.
+            sites (list, optional): qumodes (lists of qubits) and qubits in chain order, e.g. to place an ancilla qubit
+                                    between the qumodes it couples. Defaults to None (the circuit's qubit order).
+        """
+        self.circuit = circuit
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_error = truncation_error
+
+        cutoffs = {}
+        qumode_qubits = {}
+        for qmreg in circuit.qmregs:
+            for qumode in qmreg:
+                for qubit in qumode:
+                    qumode_qubits[qubit] = list(qumode)
+                    cutoffs[qubit] = qmreg.cutoff
+
+        if sites is None:
+            sites = []
+            for qubit in circuit.qubits:
+                if qubit not in qumode_qubits:
+                    sites.append(qubit)
+                elif qumode_qubits[qubit][0] == qubit:
+                    sites.append(qumode_qubits[qubit])
+
+        self.groups = [list(site) if isinstance(site, list) else [site] for site in sites]
+        if sorted(circuit.find_bit(qubit).index for group in self.groups for qubit in group) != list(range(circuit.num_qubits)):
+            raise ValueError("The sites must list every qumode and qubit of the circuit once.")
+
+        self.dims = [cutoffs.get(group[0], 2) for group in self.groups]
+        self.site = {qubit: index for index, group in enumerate(self.groups) for qubit in group}
+
+    def run(self):
+        """Simulate the circuit
+
+        Raises:
+            NotImplementedError: If an instruction isn't a unitary gate on whole qumodes and qubits, or an
+                                 Initialize instruction after gates on its qumode or qubit.
+
+        Returns:
+            MPSState: final state
+        """
+        tensors = []
+        for dim in self.dims:
+            tensor = numpy.zeros((1, dim, 1), dtype=complex)
+            tensor[0, 0, 0] = 1
+            tensors.append(tensor)
+        state = MPSState(tensors, self.groups, self.circuit)
+
+        touched = set()
+        for inst, qargs, _ in self.circuit.data:
+            if c2qa.native._ignored(inst):
+                continue
+            if inst.condition or inst.name in ("measure", "reset"):
+                raise NotImplementedError(f"Instruction {inst.name} is not supported by the MPS simulator")
+
+            sites = self._sites(qargs)
+            if inst.name == "initialize":
+                self._initialize(state, inst, sites, touched)
+            else:
+                state.apply(self._matrix(inst), sites, self.max_bond_dimension, self.truncation_error)
+            touched |= set(sites)
+
+        return state
+
+    def _sites(self, qargs):
+        """Site indices of the qargs in qargs order
+
+        Raises:
+            NotImplementedError: If the qargs contain some, but not all, of the qubits of a qumode
+        """
+        sites = []
+        index = 0
+        while index < len(qargs):
+            site = self.site[qargs[index]]
+            group = self.groups[site]
+            if list(qargs[index:index + len(group)]) != group:
+                raise NotImplementedError("Gates on a subset of the qubits of a qumode are not supported")
+            sites.append(site)
+            index += len(group)
+        return sites
+
+    def _initialize(self, state, op, sites, touched):
+        """Prepare the state of a single site before any gate acts on it"""
+        if len(sites) != 1 or sites[0] in touched:
+            raise NotImplementedError("Only qumodes and qubits not yet acted on can be initialized by the MPS simulator")
+
+        site = sites[0]
+        params = op.params
+        if len(params) == 1 and isinstance(params[0], str):
+            value = Statevector.from_label(params[0]).data
+        elif len(params) == 1:
+            value = Statevector.from_int(int(params[0]), 2 ** len(self.groups[site])).data
+        else:
+            value = numpy.asarray(params, dtype=complex)
+
+        # Truncate the qubit encoding to the qumode cutoff
+        truncated = value[:self.dims[site]]
+        if not numpy.isclose(numpy.linalg.norm(truncated), numpy.linalg.norm(value)):
+            raise ValueError(f"Instruction {op.name} prepares Fock states above the qumode cutoff")
+
+        state.tensors[site] = truncated.reshape(1, -1, 1)
+
+    def _matrix(self, op):
+        """Matrix of a gate on qumodes"""
+        if isinstance(op, ParameterizedUnitaryGate):
+            return op.operator()
+        elif isinstance(op, ControlledGate) or getattr(op, "cv_conditional", False):
+            return c2qa.fusion._matrix(op)
+
+        return Operator(op).data
+
+
+def simulate(circuit, max_bond_dimension: int = None, truncation_error: float = 1e-12, sites=None) -> MPSState:
+    """Simulate the circuit as a matrix product state
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+        max_bond_dimension (int, optional): Maximum bond dimension. Defaults to None (no limit).
+        truncation_error (float, optional): Largest discarded weight of each SVD. Defaults to 1e-12.
+        sites (list, optional): qumodes and qubits in chain order. Defaults to None (the circuit's qubit order).
+
+    Returns:
+        MPSState: final state
+    """
+    return MPSSimulator(circuit, max_bond_dimension, truncation_error, sites).run()
+
+
+def run(circuit, shots: int = 1024, **kwargs):
+    """Simulate the circuit as a matrix product state, returning its final state and result like c2qa.util.simulate()
+
+    The state stays a matrix product state, call MPSState.statevector() to contract it to a dense state vector. The
+    result holds no state vector.
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+        shots (int, optional): Number of shots reported in the result. Defaults to 1024.
+        kwargs: max_bond_dimension, truncation_error and sites, see simulate()
+
+    Returns:
+        tuple: (MPSState, result) tuple from simulation
+    """
+    start = time.time()
+
+    state = simulate(circuit, **kwargs)
+
+    return state, c2qa.native.build_result(circuit, None, None, shots, time.time() - start, "c2qa_mps")
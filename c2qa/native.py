@@ -0,0 +1,668 @@
+"""Native NumPy Fock-space state vector simulation of CVCircuit, without transpiling the circuit for Aer."""
+import hashlib
+import json
+import os
+import time
+
+import numpy
+from qiskit.circuit import ClassicalRegister, ControlledGate
+from qiskit.qobj import QobjExperimentHeader
+from qiskit.quantum_info import Operator, Statevector
+from qiskit.result import Result
+from qiskit.result.models import ExperimentResult, ExperimentResultData
+import scipy.sparse
+import scipy.sparse.linalg
+
+from c2qa.operators import ParameterizedUnitaryGate
+
+
+def _ignored(op) -> bool:
+    """True if the instruction has no effect on the simulated state (save instructions are handled by run())"""
+    return op.name in ("barrier", "delay", "snapshot") or op.name.startswith("save_")
+
+
+class NativeSimulator:
+    """Simulate a CVCircuit on a state tensor shaped (cutoff,) * num_qumodes + (2,) * num_qubits.
+
+    Each gate is applied as a matrix (sparse for CV gates) to only the tensor axes of the qumodes and qubits it acts
+    on. Gates acting on some, but not all, of the qubits of a qumode are applied to the equivalent (2,) * num_qubits
+    view of the state.
+
+    Qumode axes are exactly the qumode register's cutoff, which need not be a power of 2. The state is only padded to
+    the qubit encoding to measure qubits and to return a qubit-encoded Statevector.
+
+    With krylov=True, CV gates with a sparse generator G (see ParameterizedUnitaryGate.generator()) are applied as
+    exp(G) |state> with scipy.sparse.linalg.expm_multiply, never building the gate's operator matrix.
+    """
+
+    def __init__(self, circuit, seed=None, data=None, krylov: bool = False):
+        """Initialize NativeSimulator
+
+        Args:
+            circuit (CVCircuit): circuit to simulate
+            seed (int, optional): Seed for sampling measurements and resets. Defaults to None.
+            data (list, optional): Instructions to simulate on the circuit's qumodes and qubits (e.g., the circuit
+                                   data after a transpiler pass). Defaults to None (the circuit's data).
+            krylov (bool, optional): True to apply CV gates from their sparse generators. Defaults to False.
+        """
+        self.circuit = circuit
+        self.data = circuit.data if data is None else data
+        self.rng = numpy.random.default_rng(seed)
+        self.krylov = krylov
+
+        # Qubits of each tensor axis (least significant first) and the axis dimension
+        self.groups = []
+        dims = []
+        for qmreg in circuit.qmregs:
+            for qumode in qmreg:
+                self.groups.append(list(qumode))
+                dims.append(qmreg.cutoff)
+
+        qumode_qubits = set(circuit.qumode_qubits)
+        for qubit in circuit.qubits:
+            if qubit not in qumode_qubits:
+                self.groups.append([qubit])
+                dims.append(2)
+
+        self.shape = tuple(dims)
+        self.encoded_shape = tuple(2 ** len(group) for group in self.groups)
+        self.axis = {qubit: axis for axis, group in enumerate(self.groups) for qubit in group}
+
+        # Equivalent view of the state with one axis per qubit, the qubits of each qumode most significant first
+        self.qubit_shape = ()
+        self.qubit_axis = {}
+        for group in self.groups:
+            for bit, qubit in enumerate(group):
+                self.qubit_axis[qubit] = len(self.qubit_shape) + len(group) - 1 - bit
+            self.qubit_shape += (2,) * len(group)
+
+    def run(
+        self,
+        shots: int = 1024,
+        conditional_state_vector: bool = False,
+        per_shot_state_vector: bool = False,
+        qubit_encoded: bool = True,
+    ):
+        """Simulate the circuit
+
+        Circuits measuring, resetting or re-initializing qubits before their last gate are simulated once per shot.
+        Otherwise the circuit is simulated once and final measurements are sampled from the resulting state.
+
+        Args:
+            shots (int, optional): Number of simulation shots. Defaults to 1024.
+            conditional_state_vector (bool, optional): Set to True to return a dictionary of final state vectors
+                                                       keyed by the classical memory value. Defaults to False.
+            per_shot_state_vector (bool, optional): Set to True to return a list of the final state vector of
+                                                    every shot. Defaults to False.
+            qubit_encoded (bool, optional): Set to False to return state vectors with the exact qumode cutoff
+                                            dimensions, instead of the qubit encoding. Defaults to True.
+
+        Returns:
+            tuple: (state, result) tuple from simulation, see c2qa.util.simulate()
+        """
+        start = time.time()
+
+        # Split off the final measurements (and barriers, saves, etc.) to sample them from the simulated state
+        data = self.data
+        terminal = len(data)
+        while terminal > 0 and (data[terminal - 1][0].name == "measure" or _ignored(data[terminal - 1][0])):
+            terminal -= 1
+        measurements = [(qargs[0], cargs[0]) for inst, qargs, cargs in data[terminal:] if inst.name == "measure"]
+
+        remeasured = len(set(qubit for qubit, _ in measurements)) != len(measurements)
+        if remeasured or self._has_stochastic(data[:terminal]):
+            states, memories = [], []
+            for _ in range(shots):
+                state, memory = self._run_shot()
+                states.append(state)
+                memories.append(memory)
+        else:
+            state, memory = self._run_instructions(self._initial_state(), data[:terminal], {})
+            states, memories = self._sample(state, memory, measurements, shots if measurements else 1)
+
+        keys = [self._memory_key(memory) for memory in memories]
+
+        if per_shot_state_vector:
+            state = [self.statevector(state, qubit_encoded) for state in states]
+        elif conditional_state_vector:
+            state = {key: self.statevector(state, qubit_encoded) for key, state in zip(keys, states)}
+        else:
+            state = self.statevector(states[-1], qubit_encoded)
+
+        counts = None
+        if self.circuit.num_clbits:
+            counts = {}
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+
+        return state, build_result(self.circuit, state, counts, shots, time.time() - start)
+
+    def statevector(self, state, qubit_encoded: bool = True):
+        """Convert the state tensor to a Qiskit Statevector, ordered as the circuit qubits
+
+        Args:
+            state (ndarray): state tensor
+            qubit_encoded (bool, optional): True to pad qumodes to their qubit encoding, False to keep subsystems
+                                            with the exact qumode cutoff dimensions. Defaults to True.
+
+        Returns:
+            Statevector: state vector
+        """
+        positions = [self.circuit.qubits.index(group[0]) for group in self.groups]
+        order = sorted(range(len(self.groups)), key=lambda axis: positions[axis], reverse=True)
+
+        if qubit_encoded:
+            state = self._encode(state)
+            dims = None
+        else:
+            # Qiskit lists subsystem dimensions least significant first
+            dims = [self.shape[axis] for axis in reversed(order)]
+
+        return Statevector(numpy.transpose(state, order).reshape(-1), dims=dims)
+
+    def apply(self, state, op, qargs, cargs=(), memory=None):
+        """Apply the instruction to the state tensor, returning the new state tensor
+
+        Args:
+            state (ndarray): state tensor
+            op (Instruction): instruction to apply
+            qargs (list): circuit qubits the instruction acts on
+            cargs (list, optional): circuit clbits the instruction acts on. Defaults to ().
+            memory (dict, optional): classical bit values, updated by measurements. Defaults to None.
+
+        Raises:
+            NotImplementedError: If the instruction can't be simulated (e.g., noise channels)
+
+        Returns:
+            ndarray: state tensor
+        """
+        if memory is None:
+            memory = {}
+
+        if op.condition and not self._condition(op.condition, memory):
+            return state
+
+        if _ignored(op):
+            return state
+        elif op.name == "measure":
+            state, memory[cargs[0]] = self._measure(state, qargs[0])
+            return state
+        elif op.name == "reset":
+            for qubit in qargs:
+                state = self._reset(state, qubit)
+            return state
+        elif op.name == "initialize":
+            return self._initialize(state, op, qargs)
+        elif isinstance(op, ParameterizedUnitaryGate):
+            generator = op.generator() if self.krylov else None
+            if generator is not None:
+                view, axes = self._view(state, qargs)
+                return _expm_multiply(view, generator, axes).reshape(self.shape)
+            return self._apply_matrix(state, op.operator(), qargs)
+        elif isinstance(op, ControlledGate):
+            return self._apply_controlled(state, op, qargs)
+        elif hasattr(op, "__array__"):
+            return self._apply_matrix(state, op.to_matrix(), qargs)
+        elif op.definition is not None:
+            definition = op.definition
+            qubits = dict(zip(definition.qubits, qargs))
+            clbits = dict(zip(definition.clbits, cargs))
+            for inst, inner_qargs, inner_cargs in definition.data:
+                state = self.apply(
+                    state, inst, [qubits[qubit] for qubit in inner_qargs], [clbits[clbit] for clbit in inner_cargs], memory
+                )
+            return state
+
+        raise NotImplementedError(f"Instruction {op.name} is not supported by the native simulator")
+
+    def _initial_state(self):
+        state = numpy.zeros(self.shape, dtype=complex)
+        state[(0,) * len(self.shape)] = 1
+        return state
+
+    def _run_shot(self):
+        return self._run_instructions(self._initial_state(), self.data, {})
+
+    def _run_instructions(self, state, data, memory):
+        memory = dict(memory)
+        for clbit in self.circuit.clbits:
+            memory.setdefault(clbit, 0)
+
+        for inst, qargs, cargs in data:
+            state = self.apply(state, inst, qargs, cargs, memory)
+
+        return state, memory
+
+    def _has_stochastic(self, data) -> bool:
+        """True if the instructions measure, reset, are classically conditioned or initialize qubits that earlier
+        instructions acted on (Initialize samples a reset outcome of such qubits), so each shot is simulated"""
+        touched = set()
+        for inst, qargs, _ in data:
+            if inst.name in ("measure", "reset") or inst.condition:
+                return True
+            if inst.name == "initialize" and touched.intersection(qargs):
+                return True
+            if not _ignored(inst):
+                touched.update(qargs)
+
+        return False
+
+    def _sample(self, state, memory, measurements, shots):
+        """Sample the final measurements, returning the collapsed state tensor and classical memory of each shot"""
+        if not measurements:
+            return [state] * shots, [memory] * shots
+
+        qubits = [qubit for qubit, _ in measurements]
+        axes = [self.qubit_axis[qubit] for qubit in qubits]
+
+        probabilities = numpy.abs(self._qubits(state)) ** 2
+        others = tuple(axis for axis in range(len(self.qubit_shape)) if axis not in axes)
+        marginal = numpy.transpose(numpy.sum(probabilities, axis=others, keepdims=True), others + tuple(axes))
+        marginal = marginal.reshape(-1)
+
+        outcomes = self.rng.choice(len(marginal), size=shots, p=marginal / numpy.sum(marginal))
+
+        collapsed = {}
+        states, memories = [], []
+        for outcome in outcomes:
+            # axes order is the order of the measured qubits, most significant first
+            bits = [(outcome >> (len(qubits) - 1 - index)) & 1 for index in range(len(qubits))]
+
+            if outcome not in collapsed:
+                shot_state = state
+                for qubit, bit in zip(qubits, bits):
+                    shot_state = self._collapse(shot_state, qubit, bit, bit)
+                collapsed[outcome] = shot_state
+
+            shot_memory = dict(memory)
+            for (_, clbit), bit in zip(measurements, bits):
+                shot_memory[clbit] = bit
+
+            states.append(collapsed[outcome])
+            memories.append(shot_memory)
+
+        return states, memories
+
+    def _memory_key(self, memory) -> str:
+        value = 0
+        for index, clbit in enumerate(self.circuit.clbits):
+            value |= memory.get(clbit, 0) << index
+        return hex(value)
+
+    def _condition(self, condition, memory) -> bool:
+        register, value = condition
+        if isinstance(register, ClassicalRegister):
+            return sum(memory.get(clbit, 0) << index for index, clbit in enumerate(register)) == value
+        return memory.get(register, 0) == value
+
+    def _axes(self, qargs):
+        """Tensor axes (least significant first) of the qargs, or None if qargs don't cover whole qumodes in order"""
+        axes = []
+        index = 0
+        while index < len(qargs):
+            axis = self.axis[qargs[index]]
+            group = self.groups[axis]
+            if list(qargs[index:index + len(group)]) != group:
+                return None
+            axes.append(axis)
+            index += len(group)
+        return axes
+
+    def _view(self, state, qargs):
+        """Return the state tensor (or its qubit view, if the qargs split a qumode) and the axes of the qargs"""
+        axes = self._axes(qargs)
+        if axes is not None:
+            return state, axes
+
+        if self.shape != self.encoded_shape:
+            raise NotImplementedError("Gates on a subset of the qubits of a qumode require a power of 2 cutoff")
+
+        return state.reshape(self.qubit_shape), [self.qubit_axis[qubit] for qubit in qargs]
+
+    def _encode(self, state):
+        """Pad the qumode axes of the state tensor to their qubit encoding"""
+        if self.shape == self.encoded_shape:
+            return state
+
+        encoded = numpy.zeros(self.encoded_shape, dtype=complex)
+        encoded[tuple(slice(0, dim) for dim in self.shape)] = state
+        return encoded
+
+    def _qubits(self, state):
+        """The qubit-encoded state tensor with one axis per qubit"""
+        return self._encode(state).reshape(self.qubit_shape)
+
+    def _fock(self, qubits):
+        """Inverse of _qubits(), dropping the padding beyond each qumode's cutoff"""
+        state = qubits.reshape(self.encoded_shape)
+        if self.shape == self.encoded_shape:
+            return state
+
+        return numpy.ascontiguousarray(state[tuple(slice(0, dim) for dim in self.shape)])
+
+    def _apply_matrix(self, state, matrix, qargs):
+        view, axes = self._view(state, qargs)
+        return _apply(view, matrix, axes).reshape(self.shape)
+
+    def _apply_controlled(self, state, op, qargs):
+        """Apply the base gate to the slice of the state tensor where the control qubits are in the control state"""
+        controls = qargs[:op.num_ctrl_qubits]
+        targets = qargs[op.num_ctrl_qubits:]
+
+        control_axes = self._axes(controls)
+        target_axes = self._axes(targets)
+        if control_axes is None or target_axes is None or any(self.shape[axis] != 2 for axis in control_axes):
+            return self._apply_matrix(state, Operator(op).data, qargs)
+
+        index = [slice(None)] * state.ndim
+        for bit, axis in enumerate(control_axes):
+            index[axis] = (op.ctrl_state >> bit) & 1
+        index = tuple(index)
+
+        # Axes of the targets once the control axes are indexed out
+        target_axes = [axis - sum(control < axis for control in control_axes) for axis in target_axes]
+
+        base_gate = op.base_gate
+        if isinstance(base_gate, ParameterizedUnitaryGate):
+            matrix = base_gate.operator()
+        else:
+            matrix = Operator(base_gate).data
+
+        state = state.copy()
+        state[index] = _apply(state[index], matrix, target_axes)
+        return state
+
+    def _measure(self, state, qubit):
+        """Measure the qubit, returning the collapsed state tensor and the measured bit"""
+        view = self._qubits(state)
+        one = numpy.take(view, 1, axis=self.qubit_axis[qubit])
+        probability = numpy.vdot(one, one).real
+
+        bit = int(self.rng.random() < probability)
+        return self._collapse(state, qubit, bit, bit), bit
+
+    def _reset(self, state, qubit):
+        """Measure the qubit and move the collapsed state to the qubit's 0 state"""
+        view = self._qubits(state)
+        one = numpy.take(view, 1, axis=self.qubit_axis[qubit])
+        probability = numpy.vdot(one, one).real
+
+        bit = int(self.rng.random() < probability)
+        return self._collapse(state, qubit, bit, 0)
+
+    def _collapse(self, state, qubit, bit: int, new_bit: int):
+        """Project the qubit onto the bit state, normalize, and relabel it as new_bit"""
+        view = self._qubits(state)
+        axis = self.qubit_axis[qubit]
+
+        selected = numpy.take(view, bit, axis=axis)
+        norm = numpy.linalg.norm(selected)
+
+        result = numpy.zeros_like(view)
+        index = [slice(None)] * view.ndim
+        index[axis] = new_bit
+        result[tuple(index)] = selected / norm
+
+        return self._fock(result)
+
+    def _initialize(self, state, op, qargs):
+        """Reset the qargs and prepare the Initialize instruction's state on them"""
+        params = op.params
+        if len(params) == 1 and isinstance(params[0], str):
+            value = Statevector.from_label(params[0]).data
+        elif len(params) == 1:
+            value = Statevector.from_int(int(params[0]), 2 ** len(qargs)).data
+        else:
+            value = numpy.asarray(params, dtype=complex)
+
+        view, axes = self._view(state, qargs)
+        front = list(range(len(axes)))
+
+        # Reset by sampling the basis state of the qargs, keeping the rest of the state for that outcome
+        moved = numpy.moveaxis(view, axes, front)
+        rest_shape = moved.shape[len(axes):]
+        flat = moved.reshape(-1, int(numpy.prod(rest_shape, dtype=int)))
+
+        probabilities = numpy.sum(numpy.abs(flat) ** 2, axis=1)
+        outcome = self.rng.choice(len(probabilities), p=probabilities / numpy.sum(probabilities))
+        rest = flat[outcome] / numpy.linalg.norm(flat[outcome])
+
+        # The value is qubit-encoded, most significant first. Truncate qumodes to their cutoff and order as axes.
+        encoded = [2 ** len(self.groups[axis]) if view is state else 2 for axis in axes]
+        value = numpy.transpose(value.reshape(encoded[::-1]))
+        truncated = value[tuple(slice(0, view.shape[axis]) for axis in axes)]
+        if not numpy.isclose(numpy.linalg.norm(truncated), numpy.linalg.norm(value)):
+            raise ValueError(f"Instruction {op.name} prepares Fock states above the qumode cutoff")
+
+        result = numpy.multiply.outer(truncated, rest.reshape(rest_shape))
+
+        return numpy.ascontiguousarray(numpy.moveaxis(result, front, axes)).reshape(self.shape)
+
+
+class SimulationSession:
+    """Simulate a growing CVCircuit incrementally, e.g. a Trotter evolution appending a layer of gates per time step.
+
+    The session keeps the last state tensor and classical memory, so each run() only applies the instructions
+    appended since the previous run(). With a checkpoint file, the state is saved after every run() and a new session
+    on the same circuit resumes from it (e.g., after a crash) instead of starting from the initial state.
+    """
+
+    def __init__(self, circuit, checkpoint: str = None, seed: int = None, krylov: bool = False):
+        """Initialize SimulationSession, resuming from the checkpoint file if it exists
+
+        Args:
+            circuit (CVCircuit): circuit to simulate, instructions may be appended between runs
+            checkpoint (str, optional): Path of the checkpoint file. Defaults to None (no checkpoints).
+            seed (int, optional): Seed for sampling measurements and resets. Defaults to None.
+            krylov (bool, optional): True to apply CV gates from their sparse generators, see NativeSimulator.
+                                     Defaults to False.
+        """
+        self.circuit = circuit
+        self.checkpoint = checkpoint
+        self.simulator = NativeSimulator(circuit, seed=seed, krylov=krylov)
+
+        self.state = self.simulator._initial_state()
+        self.memory = {clbit: 0 for clbit in circuit.clbits}
+        self.applied = 0
+        self._digest = hashlib.sha256()
+
+        if checkpoint and os.path.exists(checkpoint):
+            self.load(checkpoint)
+
+    def run(self, qubit_encoded: bool = True):
+        """Apply the instructions appended since the last run
+
+        Args:
+            qubit_encoded (bool, optional): Set to False to return the state vector with the exact qumode cutoff
+                                            dimensions, instead of the qubit encoding. Defaults to True.
+
+        Raises:
+            ValueError: If the circuit has fewer instructions than already simulated.
+
+        Returns:
+            tuple: (state, result) tuple from simulation, result counts hold the single simulated shot
+        """
+        start = time.time()
+
+        data = self.circuit.data
+        if len(data) < self.applied:
+            raise ValueError("The circuit has fewer instructions than the session already simulated.")
+
+        for inst, qargs, cargs in data[self.applied:]:
+            self.state = self.simulator.apply(self.state, inst, qargs, cargs, self.memory)
+            self._update_digest(self._digest, inst, qargs, cargs)
+        self.applied = len(data)
+
+        if self.checkpoint:
+            self.save(self.checkpoint)
+
+        state = self.simulator.statevector(self.state, qubit_encoded)
+        counts = {self.simulator._memory_key(self.memory): 1} if self.circuit.num_clbits else None
+        return state, build_result(self.circuit, state, counts, 1, time.time() - start)
+
+    def save(self, path: str):
+        """Write the state tensor, classical memory, number of simulated instructions and their hash to the file
+
+        The file is replaced atomically, so a crash while saving leaves the previous checkpoint intact.
+
+        Args:
+            path (str): checkpoint file path
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            numpy.savez(
+                file,
+                state=self.state,
+                memory=numpy.array([self.memory.get(clbit, 0) for clbit in self.circuit.clbits], dtype=int),
+                applied=self.applied,
+                digest=self._digest.hexdigest(),
+                rng=json.dumps(self.simulator.rng.bit_generator.state),
+            )
+        os.replace(temporary, path)
+
+    def load(self, path: str):
+        """Resume from a checkpoint file written by save()
+
+        Args:
+            path (str): checkpoint file path
+
+        Raises:
+            ValueError: If the checkpoint doesn't match the circuit (state shape or simulated instructions, compared
+                        by the hash of their names, parameters, qubits and clbits).
+        """
+        with numpy.load(path) as checkpoint:
+            state = checkpoint["state"]
+            memory = checkpoint["memory"]
+            applied = int(checkpoint["applied"])
+            expected = str(checkpoint["digest"])
+            rng = json.loads(str(checkpoint["rng"]))
+
+        if state.shape != self.simulator.shape or len(memory) != self.circuit.num_clbits:
+            raise ValueError(f"Checkpoint {path} doesn't match the circuit's qumodes, qubits and clbits.")
+
+        digest = hashlib.sha256()
+        for inst, qargs, cargs in self.circuit.data[:applied]:
+            self._update_digest(digest, inst, qargs, cargs)
+        if len(self.circuit.data) < applied or digest.hexdigest() != expected:
+            raise ValueError(f"Checkpoint {path} doesn't match the circuit's instructions.")
+
+        self.state = state
+        self.memory = dict(zip(self.circuit.clbits, (int(bit) for bit in memory)))
+        self.applied = applied
+        self._digest = digest
+        self.simulator.rng.bit_generator.state = rng
+
+    def _update_digest(self, digest, inst, qargs, cargs):
+        """Add the instruction's name, parameters, condition, qubits and clbits to the hash of simulated instructions"""
+        digest.update(inst.name.encode())
+        for param in inst.params:
+            try:
+                digest.update(numpy.asarray(param, dtype=complex).tobytes())
+            except (TypeError, ValueError):
+                digest.update(repr(param).encode())
+        digest.update(repr(inst.condition).encode())
+        # Qubit and clbit indices, separated by -1
+        bits = [self.circuit.find_bit(qubit).index for qubit in qargs] + [-1]
+        bits += [self.circuit.find_bit(clbit).index for clbit in cargs]
+        digest.update(numpy.array(bits, dtype=numpy.int64).tobytes())
+
+
+def simulate(
+    circuit,
+    shots: int = 1024,
+    conditional_state_vector: bool = False,
+    per_shot_state_vector: bool = False,
+    fusion_pass=None,
+    seed: int = None,
+    qubit_encoded: bool = True,
+    krylov: bool = False,
+):
+    """Simulate the circuit with the NativeSimulator.
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+        shots (int, optional): Number of simulation shots. Defaults to 1024.
+        conditional_state_vector (bool, optional): Set to True to return a dictionary of state vectors
+                                                   keyed by the classical memory value. Defaults to False.
+        per_shot_state_vector (bool, optional): Set to True to return a list of state vectors, one per shot. Defaults to False.
+        fusion_pass (CVGateFusionPass, optional): Pass merging adjacent CV gates into single unitary gates. Defaults to None.
+        seed (int, optional): Seed for sampling measurements and resets. Defaults to None.
+        qubit_encoded (bool, optional): Set to False to return state vectors with the exact qumode cutoff dimensions,
+                                        instead of the qubit encoding. Defaults to True.
+        krylov (bool, optional): Set to True to apply CV gates from their sparse generators with
+                                 scipy.sparse.linalg.expm_multiply instead of their operator matrices. Defaults to False.
+
+    Raises:
+        ValueError: If gate fusion is requested for a qumode cutoff that is not a power of 2.
+
+    Returns:
+        tuple: (state, result) tuple from simulation
+    """
+    data = None
+    if fusion_pass:
+        if any(qmreg.cutoff != 2 ** qmreg.num_qubits_per_qumode for qmreg in circuit.qmregs):
+            raise ValueError("Gate fusion requires qumode cutoffs that are a power of 2.")
+        data = fusion_pass(circuit).data
+
+    simulator = NativeSimulator(circuit, seed=seed, data=data, krylov=krylov)
+    return simulator.run(shots, conditional_state_vector, per_shot_state_vector, qubit_encoded)
+
+
+def build_result(circuit, state, counts, shots: int, time_taken: float, backend_name: str = "c2qa_native") -> Result:
+    """Build the Qiskit Result of a simulation by one of the c2qa simulators, like AerSimulator's results
+
+    Args:
+        circuit (CVCircuit): simulated circuit
+        state (Statevector, dict or list): final state vector(s), or None if the simulator keeps its own state
+        counts (dict): measurement counts, or None without measurements
+        shots (int): number of simulation shots
+        time_taken (float): simulation time in seconds
+        backend_name (str, optional): name of the simulator. Defaults to "c2qa_native".
+
+    Returns:
+        Result: simulation result
+    """
+    header = QobjExperimentHeader(
+        name=circuit.name,
+        n_qubits=circuit.num_qubits,
+        memory_slots=circuit.num_clbits,
+        creg_sizes=[[creg.name, creg.size] for creg in circuit.cregs],
+        qreg_sizes=[[qreg.name, qreg.size] for qreg in circuit.qregs],
+    )
+    data = ExperimentResultData(counts=counts, statevector=state)
+    experiment = ExperimentResult(shots, True, data, header=header, time_taken=time_taken)
+
+    return Result(
+        backend_name=backend_name,
+        backend_version="1.0",
+        qobj_id="",
+        job_id="",
+        success=True,
+        results=[experiment],
+        time_taken=time_taken,
+    )
+
+
+def _apply(state, matrix, axes):
+    """Multiply the (dense or sparse) matrix into the state tensor axes, given least significant first"""
+    return _apply_function(state, lambda block: matrix @ block, matrix.shape[1], axes)
+
+
+def _expm_multiply(state, generator, axes):
+    """Multiply exp(generator) into the state tensor axes, given least significant first, without building exp(generator)"""
+    generator = scipy.sparse.csc_matrix(generator, dtype=complex)
+    return _apply_function(state, lambda block: scipy.sparse.linalg.expm_multiply(generator, block), generator.shape[1], axes)
+
+
+def _apply_function(state, function, dimension: int, axes):
+    """Apply the linear function to the state tensor axes (with total dimension), given least significant first"""
+    reversed_axes = list(axes[::-1])
+    front = list(range(len(axes)))
+
+    moved = numpy.moveaxis(state, reversed_axes, front)
+    shape = moved.shape
+
+    result = function(moved.reshape(dimension, -1))
+    result = numpy.asarray(result).reshape(shape)
+
+    return numpy.ascontiguousarray(numpy.moveaxis(result, front, reversed_axes))
@@ -1,15 +1,21 @@
 import math
 from numbers import Complex
+import threading
 
 
 import numpy
 from qiskit import QuantumCircuit, QuantumRegister
-from qiskit.circuit import Gate
+from qiskit.circuit import ControlledGate, Gate
 from qiskit.circuit.parameter import ParameterExpression
+from qiskit.extensions.quantum_initializer.diagonal import DiagonalGate
 from qiskit.extensions.unitary import UnitaryGate
 import scipy.sparse
 import scipy.sparse.linalg
 
+import c2qa.cache
+import c2qa.linalg
+from c2qa.cache import lazy
+
 
 xQB = numpy.array([[0, 1], [1, 0]])
 yQB = numpy.array([[0, 1j], [-1j, 0]])
@@ -19,6 +25,21 @@ sigma_plus = numpy.array([[0, 1], [0, 0]])
 sigma_minus = numpy.array([[0, 0], [1, 0]])
 
 
+def diagonal(matrix):
+    """Return the diagonal of the given ndarray or SciPy sparse matrix if it is diagonal, otherwise None."""
+    if scipy.sparse.issparse(matrix):
+        coo = matrix.tocoo()
+        if numpy.any(coo.row != coo.col):
+            return None
+        return matrix.diagonal()
+
+    matrix = numpy.asarray(matrix)
+    phases = numpy.diagonal(matrix)
+    if numpy.count_nonzero(matrix - numpy.diag(phases)):
+        return None
+    return phases
+
+
 class ParameterizedUnitaryGate(Gate):
     """UnitaryGate sublcass that stores the operator matrix for later reference by animation utility."""
 
@@ -46,9 +67,41 @@ class ParameterizedUnitaryGate(Gate):
         self.duration = duration
         self.unit = unit
 
+        # (bound parameter values, dense matrix) of the last __array__() call. Copied and pickled with the gate.
+        self._matrix = None
+
     def __array__(self, dtype=None):
-        """Call the operator function to build the array using the bound parameter values."""
-        # return self.op_func(*map(complex, self.params)).toarray()
+        """Call the operator function to build the array using the bound parameter values.
+
+        The array is cached on the gate until the parameters are bound to different values. It is shared by all
+        callers (and copies of the gate) and must not be modified in place.
+        """
+        values = self.bound_values()
+        if self._matrix is None or self._matrix[0] != values:
+            self._matrix = (values, self.op_func(*values).toarray())
+
+        matrix = self._matrix[1]
+        if dtype is not None:
+            matrix = matrix.astype(dtype, copy=False)
+        return matrix
+
+    def operator(self):
+        """Call the operator function using the bound parameter values, returning its (sparse) operator matrix."""
+        return self.op_func(*self.bound_values())
+
+    def generator(self):
+        """Call the operator function's generator (e.g., CVOperators.d_generator for CVOperators.d) using the bound
+        parameter values, returning the sparse generator G of the operator exp(G), or None if there isn't one."""
+        ops = getattr(self.op_func, "__self__", None)
+        generator = getattr(ops, f"{getattr(self.op_func, '__name__', '')}_generator", None)
+        if generator is None:
+            return None
+
+        return generator(*self.bound_values())
+
+    def bound_values(self):
+        """Return the parameters as a tuple of values to pass to the operator function."""
+        # return tuple(map(complex, self.params))
         values = []
         for param in self.params:
             if isinstance(param, ParameterExpression):
@@ -59,23 +112,48 @@ class ParameterizedUnitaryGate(Gate):
                 values.append(complex(param))  # just cast everything to complex to avoid errors in Ubuntu/MacOS vs Windows
             else:
                 values.append(param)
-        values = tuple(values)
 
-        return self.op_func(*values).toarray()
+        return tuple(values)
 
+    def diagonal(self):
+        """Return the diagonal of the operator matrix if the matrix is diagonal, otherwise None."""
+        return diagonal(self.operator())
 
     def _define(self):
-        mat = self.to_matrix()
         q = QuantumRegister(self.num_qubits)
         qc = QuantumCircuit(q, name=self.name)
+
+        phases = self.diagonal()
+        if phases is not None and numpy.allclose(numpy.abs(phases), 1):
+            # Aer simulates diagonal gates with its diagonal kernel instead of a dense matrix-vector product
+            gate = DiagonalGate(phases.tolist())
+        else:
+            gate = UnitaryGate(self.to_matrix(), self.label)
+
         rules = [
-            (UnitaryGate(mat, self.label), [i for i in q], []),
+            (gate, [i for i in q], []),
         ]
         for instr, qargs, cargs in rules:
             qc._append(instr, qargs, cargs)
 
         self.definition = qc
 
+    def control(self, num_ctrl_qubits: int = 1, label=None, ctrl_state=None):
+        """Return the controlled version of the gate, defined by the exact controlled operator matrix.
+
+        Qiskit's generic add_control() decomposes the UnitaryGate definition into controlled basis gates, which isn't
+        exact for the multi-qubit unitaries of CV gates, see ControlledParameterizedUnitaryGate.
+
+        Args:
+            num_ctrl_qubits (int, optional): number of control qubits. Defaults to 1.
+            label (string, optional): Gate label. Defaults to None.
+            ctrl_state (int or str, optional): control state, see ControlledGate. Defaults to None (all ones).
+
+        Returns:
+            ControlledParameterizedUnitaryGate: controlled gate
+        """
+        return ControlledParameterizedUnitaryGate(self, num_ctrl_qubits, label, ctrl_state)
+
     def validate_parameter(self, parameter):
         """Gate parameters should be int, float, or ParameterExpression"""
         if isinstance(parameter, complex) or (isinstance(parameter, ParameterExpression) and not parameter.is_real()):
@@ -130,45 +208,304 @@ class ParameterizedUnitaryGate(Gate):
         return self.duration * fraction, self.unit
 
 
+class ControlledParameterizedUnitaryGate(ControlledGate):
+    """ParameterizedUnitaryGate controlled by qubits, defined by its exact controlled operator matrix (a UnitaryGate
+    simulated directly by Aer). The control qubits are the first (least significant) qubits."""
+
+    def __init__(self, base_gate: ParameterizedUnitaryGate, num_ctrl_qubits: int = 1, label=None, ctrl_state=None):
+        """Initialize ControlledParameterizedUnitaryGate
+
+        Args:
+            base_gate (ParameterizedUnitaryGate): gate to control
+            num_ctrl_qubits (int, optional): number of control qubits. Defaults to 1.
+            label (string, optional): Gate label. Defaults to None.
+            ctrl_state (int or str, optional): control state, see ControlledGate. Defaults to None (all ones).
+        """
+        super().__init__(
+            f"c{base_gate.name}",
+            base_gate.num_qubits + num_ctrl_qubits,
+            base_gate.params,
+            label=label,
+            num_ctrl_qubits=num_ctrl_qubits,
+            ctrl_state=ctrl_state,
+            base_gate=base_gate,
+        )
+
+    def _define(self):
+        # Definition for the closed control (all ones), ControlledGate adds X gates around it for other control states
+        projector = numpy.zeros((2 ** self.num_ctrl_qubits, 2 ** self.num_ctrl_qubits))
+        projector[-1, -1] = 1
+
+        base = self.base_gate.to_matrix()
+        matrix = numpy.kron(base, projector) + numpy.kron(numpy.eye(len(base)), numpy.eye(len(projector)) - projector)
+
+        q = QuantumRegister(self.num_qubits)
+        qc = QuantumCircuit(q, name=self.name)
+        qc._append(UnitaryGate(matrix, self.label), q[:], [])
+
+        self.definition = qc
+
+
 class CVOperators:
-    """Build operator matrices for continuously variable bosonic gates."""
+    """Build operator matrices for continuously variable bosonic gates.
+
+    Use CVOperators.shared() to get the instance shared by all circuits with the same cutoff. The matrices used
+    to build operators (a, a_dag, N, the two-qumode operators, etc.) are calculated on first access.
+
+    Two-qumode operators act on kron(first qumode, second qumode). The second qumode's cutoff may differ from
+    the first (see second_cutoff), so that qumodes with different cutoffs can interact.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
 
-    def __init__(self, cutoff: int, num_qumodes: int):
+    def __init__(self, cutoff: int, num_qumodes: int = 1, use_expm: bool = False, second_cutoff: int = None):
         """Initialize shared matrices used in building operators.
 
         Args:
             cutoff (int): qumode cutoff level
-            num_qumodes (int): number of qumodes being represented
+            num_qumodes (int, optional): number of qumodes being represented. Unused, the two-qumode matrices are built on first access. Defaults to 1.
+            use_expm (bool, optional): True to build every operator with scipy.sparse.linalg.expm instead of
+                                       the closed-form engine in c2qa.linalg (useful to check results). Defaults to False.
+            second_cutoff (int, optional): cutoff of the second qumode of the two-qumode operators (i.e., the second
+                                           kron factor, acting on the first qumode of a gate's qargs). Defaults to None (cutoff).
         """
-        # Annihilation operator
-        data = numpy.sqrt(range(cutoff))
-        self.a = scipy.sparse.spdiags(data=data, diags=[1], m=len(data), n=len(data))
+        self.cutoff_value = cutoff
+        self.second_cutoff = cutoff if second_cutoff is None else second_cutoff
+        self.use_expm = use_expm
+
+        # Eigen decompositions for the closed-form engine, calculated on first use
+        self._quadrature_eigensystem = None
+        self._squeezing_eigensystem = None
+        self._spectra = {}
+
+    @classmethod
+    def shared(cls, cutoff: int, use_expm: bool = False, second_cutoff: int = None):
+        """Return the CVOperators instance shared by all callers with the given cutoffs, creating it on first use.
+
+        Args:
+            cutoff (int): qumode cutoff level
+            use_expm (bool, optional): see CVOperators(). Defaults to False.
+            second_cutoff (int, optional): see CVOperators(). Defaults to None (cutoff).
 
-        # Creation operator
-        self.a_dag = self.a.conjugate().transpose()
+        Returns:
+            CVOperators: shared instance
+        """
+        if second_cutoff is None:
+            second_cutoff = cutoff
+
+        key = (cutoff, use_expm, second_cutoff)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls(cutoff, use_expm=use_expm, second_cutoff=second_cutoff)
+                cls._instances[key] = instance
+            return instance
+
+    def __reduce__(self):
+        """Unpickle (e.g., in process pools) as the receiving process' shared instance instead of copying the matrices."""
+        return (CVOperators.shared, (self.cutoff_value, self.use_expm, self.second_cutoff))
+
+    @lazy
+    def a(self):
+        """Annihilation operator"""
+        data = numpy.sqrt(range(self.cutoff_value))
+        return scipy.sparse.spdiags(data=data, diags=[1], m=len(data), n=len(data))
+
+    @lazy
+    def a_dag(self):
+        """Creation operator"""
+        return self.a.conjugate().transpose()
+
+    @lazy
+    def N(self):
+        """Number operator"""
+        # return scipy.sparse.matmul(self.a_dag, self.a)
+        return self.a_dag * self.a
+
+    @lazy
+    def eye(self):
+        return scipy.sparse.eye(self.cutoff_value)
+
+    # 2-qumodes operators, the second qumode may have a different cutoff
+    @lazy
+    def second_a(self):
+        """Annihilation operator of the second qumode"""
+        if self.second_cutoff == self.cutoff_value:
+            return self.a
+        data = numpy.sqrt(range(self.second_cutoff))
+        return scipy.sparse.spdiags(data=data, diags=[1], m=len(data), n=len(data))
+
+    @lazy
+    def a1(self):
+        return scipy.sparse.kron(self.a, scipy.sparse.eye(self.second_cutoff))
+
+    @lazy
+    def a2(self):
+        return scipy.sparse.kron(self.eye, self.second_a)
+
+    @lazy
+    def a1_dag(self):
+        return self.a1.conjugate().transpose()
+
+    @lazy
+    def a2_dag(self):
+        return self.a2.conjugate().transpose()
+
+    @lazy
+    def n1(self):
+        """Photon number of the first qumode (i.e., diagonal of kron(N, eye)) used to rotate and label two-qumode generators"""
+        return numpy.repeat(numpy.arange(self.cutoff_value), self.second_cutoff)
+
+    @lazy
+    def n2(self):
+        """Photon number of the second qumode (i.e., diagonal of kron(eye, N))"""
+        return numpy.tile(numpy.arange(self.second_cutoff), self.cutoff_value)
+
+    @lazy
+    def total_photons(self):
+        """Total photon number n1 + n2 of the two qumodes, conserved by beam splitters and used to label their generators"""
+        return self.n1 + self.n2
+
+    # For use with eSWAP
+    @lazy
+    def sparse_mat(self):
+        """SWAP permutation of two qumodes, mapping index i + (j * cutoff) to i * cutoff + j
+
+        Raises:
+            ValueError: If the qumodes have different cutoffs.
+        """
+        if self.second_cutoff != self.cutoff_value:
+            raise ValueError("SWAP requires qumodes with the same cutoff.")
 
-        # Number operator
-        # self.N = scipy.sparse.matmul(self.a_dag, self.a)
-        self.N = self.a_dag * self.a
+        cutoff = self.cutoff_value
+        j, i = numpy.divmod(numpy.arange(cutoff * cutoff), cutoff)
+        return scipy.sparse.csr_matrix((numpy.ones(cutoff * cutoff), (i + (j * cutoff), i * cutoff + j)))
 
-        self.eye = scipy.sparse.eye(cutoff)
+    @lazy
+    def mat(self):
+        """Dense SWAP permutation, see sparse_mat"""
+        return self.sparse_mat.toarray()
 
-        # 2-qumodes operators
-        if num_qumodes > 1:
-            self.a1 = scipy.sparse.kron(self.a, self.eye)
-            self.a2 = scipy.sparse.kron(self.eye, self.a)
-            self.a1_dag = self.a1.conjugate().transpose()
-            self.a2_dag = self.a2.conjugate().transpose()
+    @property
+    def cache_key(self):
+        """Key identifying the matrices built by this instance in the process-wide c2qa.cache operator cache."""
+        return (self.cutoff_value, self.use_expm, self.second_cutoff)
 
-        # For use with eSWAP
-        self.mat = numpy.zeros([cutoff * cutoff, cutoff * cutoff])
-        for j in range(cutoff):
-            for i in range(cutoff):
-                self.mat[i + (j * cutoff)][i * cutoff + j] = 1
-        self.sparse_mat = scipy.sparse.csr_matrix(self.mat)
+    @property
+    def quadrature_eigensystem(self):
+        """Eigen decomposition of the truncated (a + a_dag) used to build displacement operators."""
+        if self._quadrature_eigensystem is None:
+            self._quadrature_eigensystem = c2qa.linalg.quadrature_eigensystem(self.cutoff_value)
+        return self._quadrature_eigensystem
 
-        self.cutoff_value = cutoff
+    def spectrum(self, name: str, generator, labels=None):
+        """Spectral decomposition of a one-parameter gate generator, calculated once per instance (i.e., per cutoff).
+
+        Args:
+            name (str): name of the generator
+            generator (function): function returning the generator, only called on first use
+            labels (ndarray, optional): conserved quantity of each basis state, used to decompose the
+                                        generator sector by sector. Defaults to None.
 
+        Returns:
+            GeneratorSpectrum: cached spectral decomposition
+        """
+        spectrum = self._spectra.get(name)
+        if spectrum is None:
+            spectrum = c2qa.linalg.GeneratorSpectrum(generator(), labels)
+            self._spectra[name] = spectrum
+        return spectrum
+
+    def exp(self, name: str, generator, theta, labels=None):
+        """Build exp(theta * G) from the cached spectral decomposition of the named generator G.
+
+        Diagonal generators are exponentiated directly and returned as a sparse diagonal matrix.
+
+        Args:
+            name (str): name of the generator
+            generator (function): function returning the generator, only called on first use
+            theta (complex): generator coefficient
+            labels (ndarray, optional): conserved quantity of each basis state, see spectrum(). Defaults to None.
+
+        Returns:
+            csc_matrix: operator matrix
+        """
+        spectrum = self.spectrum(name, generator, labels)
+
+        if spectrum.diagonal:
+            return scipy.sparse.diags(numpy.exp(theta * spectrum.eigenvalues), format="csc")
+
+        return scipy.sparse.csc_matrix(spectrum.exp(theta))
+
+    def exp_controlled(self, name: str, generator, theta, labels=None):
+        """Build the qubit-controlled exp(theta * kron(zQB, M)) = blockdiag(exp(theta * M), exp(-theta * M)).
+
+        Only the cutoff-sized generator M is decomposed (and cached), see exp(). The blocks are assembled straight
+        from the spectral decomposition's arrays, without intermediate sparse copies.
+
+        Args:
+            name (str): name of the generator M
+            generator (function): function returning the generator M, only called on first use
+            theta (complex): generator coefficient
+            labels (ndarray, optional): conserved quantity of each basis state of M, see spectrum(). Defaults to None.
+
+        Returns:
+            csc_matrix: operator matrix
+        """
+        spectrum = self.spectrum(name, generator, labels)
+
+        if spectrum.diagonal:
+            phases = numpy.exp(numpy.multiply.outer([theta, -theta], spectrum.eigenvalues))
+            return scipy.sparse.diags(phases.reshape(-1), format="csc")
+
+        return self.controlled(spectrum.exp(theta), spectrum.exp(-theta))
+
+    def controlled(self, op_0, op_1):
+        """Assemble the qubit-controlled operator kron(|0><0|, op_0) + kron(|1><1|, op_1) block by block.
+
+        Sparse blocks are combined with scipy.sparse.bmat, dense blocks are copied once into the CSC arrays.
+
+        Args:
+            op_0 (ndarray or sparse matrix): operator applied for qubit state 0
+            op_1 (ndarray or sparse matrix): operator applied for qubit state 1
+
+        Returns:
+            csc_matrix: operator matrix
+        """
+        if scipy.sparse.issparse(op_0) or scipy.sparse.issparse(op_1):
+            return scipy.sparse.bmat([[op_0, None], [None, op_1]], format="csc")
+
+        # Column-major data of each dense block, with the row indices and column pointers of a full block
+        size_0 = op_0.shape[0]
+        size_1 = op_1.shape[0]
+        data = numpy.concatenate((op_0.ravel(order="F"), op_1.ravel(order="F")))
+        indices = numpy.concatenate((numpy.tile(numpy.arange(size_0), size_0), numpy.tile(numpy.arange(size_0, size_0 + size_1), size_1)))
+        indptr = numpy.concatenate((numpy.arange(size_0) * size_0, size_0 ** 2 + numpy.arange(size_1 + 1) * size_1))
+
+        return scipy.sparse.csc_matrix((data, indices, indptr), shape=(size_0 + size_1, size_0 + size_1))
+
+    @property
+    def schwinger_labels(self):
+        """Conserved sector of each basis state of the Schwinger gates.
+
+        The hopping terms kron(sigma_plus, sigma_minus, a1 * a2_dag) + h.c. conserve both n1 - q1 and n2 - q2,
+        where q1 and q2 are the states of the two qubits (q1 being the most significant).
+        """
+        dimension = self.cutoff_value * self.second_cutoff
+        q1 = numpy.repeat([0, 1], 2 * dimension)
+        q2 = numpy.tile(numpy.repeat([0, 1], dimension), 2)
+
+        return (numpy.tile(self.n1, 4) - q1 + 1) * (self.second_cutoff + 1) + (numpy.tile(self.n2, 4) - q2 + 1)
+
+    @property
+    def squeezing_eigensystem(self):
+        """Eigen decomposition of the truncated (a^2 + a_dag^2) / 2 used to build squeezing operators."""
+        if self._squeezing_eigensystem is None:
+            self._squeezing_eigensystem = c2qa.linalg.squeezing_eigensystem(self.cutoff_value)
+        return self._squeezing_eigensystem
+
+    @c2qa.cache.memoize
     def d(self, alpha):
         """Displacement operator
 
@@ -178,10 +515,12 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        arg = (alpha * self.a_dag) - (numpy.conjugate(alpha) * self.a)
+        if not self.use_expm:
+            return scipy.sparse.csc_matrix(c2qa.linalg.displacement(alpha, self.quadrature_eigensystem))
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.d_generator(alpha))
 
+    @c2qa.cache.memoize
     def cd(self, alpha, beta=None):
         """Displacement operator
 
@@ -192,14 +531,19 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        displace0 = (alpha * self.a_dag) - (numpy.conjugate(alpha) * self.a)
         if beta is None:
             beta = -alpha
+
+        if not self.use_expm:
+            return self.controlled(self.d(alpha), self.d(beta))
+
+        displace0 = (alpha * self.a_dag) - (numpy.conjugate(alpha) * self.a)
         displace1 = (beta * self.a_dag) - (numpy.conjugate(beta) * self.a)
 
 
         return scipy.sparse.kron((idQB+zQB)/2,scipy.sparse.linalg.expm(displace0)) + scipy.sparse.kron((idQB-zQB)/2,scipy.sparse.linalg.expm(displace1))
 
+    @c2qa.cache.memoize
     def ecd(self, alpha):
         """Displacement operator
 
@@ -209,29 +553,31 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        argm = (alpha * self.a_dag) - (numpy.conjugate(alpha) * self.a)
-        arg = scipy.sparse.kron(zQB, argm)/2
+        if not self.use_expm:
+            # exp(kron(zQB, argm) / 2) displaces by alpha / 2 for qubit state 0 and -alpha / 2 for qubit state 1
+            return self.controlled(self.d(alpha / 2), self.d(-alpha / 2))
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.ecd_generator(alpha))
 
+    @c2qa.cache.memoize
     def rh1(self, alpha):
-        a12dag = self.a1 * self.a2_dag
-        a1dag2 = self.a1_dag * self.a2
-
-        argm = 1j * alpha *(a1dag2 + a12dag)
-        arg = scipy.sparse.kron(zQB, argm)
+        if not self.use_expm:
+            return self.exp_controlled(
+                "rh1", lambda: 1j * (self.a1_dag * self.a2 + self.a1 * self.a2_dag), alpha, self.total_photons
+            )
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.rh1_generator(alpha))
 
+    @c2qa.cache.memoize
     def rh2(self, alpha):
-        a12dag = self.a1 * self.a2_dag
-        a1dag2 = self.a1_dag * self.a2
-
-        argm = alpha *(a12dag - a1dag2)
-        arg = scipy.sparse.kron(zQB, argm)
+        if not self.use_expm:
+            return self.exp_controlled(
+                "rh2", lambda: self.a1 * self.a2_dag - self.a1_dag * self.a2, alpha, self.total_photons
+            )
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.rh2_generator(alpha))
 
+    @c2qa.cache.memoize
     def s(self, zeta):
         """Single-mode squeezing operator
 
@@ -241,12 +587,12 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        a_sqr = self.a * self.a
-        a_dag_sqr = self.a_dag * self.a_dag
-        arg = 0.5 * ((numpy.conjugate(zeta) * a_sqr) - (zeta * a_dag_sqr))
+        if not self.use_expm:
+            return scipy.sparse.csc_matrix(c2qa.linalg.squeezing(zeta, self.squeezing_eigensystem))
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.s_generator(zeta))
 
+    @c2qa.cache.memoize
     def s2(self, g):
         """Two-mode squeezing operator
 
@@ -256,13 +602,15 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        a12_dag = self.a1_dag * self.a2_dag
-        a12 = self.a1 * self.a2
-
-        arg = (numpy.conjugate(g * 1j) * a12_dag) - (g * 1j * a12)
+        if not self.use_expm:
+            # With g = |g| * exp(i * phi), the generator is exp(-i * phi * N1) * |g| * G * exp(i * phi * N1)
+            g = complex(g)
+            result = c2qa.linalg.rotate(self._s2_spectrum().exp(abs(g)), self.n1, -numpy.angle(g))
+            return scipy.sparse.csc_matrix(result)
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.s2_generator(g))
 
+    @c2qa.cache.memoize
     def bs(self, theta):
         """Two-mode beam splitter
 
@@ -272,12 +620,23 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        a12dag = self.a1 * self.a2_dag
-        a1dag2 = self.a1_dag * self.a2
+        if not self.use_expm:
+            # With theta = |theta| * exp(i * phi), the generator is exp(i * phi * N1) * |theta| * G * exp(-i * phi * N1)
+            theta = complex(theta)
+            result = c2qa.linalg.rotate(self._bs_spectrum().exp(abs(theta)), self.n1, numpy.angle(theta))
+            return scipy.sparse.csc_matrix(result)
 
-        arg =  (theta * a1dag2 - numpy.conj(theta) * a12dag)
+        return scipy.sparse.linalg.expm(self.bs_generator(theta))
 
-        return scipy.sparse.linalg.expm(arg)
+    def _bs_spectrum(self):
+        """Spectral decomposition of the real beam splitter generator a1_dag * a2 - a1 * a2_dag"""
+        # Beam splitters conserve the total photon number n1 + n2
+        return self.spectrum("bs", lambda: self.a1_dag * self.a2 - self.a1 * self.a2_dag, self.total_photons)
+
+    def _s2_spectrum(self):
+        """Spectral decomposition of the two-mode squeezing generator -i * (a1_dag * a2_dag + a1 * a2)"""
+        # Two-mode squeezing conserves the photon number difference n1 - n2
+        return self.spectrum("s2", lambda: -1j * (self.a1_dag * self.a2_dag + self.a1 * self.a2), self.n1 - self.n2)
 
     # def bs(self, g):
     #     """Two-mode beam splitter
@@ -312,6 +671,7 @@ class CVOperators:
     #
     #     return scipy.sparse.linalg.expm(arg)
 
+    @c2qa.cache.memoize
     def cpbs(self, g):
         """Controlled phase two-mode beam splitter
 
@@ -321,15 +681,14 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
+        if not self.use_expm:
+            return self.exp_controlled(
+                "cpbs", lambda: self.a1_dag * self.a2 - self.a1 * self.a2_dag, g / 2, self.total_photons
+            )
 
-        a12dag = self.a1 * self.a2_dag
-        a1dag2 = self.a1_dag * self.a2
-
-        argm = (g / 2) * (a1dag2 - a12dag)
-        arg = scipy.sparse.kron(zQB, argm)
-
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.cpbs_generator(g))
 
+    @c2qa.cache.memoize
     def cpbs_z2vqe(self, g):
         """Controlled phase two-mode beam splitter
 
@@ -342,14 +701,14 @@ class CVOperators:
 
         # NOT CHANGED YET - this is a copy of the cpbs function.
 
-        a12dag = self.a1 * self.a2_dag
-        a1dag2 = self.a1_dag * self.a2
-
-        argm = (g / 2) * (a1dag2 - a12dag)
-        arg = scipy.sparse.kron(zQB, argm)
+        if not self.use_expm:
+            return self.exp_controlled(
+                "cpbs", lambda: self.a1_dag * self.a2 - self.a1 * self.a2_dag, g / 2, self.total_photons
+            )
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.cpbs_z2vqe_generator(g))
 
+    @c2qa.cache.memoize
     def r(self, theta):
         """Phase space rotation operator
 
@@ -359,10 +718,12 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        arg = 1j * theta * self.N
+        if not self.use_expm:
+            return self.exp("r", lambda: 1j * self.N, theta)
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.r_generator(theta))
 
+    @c2qa.cache.memoize
     def qubitDependentCavityRotation(self, theta):
         """Qubit dependent cavity rotation
 
@@ -372,10 +733,12 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        arg = theta * 1j * scipy.sparse.kron(zQB, self.N)
+        if not self.use_expm:
+            return self.exp_controlled("r", lambda: 1j * self.N, theta)
 
-        return scipy.sparse.linalg.expm(arg.tocsc())
+        return scipy.sparse.linalg.expm(self.qubitDependentCavityRotation_generator(theta))
 
+    @c2qa.cache.memoize
     def qubitDependentCavityRotationX(self, theta):
         """Qubit dependent cavity rotation
 
@@ -385,9 +748,12 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        arg = theta * 1j * scipy.sparse.kron(xQB, self.N)
-        return scipy.sparse.linalg.expm(arg.tocsc())
+        if not self.use_expm:
+            return self.exp("qdcrX", lambda: 1j * scipy.sparse.kron(xQB, self.N), theta)
+
+        return scipy.sparse.linalg.expm(self.qubitDependentCavityRotationX_generator(theta))
 
+    @c2qa.cache.memoize
     def qubitDependentCavityRotationY(self, theta):
         """Qubit dependent cavity rotation
 
@@ -397,9 +763,12 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        arg = theta * 1j * scipy.sparse.kron(yQB, self.N)
-        return scipy.sparse.linalg.expm(arg.tocsc())
+        if not self.use_expm:
+            return self.exp("qdcrY", lambda: 1j * scipy.sparse.kron(yQB, self.N), theta)
 
+        return scipy.sparse.linalg.expm(self.qubitDependentCavityRotationY_generator(theta))
+
+    @c2qa.cache.memoize
     def controlledparity(self, theta):
         """Controlled parity operator
         Rotates the mode if the state of the qubit is such that zQB doesn't give a phase
@@ -407,11 +776,12 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        arg1 = scipy.sparse.kron(zQB, self.N)
-        arg2 = scipy.sparse.kron(idQB, self.N)
-        arg = arg1 + arg2
-        return scipy.sparse.linalg.expm(1j * theta * arg)
+        if not self.use_expm:
+            return self.exp("controlledparity", lambda: self.controlledparity_generator(1), theta)
+
+        return scipy.sparse.linalg.expm(self.controlledparity_generator(theta))
 
+    @c2qa.cache.memoize
     def snap(self, theta, n):
         """SNAP (Selective Number-dependent Arbitrary Phase) operator
 
@@ -422,14 +792,14 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
+        if not self.use_expm:
+            phases = numpy.ones(self.cutoff_value, dtype=complex)
+            phases[int(n)] = numpy.exp(1j * theta)
+            return scipy.sparse.diags(phases, format="csc")
 
-        ket_n = numpy.zeros(self.cutoff_value)
-        ket_n[n] = 1
-        projector = numpy.outer(ket_n, ket_n)
-        sparse_projector = scipy.sparse.csr_matrix(projector)
-        arg = theta * 1j * sparse_projector
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.snap_generator(theta, n))
 
+    @c2qa.cache.memoize
     def eswap(self, theta):
         """Exponential SWAP
 
@@ -439,10 +809,14 @@ class CVOperators:
         Returns:
             ndarray: operator matrix
         """
-        arg = 1j * (theta / 2) * self.sparse_mat
+        if not self.use_expm:
+            # SWAP^2 = I, so exp(i * theta / 2 * SWAP) = cos(theta / 2) * I + i * sin(theta / 2) * SWAP
+            identity = scipy.sparse.eye(self.cutoff_value * self.second_cutoff, format="csc")
+            return numpy.cos(theta / 2) * identity + 1j * numpy.sin(theta / 2) * self.sparse_mat.tocsc()
 
-        return scipy.sparse.linalg.expm(arg)
+        return scipy.sparse.linalg.expm(self.eswap_generator(theta))
 
+    @c2qa.cache.memoize
     def photonNumberControlledQubitRotation(self, theta, n, qubit_rotation):
         """Photon Number Controlled Qubit Rotation operator
         Rotates the qubit if the mode has a set fock state.
@@ -513,41 +887,239 @@ class CVOperators:
     #     logU5 = arg1+arg2+arg3-arg4
     #     return scipy.sparse.linalg.expm(logU5)
 
+    @c2qa.cache.memoize
     def schwinger_U4(self, theta):
+        # The generator (Qiskit kronecker product convention) is only built when its spectrum is first computed
+        if not self.use_expm:
+            return self.exp("schwinger_U4", lambda: self.schwinger_U4_generator(1), theta, self.schwinger_labels)
 
-        a12dag = self.a1 * self.a2_dag
-        a1dag2 = self.a1_dag * self.a2
+        return scipy.sparse.linalg.expm(self.schwinger_U4_generator(theta))
 
-        # Qiskit kronecker product convention
-        arg1 = scipy.sparse.kron(sigma_plus, scipy.sparse.kron(sigma_minus, a12dag))
-        arg2 = scipy.sparse.kron(sigma_minus, scipy.sparse.kron(sigma_plus, a1dag2))
+    @c2qa.cache.memoize
+    def schwinger_U5(self, theta):
+        # The generator (Qiskit kronecker product convention) is only built when its spectrum is first computed
+        if not self.use_expm:
+            return self.exp("schwinger_U5", lambda: self.schwinger_U5_generator(1), theta, self.schwinger_labels)
 
-        # Qutip kronecker product convention
-        # arg1 = scipy.sparse.kron(sigma_minus, scipy.sparse.kron(sigma_plus, a12dag))
-        # arg2 = scipy.sparse.kron(sigma_plus, scipy.sparse.kron(sigma_minus, a1dag2))
+        return scipy.sparse.linalg.expm(self.schwinger_U5_generator(theta))
 
-        logU4 = 1j*theta*(arg1+arg2)
-        return scipy.sparse.linalg.expm(logU4)
+    @c2qa.cache.memoize
+    def testqubitorderf(self, phi):
 
-    def schwinger_U5(self, theta):
+        return scipy.sparse.linalg.expm(self.testqubitorderf_generator(phi))
 
-        a12dag = self.a1 * self.a2_dag
-        a1dag2 = self.a1_dag * self.a2
+    # Sparse generators G of the gate operators exp(G), e.g. to apply the gates with scipy.sparse.linalg.expm_multiply
+    # instead of building the operator matrices (see ParameterizedUnitaryGate.generator()). Named <gate>_generator.
 
-        # Qiskit kronecker product convention
-        arg1 = scipy.sparse.kron(sigma_plus, scipy.sparse.kron(sigma_minus, a12dag))
-        arg2 = scipy.sparse.kron(sigma_minus, scipy.sparse.kron(sigma_plus, a1dag2))
+    def d_generator(self, alpha):
+        """Generator of the displacement operator d(alpha)"""
+        return (alpha * self.a_dag) - (numpy.conjugate(alpha) * self.a)
 
-        # Qutip kronecker product convention
-        # arg1 = scipy.sparse.kron(sigma_minus, scipy.sparse.kron(sigma_plus, a12dag))
-        # arg2 = scipy.sparse.kron(sigma_plus, scipy.sparse.kron(sigma_minus, a1dag2))
+    def cd_generator(self, alpha, beta=None):
+        """Generator of the conditional displacement operator cd(alpha, beta)"""
+        if beta is None:
+            beta = -alpha
+        return scipy.sparse.block_diag((self.d_generator(alpha), self.d_generator(beta)), format="csc")
 
-        logU5 = -theta*(arg1-arg2)
-        return scipy.sparse.linalg.expm(logU5)
+    def ecd_generator(self, alpha):
+        """Generator of the echoed conditional displacement operator ecd(alpha)"""
+        return scipy.sparse.kron(zQB, self.d_generator(alpha)) / 2
 
-    def testqubitorderf(self, phi):
+    def rh1_generator(self, alpha):
+        """Generator of the rh1(alpha) operator"""
+        return scipy.sparse.kron(zQB, 1j * alpha * (self.a1_dag * self.a2 + self.a1 * self.a2_dag))
 
-        arg = 1j*phi*scipy.sparse.kron(xQB, idQB)
-        return scipy.sparse.linalg.expm(arg)
+    def rh2_generator(self, alpha):
+        """Generator of the rh2(alpha) operator"""
+        return scipy.sparse.kron(zQB, alpha * (self.a1 * self.a2_dag - self.a1_dag * self.a2))
 
+    def s_generator(self, zeta):
+        """Generator of the single-mode squeezing operator s(zeta)"""
+        return 0.5 * ((numpy.conjugate(zeta) * (self.a * self.a)) - (zeta * (self.a_dag * self.a_dag)))
+
+    def s2_generator(self, g):
+        """Generator of the two-mode squeezing operator s2(g)"""
+        return (numpy.conjugate(g * 1j) * (self.a1_dag * self.a2_dag)) - (g * 1j * (self.a1 * self.a2))
+
+    def bs_generator(self, theta):
+        """Generator of the beam splitter operator bs(theta)"""
+        return theta * (self.a1_dag * self.a2) - numpy.conj(theta) * (self.a1 * self.a2_dag)
+
+    def cpbs_generator(self, g):
+        """Generator of the controlled phase beam splitter operator cpbs(g)"""
+        return scipy.sparse.kron(zQB, (g / 2) * (self.a1_dag * self.a2 - self.a1 * self.a2_dag))
+
+    def cpbs_z2vqe_generator(self, g):
+        """Generator of the cpbs_z2vqe(g) operator"""
+        return self.cpbs_generator(g)
+
+    def r_generator(self, theta):
+        """Generator of the phase space rotation operator r(theta)"""
+        return 1j * theta * self.N
+
+    def qubitDependentCavityRotation_generator(self, theta):
+        """Generator of the qubit dependent cavity rotation operator"""
+        return theta * 1j * scipy.sparse.kron(zQB, self.N, format="csc")
+
+    def qubitDependentCavityRotationX_generator(self, theta):
+        """Generator of the X qubit dependent cavity rotation operator"""
+        return theta * 1j * scipy.sparse.kron(xQB, self.N, format="csc")
+
+    def qubitDependentCavityRotationY_generator(self, theta):
+        """Generator of the Y qubit dependent cavity rotation operator"""
+        return theta * 1j * scipy.sparse.kron(yQB, self.N, format="csc")
+
+    def controlledparity_generator(self, theta):
+        """Generator of the controlled parity operator"""
+        return 1j * theta * (scipy.sparse.kron(zQB, self.N) + scipy.sparse.kron(idQB, self.N))
+
+    def snap_generator(self, theta, n):
+        """Generator of the SNAP operator snap(theta, n)"""
+        projector = scipy.sparse.csr_matrix(([1], ([int(n)], [int(n)])), shape=(self.cutoff_value, self.cutoff_value))
+        return theta * 1j * projector
+
+    def eswap_generator(self, theta):
+        """Generator of the exponential SWAP operator eswap(theta)"""
+        return 1j * (theta / 2) * self.sparse_mat
+
+    def schwinger_U4_generator(self, theta):
+        """Generator of the schwinger_U4(theta) operator"""
+        # Qiskit kronecker product convention, Qutip's swaps sigma_plus and sigma_minus
+        arg1 = scipy.sparse.kron(sigma_plus, scipy.sparse.kron(sigma_minus, self.a1 * self.a2_dag))
+        arg2 = scipy.sparse.kron(sigma_minus, scipy.sparse.kron(sigma_plus, self.a1_dag * self.a2))
+        return 1j * theta * (arg1 + arg2)
+
+    def schwinger_U5_generator(self, theta):
+        """Generator of the schwinger_U5(theta) operator"""
+        arg1 = scipy.sparse.kron(sigma_plus, scipy.sparse.kron(sigma_minus, self.a1 * self.a2_dag))
+        arg2 = scipy.sparse.kron(sigma_minus, scipy.sparse.kron(sigma_plus, self.a1_dag * self.a2))
+        return -theta * (arg1 - arg2)
+
+    def testqubitorderf_generator(self, phi):
+        return 1j * phi * scipy.sparse.kron(xQB, idQB)
+
+    def d_batch(self, alphas):
+        """Displacement operators for a sweep of parameters
+
+        Args:
+            alphas (array-like): 1-D array of displacements
+
+        Returns:
+            ndarray: stacked operator matrices with shape (len(alphas), cutoff, cutoff)
+        """
+        if self.use_expm:
+            return self._stack(self.d, alphas)
+
+        return c2qa.linalg.displacement_batch(alphas, self.quadrature_eigensystem)
+
+    def cd_batch(self, alphas, betas=None):
+        """Conditional displacement operators for a sweep of parameters
+
+        Args:
+            alphas (array-like): 1-D array of displacements for qubit state 0
+            betas (array-like): 1-D array of displacements for qubit state 1. If None, use -alphas.
 
+        Raises:
+            ValueError: If betas doesn't have the same length as alphas.
+
+        Returns:
+            ndarray: stacked operator matrices with shape (len(alphas), 2 * cutoff, 2 * cutoff)
+        """
+        alphas = c2qa.linalg.as_batch(alphas)
+        if betas is None:
+            betas = -alphas
+        elif len(c2qa.linalg.as_batch(betas)) != len(alphas):
+            raise ValueError(f"Expected one beta per alpha ({len(alphas)}), got {len(betas)}.")
+
+        return self._stack_conditional(self.d_batch(alphas), self.d_batch(betas))
+
+    def ecd_batch(self, alphas):
+        """Echoed conditional displacement operators for a sweep of parameters
+
+        Args:
+            alphas (array-like): 1-D array of displacements
+
+        Returns:
+            ndarray: stacked operator matrices with shape (len(alphas), 2 * cutoff, 2 * cutoff)
+        """
+        alphas = c2qa.linalg.as_batch(alphas)
+
+        return self._stack_conditional(self.d_batch(alphas / 2), self.d_batch(-alphas / 2))
+
+    def s_batch(self, zetas):
+        """Single-mode squeezing operators for a sweep of parameters
+
+        Args:
+            zetas (array-like): 1-D array of squeezes
+
+        Returns:
+            ndarray: stacked operator matrices with shape (len(zetas), cutoff, cutoff)
+        """
+        if self.use_expm:
+            return self._stack(self.s, zetas)
+
+        return c2qa.linalg.squeezing_batch(zetas, self.squeezing_eigensystem)
+
+    def r_batch(self, thetas):
+        """Phase space rotation operators for a sweep of parameters
+
+        Args:
+            thetas (array-like): 1-D array of rotations
+
+        Returns:
+            ndarray: stacked operator matrices with shape (len(thetas), cutoff, cutoff)
+        """
+        if self.use_expm:
+            return self._stack(self.r, thetas)
+
+        thetas = c2qa.linalg.as_batch(thetas)
+        photons = numpy.arange(self.cutoff_value)
+
+        result = numpy.zeros((len(thetas), self.cutoff_value, self.cutoff_value), dtype=complex)
+        result[:, photons, photons] = numpy.exp(1j * thetas[:, numpy.newaxis] * photons[numpy.newaxis, :])
+
+        return result
+
+    def bs_batch(self, thetas):
+        """Two-mode beam splitter operators for a sweep of parameters
+
+        Args:
+            thetas (array-like): 1-D array of beam splitter phases
+
+        Returns:
+            ndarray: stacked operator matrices with shape (len(thetas), cutoff * second_cutoff, cutoff * second_cutoff)
+        """
+        if self.use_expm:
+            return self._stack(self.bs, thetas)
+
+        thetas = c2qa.linalg.as_batch(thetas)
+        return c2qa.linalg.rotate_batch(self._bs_spectrum().exp_batch(numpy.abs(thetas)), self.n1, numpy.angle(thetas))
+
+    def s2_batch(self, gs):
+        """Two-mode squeezing operators for a sweep of parameters
+
+        Args:
+            gs (array-like): 1-D array of two-mode squeezes
+
+        Returns:
+            ndarray: stacked operator matrices with shape (len(gs), cutoff * second_cutoff, cutoff * second_cutoff)
+        """
+        if self.use_expm:
+            return self._stack(self.s2, gs)
+
+        gs = c2qa.linalg.as_batch(gs)
+        return c2qa.linalg.rotate_batch(self._s2_spectrum().exp_batch(numpy.abs(gs)), self.n1, -numpy.angle(gs))
+
+    def _stack(self, op, params):
+        """Stack the dense matrices of op for each of the batch parameters"""
+        return numpy.stack([op(param).toarray() for param in c2qa.linalg.as_batch(params)])
+
+    def _stack_conditional(self, ops_0, ops_1):
+        """Stack block diagonal matrices [[op_0, 0], [0, op_1]], i.e., op_0 for qubit state 0 and op_1 for qubit state 1"""
+        num, dim, _ = ops_0.shape
+
+        result = numpy.zeros((num, 2 * dim, 2 * dim), dtype=complex)
+        result[:, :dim, :dim] = ops_0
+        result[:, dim:, dim:] = ops_1
+
+        return result
@@ -8,19 +8,33 @@ class QumodeRegister:
     """
 
     def __init__(
-        self, num_qumodes: int, num_qubits_per_qumode: int = 2, name: str = None
+        self, num_qumodes: int, num_qubits_per_qumode: int = None, name: str = None, cutoff: int = None
     ):
         """Initialize QumodeRegister
 
         Args:
             num_qumodes (int): total number of qumodes
-            num_qubits_per_qumode (int, optional): Number of qubits representing each qumode. Defaults to 2.
+            num_qubits_per_qumode (int, optional): Number of qubits representing each qumode. Defaults to None
+                                                   (the fewest qubits encoding the cutoff, or 2 if no cutoff is given).
             name (str, optional): Name of register. Defaults to None.
+            cutoff (int, optional): Fock cutoff of each qumode, at most 2 ** num_qubits_per_qumode. Cutoffs that are
+                                    not a power of 2 can only be simulated with c2qa.util.simulate(method="native").
+                                    Defaults to None (2 ** num_qubits_per_qumode).
+
+        Raises:
+            ValueError: If the cutoff can't be encoded in num_qubits_per_qumode qubits.
         """
+        if num_qubits_per_qumode is None:
+            num_qubits_per_qumode = 2 if cutoff is None else max(1, (cutoff - 1).bit_length())
+        if cutoff is None:
+            cutoff = 2 ** num_qubits_per_qumode
+        elif cutoff < 1 or cutoff > 2 ** num_qubits_per_qumode:
+            raise ValueError(f"Cutoff {cutoff} can't be encoded in {num_qubits_per_qumode} qubits per qumode.")
+
         self.size = num_qumodes * num_qubits_per_qumode
         self.num_qumodes = num_qumodes
         self.num_qubits_per_qumode = num_qubits_per_qumode
-        self.cutoff = 2 ** self.num_qubits_per_qumode
+        self.cutoff = cutoff
 
         # Aggregate the QuantumRegister representing these qumodes as
         # extending the class confuses QisKit when overriding __getitem__().
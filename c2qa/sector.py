@@ -0,0 +1,455 @@
+"""Simulation of photon number conserving CVCircuit in the fixed total photon number sector of the initial state.
+
+Beam splitters, rotations, SNAP, eSWAP and their qubit-controlled versions conserve the total photon number of the
+qumodes. Starting from Fock states, the state of such circuits stays in a sector of fixed total photon number, which
+is exponentially smaller than the cutoff^qumodes Fock space (e.g., 12 qumodes holding 12 photons span 1.35 million
+Fock states instead of 16^12).
+"""
+import time
+
+import numpy
+from qiskit.circuit import ControlledGate
+from qiskit.quantum_info import Operator
+import scipy.sparse
+
+import c2qa.fusion
+import c2qa.native
+from c2qa.operators import ParameterizedUnitaryGate
+
+
+# Names of the CVCircuit gates conserving the total photon number of their qumodes (beam splitters, rotations, SNAP,
+# eSWAP and their qubit-controlled versions)
+PHOTON_CONSERVING_GATES = {"BS", "BSc", "CPBS", "R", "SNAP", "eSWAP", "QDCR", "QDCR_X", "QDCR_Y", "CP", "PNCQR"}
+
+
+class PhotonSector:
+    """Fock states of qumodes holding a fixed total number of photons, ranked with a combinatorial index.
+
+    count[k, s] is the number of ways qumodes k, k + 1, ... can hold s photons below their cutoffs. Fock states are
+    ranked in lexicographic order, so the rank of (n_0, ..., n_m-1) sums, for each qumode k, the number of states
+    with the same photons in qumodes 0..k-1 and fewer in qumode k: offsets[k, s_k, n_k] = sum_{v < n_k} count[k + 1, s_k - v],
+    where s_k are the photons left for qumodes k, k + 1, ...
+    """
+
+    def __init__(self, cutoffs, photons: int):
+        """Count the Fock states of the sector
+
+        Args:
+            cutoffs (list): cutoff of each qumode
+            photons (int): total photon number
+        """
+        self.cutoffs = list(cutoffs)
+        self.photons = photons
+
+        num_modes = len(self.cutoffs)
+        self.count = numpy.zeros((num_modes + 1, photons + 1), dtype=numpy.int64)
+        self.count[num_modes, 0] = 1
+
+        self.offsets = numpy.zeros((num_modes, photons + 1, photons + 1), dtype=numpy.int64)
+        for k in reversed(range(num_modes)):
+            for s in range(photons + 1):
+                for n in range(min(self.cutoffs[k] - 1, s) + 1):
+                    self.offsets[k, s, n] = self.count[k, s]
+                    self.count[k, s] += self.count[k + 1, s - n]
+
+        self.size = int(self.count[0, photons])
+
+    def rank(self, occupations):
+        """Index of each Fock state in the sector
+
+        Args:
+            occupations (ndarray): photon numbers with shape (..., num_modes), summing to the sector's photons
+
+        Returns:
+            ndarray: indices with shape occupations.shape[:-1]
+        """
+        occupations = numpy.asarray(occupations, dtype=numpy.int64)
+        left = self.photons - numpy.cumsum(occupations, axis=-1) + occupations
+
+        modes = numpy.arange(occupations.shape[-1])
+        return numpy.sum(self.offsets[modes, left, occupations], axis=-1)
+
+    def occupations(self):
+        """Photon numbers of every Fock state in the sector, in rank order
+
+        Returns:
+            ndarray: photon numbers with shape (size, num_modes)
+        """
+        states = numpy.zeros((1, 0), dtype=numpy.int16)
+        left = numpy.array([self.photons])
+
+        for k, cutoff in enumerate(self.cutoffs):
+            photons = numpy.arange(min(cutoff, self.photons + 1))
+            remaining = left[:, numpy.newaxis] - photons[numpy.newaxis, :]
+            valid = (remaining >= 0) & (self.count[k + 1, numpy.clip(remaining, 0, None)] > 0)
+
+            rows, columns = numpy.nonzero(valid)
+            states = numpy.column_stack([states[rows], photons[columns]]).astype(numpy.int16)
+            left = remaining[rows, columns]
+
+        return states
+
+
+class SectorState:
+    """State of the qumodes (in a PhotonSector) and the other qubits of a circuit"""
+
+    def __init__(self, sector: PhotonSector, data, circuit=None):
+        """Initialize SectorState
+
+        Args:
+            sector (PhotonSector): photon number sector of the qumodes
+            data (ndarray): amplitudes with shape (sector.size,) + (2,) * num_qubits, qubits least significant first
+            circuit (CVCircuit, optional): simulated circuit, needed by statevector(). Defaults to None.
+        """
+        self.sector = sector
+        self.data = data
+        self.circuit = circuit
+
+    def probabilities(self):
+        """Probability of each Fock state of the sector, in rank order"""
+        probabilities = numpy.abs(self.data) ** 2
+        return numpy.sum(probabilities.reshape(self.sector.size, -1), axis=1)
+
+    def mean_photon_numbers(self):
+        """Mean photon number of each qumode"""
+        return self.probabilities() @ self.sector.occupations()
+
+    def photon_number_distribution(self, mode: int):
+        """Photon number probabilities of a qumode
+
+        Args:
+            mode (int): qumode index
+
+        Returns:
+            ndarray: probability of each photon number below the qumode's cutoff
+        """
+        return numpy.bincount(
+            self.sector.occupations()[:, mode], weights=self.probabilities(), minlength=self.sector.cutoffs[mode]
+        )
+
+    def statevector(self, qubit_encoded: bool = True):
+        """Convert to a Qiskit Statevector ordered as the circuit qubits, only feasible for small circuits
+
+        Args:
+            qubit_encoded (bool, optional): True to pad qumodes to their qubit encoding, False to keep subsystems
+                                            with the exact qumode cutoff dimensions. Defaults to True.
+
+        Returns:
+            Statevector: state vector
+        """
+        simulator = c2qa.native.NativeSimulator(self.circuit)
+
+        num_modes = len(self.sector.cutoffs)
+        tensor = numpy.zeros(simulator.shape, dtype=complex)
+        tensor.reshape((-1,) + self.data.shape[1:])[
+            numpy.ravel_multi_index(self.sector.occupations().T, simulator.shape[:num_modes])
+        ] = self.data
+
+        return simulator.statevector(tensor, qubit_encoded)
+
+
+class SectorSimulator:
+    """Simulate a photon number conserving CVCircuit in the sector of its initial Fock state.
+
+    The state is stored as amplitudes of shape (sector size,) + (2,) * num_qubits. A gate on qumodes only couples
+    Fock states with the same photons in the other qumodes and the same total photons in the gate's qumodes, so
+    it is applied block by block: each block of the gate matrix (one per local photon number) multiplies the
+    amplitudes gathered by an index array of shape (groups, block size), computed once per qumode tuple.
+    """
+
+    def __init__(self, circuit):
+        """Initialize SectorSimulator
+
+        Args:
+            circuit (CVCircuit): circuit to simulate
+
+        Raises:
+            ValueError: If the qumodes aren't initialized to Fock states before the circuit's gates act on them.
+        """
+        self.circuit = circuit
+
+        # Qumode index of each qumode qubit, qumode qubits and cutoffs
+        self.mode = {}
+        self.groups = []
+        self.cutoffs = []
+        for qmreg in circuit.qmregs:
+            for qumode in qmreg:
+                for qubit in qumode:
+                    self.mode[qubit] = len(self.groups)
+                self.groups.append(list(qumode))
+                self.cutoffs.append(qmreg.cutoff)
+
+        self.qubits = [qubit for qubit in circuit.qubits if qubit not in self.mode]
+        self.qubit_axis = {qubit: axis + 1 for axis, qubit in enumerate(self.qubits)}
+
+        self.initial, self.data = self._initial_occupations()
+        self.sector = PhotonSector(self.cutoffs, int(numpy.sum(self.initial)))
+
+        self._indices = {}
+        self._occupations = None
+
+    def run(self):
+        """Simulate the circuit
+
+        Raises:
+            ValueError: If a gate doesn't conserve the total photon number of the qumodes.
+            NotImplementedError: If an instruction isn't a unitary gate on whole qumodes and qubits.
+
+        Returns:
+            SectorState: final state
+        """
+        state = numpy.zeros((self.sector.size,) + (2,) * len(self.qubits), dtype=complex)
+        state[(self.sector.rank(self.initial),) + (0,) * len(self.qubits)] = 1
+
+        for inst, qargs, _ in self.data:
+            state = self.apply(state, inst, qargs)
+
+        return SectorState(self.sector, state, self.circuit)
+
+    def apply(self, state, op, qargs):
+        """Apply the gate to the state amplitudes, returning the new amplitudes
+
+        Args:
+            state (ndarray): amplitudes
+            op (Instruction): gate to apply
+            qargs (list): circuit qubits the gate acts on
+
+        Returns:
+            ndarray: amplitudes
+        """
+        if c2qa.native._ignored(op):
+            return state
+        if op.condition or op.name in ("measure", "reset", "initialize"):
+            raise NotImplementedError(f"Instruction {op.name} is not supported by the photon number sector simulator")
+
+        modes, qubits = self._parse(qargs)
+        if not modes:
+            return c2qa.native._apply(state, Operator(op).data, [self.qubit_axis[qubit] for qubit in qubits])
+
+        matrix, mode_values, qubit_values, local_photons = self._gate_basis(op, qargs)
+
+        # Amplitudes with the gate's qubits (least significant first) as a single axis after the sector axis
+        axes = [self.qubit_axis[qubit] for qubit in qubits]
+        front = list(range(1, len(axes) + 1))
+        moved = numpy.moveaxis(state, axes[::-1], front)
+        view = moved.reshape((self.sector.size, 2 ** len(qubits), -1))
+
+        result = numpy.empty_like(view)
+        for photons in range(self.sector.photons + 1):
+            index = self._index(tuple(modes), photons)
+            if index is None:
+                continue
+
+            # Block of the gate matrix acting on the local Fock states with these photons (ordered as the index
+            # columns) for each state of the gate's qubits, i.e. block index = local Fock state + size * qubit state
+            local = numpy.flatnonzero(local_photons == photons)
+            local = local[numpy.lexsort((mode_values[local], qubit_values[local]))]
+            block = matrix[local][:, local].toarray()
+
+            groups, size = index.shape
+            gathered = view[index]  # (groups, size, qubit states, rest)
+            gathered = numpy.swapaxes(gathered, 1, 2).reshape(groups, -1, view.shape[2])
+            updated = numpy.einsum("ij,gjr->gir", block, gathered)
+            result[index] = numpy.swapaxes(updated.reshape(groups, -1, size, view.shape[2]), 1, 2)
+
+        return numpy.moveaxis(result.reshape(moved.shape), front, axes[::-1])
+
+    def _initial_occupations(self):
+        """Photons of each qumode prepared by the Initialize instructions before any gate, and the remaining instructions"""
+        occupations = numpy.zeros(len(self.groups), dtype=numpy.int64)
+        touched = set()
+
+        data = list(self.circuit.data)
+        remaining = []
+        for inst, qargs, cargs in data:
+            if inst.name != "initialize" or touched & set(qargs):
+                remaining.append((inst, qargs, cargs))
+                touched |= set(qargs)
+                continue
+
+            modes, qubits = self._parse(qargs)
+            value = numpy.asarray(inst.params, dtype=complex)
+            if qubits or len(modes) != 1 or len(value) == 1 or not numpy.isclose(numpy.max(numpy.abs(value)), 1):
+                raise ValueError("Qumodes must be initialized to Fock states (e.g., with cv_initialize).")
+
+            photons = int(numpy.argmax(numpy.abs(value)))
+            if photons >= self.cutoffs[modes[0]]:
+                raise ValueError("Qumode initialized above its cutoff.")
+            occupations[modes[0]] = photons
+
+        return occupations, remaining
+
+    def _parse(self, qargs):
+        """Split the qargs into qumodes and qubits, both in qargs order
+
+        Raises:
+            NotImplementedError: If the qargs contain some, but not all, of the qubits of a qumode
+        """
+        modes = []
+        qubits = []
+        index = 0
+        while index < len(qargs):
+            qubit = qargs[index]
+            if qubit not in self.mode:
+                qubits.append(qubit)
+                index += 1
+                continue
+
+            group = self.groups[self.mode[qubit]]
+            if list(qargs[index:index + len(group)]) != group:
+                raise NotImplementedError("Gates on a subset of the qubits of a qumode are not supported")
+            modes.append(self.mode[qubit])
+            index += len(group)
+
+        return modes, qubits
+
+    def _gate_basis(self, op, qargs):
+        """Matrix of a gate on qumodes and, for each basis state of the matrix, the index of the qumodes' Fock state
+        (the first qumode least significant), the index of the qubits' state and the total photons of the qumodes
+
+        Raises:
+            ValueError: If the gate doesn't conserve the total photon number of the qumodes.
+            NotImplementedError: If the matrix dimension doesn't match the qumode cutoffs.
+        """
+        # Dimension of each qarg group (whole qumode or qubit) in qargs order, least significant first
+        dims = []
+        is_mode = []
+        index = 0
+        while index < len(qargs):
+            if qargs[index] in self.mode:
+                mode = self.mode[qargs[index]]
+                dims.append(self.cutoffs[mode])
+                index += len(self.groups[mode])
+            else:
+                dims.append(2)
+                index += 1
+            is_mode.append(qargs[index - 1] in self.mode)
+
+        matrix = scipy.sparse.csr_matrix(self._matrix(op))
+        if matrix.shape[0] != numpy.prod(dims):
+            raise NotImplementedError(f"Instruction {op.name} matrix doesn't match the qumode cutoffs")
+
+        digits = numpy.unravel_index(numpy.arange(matrix.shape[0]), dims[::-1])[::-1]
+
+        mode_values = numpy.zeros(matrix.shape[0], dtype=numpy.int64)
+        qubit_values = numpy.zeros(matrix.shape[0], dtype=numpy.int64)
+        local_photons = numpy.zeros(matrix.shape[0], dtype=numpy.int64)
+        mode_scale = 1
+        qubit_scale = 1
+        for digit, dim, mode in zip(digits, dims, is_mode):
+            if mode:
+                mode_values += mode_scale * digit
+                local_photons += digit
+                mode_scale *= dim
+            else:
+                qubit_values += qubit_scale * digit
+                qubit_scale *= 2
+
+        coo = matrix.tocoo()
+        significant = numpy.abs(coo.data) > 1e-12
+        if numpy.any(local_photons[coo.row[significant]] != local_photons[coo.col[significant]]):
+            raise ValueError(f"Instruction {op.name} does not conserve the total photon number.")
+
+        return matrix, mode_values, qubit_values, local_photons
+
+    def _matrix(self, op):
+        """Matrix of a gate on qumodes"""
+        if isinstance(op, ParameterizedUnitaryGate):
+            return op.operator()
+        elif isinstance(op, ControlledGate) or getattr(op, "cv_conditional", False):
+            return c2qa.fusion._matrix(op)
+
+        return Operator(op).data
+
+    def _index(self, modes, photons: int):
+        """Sector index of the Fock states grouped by the photons of the other qumodes, with shape (groups, local states),
+        or None if the gate's qumodes can't hold the photons"""
+        key = (modes, photons)
+        if key not in self._indices:
+            self._indices[key] = self._build_index(list(modes), photons)
+        return self._indices[key]
+
+    def _build_index(self, modes, photons: int):
+        if self._occupations is None:
+            self._occupations = self.sector.occupations()
+
+        # Local Fock states of the gate's qumodes holding the photons, ordered by index (the first qumode least significant)
+        cutoffs = [self.cutoffs[mode] for mode in modes]
+        local = numpy.array(numpy.unravel_index(numpy.arange(numpy.prod(cutoffs)), cutoffs[::-1])[::-1]).T
+        local = local[numpy.sum(local, axis=1) == photons]
+        if len(local) == 0:
+            return None
+
+        # Groups are the sector states with the first local state, the others replace its photons
+        representatives = self._occupations[numpy.all(self._occupations[:, modes] == local[0], axis=1)]
+        if len(representatives) == 0:
+            return None
+
+        index = numpy.empty((len(representatives), len(local)), dtype=numpy.int64)
+        for column, occupation in enumerate(local):
+            states = representatives.copy()
+            states[:, modes] = occupation
+            index[:, column] = self.sector.rank(states)
+
+        return index
+
+
+def conserves_photon_number(circuit) -> bool:
+    """True if the circuit can be simulated in a fixed photon number sector: its qumodes are initialized to Fock states
+    and every gate acting on qumodes is one of the photon number conserving CVCircuit gates (PHOTON_CONSERVING_GATES)
+
+    The gates are recognized by name without building their matrices, SectorSimulator still checks each matrix.
+
+    Args:
+        circuit (CVCircuit): circuit to check
+
+    Returns:
+        bool: True if the circuit can be simulated with SectorSimulator
+    """
+    try:
+        simulator = SectorSimulator(circuit)
+        for inst, qargs, _ in simulator.data:
+            if c2qa.native._ignored(inst):
+                continue
+            if inst.condition or inst.name in ("measure", "reset", "initialize"):
+                return False
+
+            modes, _ = simulator._parse(qargs)
+            if modes and inst.name not in PHOTON_CONSERVING_GATES:
+                return False
+    except (ValueError, NotImplementedError):
+        return False
+
+    return True
+
+
+def simulate(circuit) -> SectorState:
+    """Simulate a photon number conserving circuit in the photon number sector of its initial Fock state
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+
+    Returns:
+        SectorState: final state
+    """
+    return SectorSimulator(circuit).run()
+
+
+def run(circuit, shots: int = 1024):
+    """Simulate a photon number conserving circuit, returning its final state and result like c2qa.util.simulate()
+
+    The state is kept in the photon number sector, call SectorState.statevector() for the full state vector. The
+    result holds no state vector.
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+        shots (int, optional): Number of shots reported in the result. Defaults to 1024.
+
+    Returns:
+        tuple: (SectorState, result) tuple from simulation
+    """
+    start = time.time()
+
+    state = simulate(circuit)
+
+    return state, c2qa.native.build_result(circuit, None, None, shots, time.time() - start, "c2qa_sector")
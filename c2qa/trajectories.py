@@ -0,0 +1,218 @@
+"""Monte-Carlo wave function (quantum trajectory) simulation of photon loss.
+
+Instead of simulating the PhotonLossNoisePass Kraus channels on a density matrix (squaring the memory), each
+trajectory evolves a pure state with the native simulator. After every instruction with a duration, one Kraus
+operator of the photon loss channel (see c2qa.kraus.photon_loss_kraus) is applied to each qumode the instruction acts
+on, sampled with its probability ||K_k |state>||^2 (i.e., k photons lost), and the state is normalized. Averaging
+observables over the trajectories converges to their values for the noisy density matrix.
+"""
+import math
+import multiprocessing
+
+import numpy
+from qiskit.quantum_info import DensityMatrix
+import scipy.stats
+
+import c2qa.kraus
+import c2qa.native
+import c2qa.util
+
+
+class TrajectoryEstimate:
+    """Mean of an observable (or Wigner function) over trajectories, with its confidence interval"""
+
+    def __init__(self, count: int, total, squares, confidence: float = 0.95):
+        """Estimate the mean and confidence interval from the sums of the samples and of their squares
+
+        Args:
+            count (int): number of trajectories
+            total (ndarray): sum of the samples
+            squares (ndarray): sum of the squared samples
+            confidence (float, optional): confidence level of the interval. Defaults to 0.95.
+        """
+        self.trajectories = count
+        self.confidence = confidence
+        self.mean = total / count
+
+        variance = numpy.zeros_like(self.mean)
+        if count > 1:
+            variance = numpy.maximum(squares - count * self.mean ** 2, 0) / (count - 1)
+
+        # Normal approximation of the sample mean's distribution
+        self.error = scipy.stats.norm.ppf((1 + confidence) / 2) * numpy.sqrt(variance / count)
+
+    @property
+    def lower(self):
+        """Lower bound of the confidence interval"""
+        return self.mean - self.error
+
+    @property
+    def upper(self):
+        """Upper bound of the confidence interval"""
+        return self.mean + self.error
+
+
+class TrajectorySimulator:
+    """Simulate quantum trajectories of a CVCircuit with photon loss on its qumodes"""
+
+    def __init__(self, circuit, photon_loss_rate, dt: float = None, seed=None):
+        """Initialize TrajectorySimulator
+
+        Args:
+            circuit (CVCircuit): circuit to simulate
+            photon_loss_rate (float or list): kappa, the rate of photon loss in Qiskit standard time units (seconds),
+                                              for all qumodes or one per qumode (in the order of the circuit's qumodes)
+            dt (float, optional): duration of a 'dt' time unit, for instructions with 'dt' durations. Defaults to None.
+            seed (int or SeedSequence, optional): Seed for sampling photon losses and measurements. Defaults to None.
+
+        Raises:
+            ValueError: If the number of rates doesn't match the qumodes.
+        """
+        self.circuit = circuit
+        self.dt = dt
+        self.simulator = c2qa.native.NativeSimulator(circuit, seed=seed)
+
+        num_qumodes = sum(qmreg.num_qumodes for qmreg in circuit.qmregs)
+        self.photon_loss_rates = c2qa.kraus._per_qumode(photon_loss_rate, num_qumodes)
+
+        self._kraus = {}
+
+    def run(self):
+        """Simulate one trajectory
+
+        Returns:
+            ndarray: final state tensor of the native simulator
+        """
+        state = self.simulator._initial_state()
+        memory = {clbit: 0 for clbit in self.circuit.clbits}
+
+        for inst, qargs, cargs in self.simulator.data:
+            state = self.simulator.apply(state, inst, qargs, cargs, memory)
+
+            duration = c2qa.kraus._duration(inst, self.dt)
+            if not duration:
+                continue
+
+            axes = []
+            for qubit in qargs:
+                axis = self.simulator.axis[qubit]
+                if axis < len(self.photon_loss_rates) and self.photon_loss_rates[axis] and axis not in axes:
+                    axes.append(axis)
+
+            for axis in axes:
+                operators = self._kraus_operators(self.photon_loss_rates[axis], duration, state.shape[axis])
+                state = self._jump(state, axis, operators)
+
+        return state
+
+    def _kraus_operators(self, photon_loss_rate: float, duration: float, cutoff: int):
+        key = (photon_loss_rate, duration, cutoff)
+        if key not in self._kraus:
+            self._kraus[key] = list(c2qa.kraus.photon_loss_kraus(photon_loss_rate, duration, cutoff))
+        return self._kraus[key]
+
+    def _jump(self, state, axis: int, operators):
+        """Apply one of the Kraus operators to the qumode axis, sampled with its probability, and normalize"""
+        sample = self.simulator.rng.random()
+
+        cumulative = 0
+        jump = state
+        for operator in operators:
+            result = c2qa.native._apply(state, operator, [axis])
+            probability = numpy.vdot(result, result).real
+            if probability <= 0:
+                continue
+
+            jump = result / math.sqrt(probability)
+            cumulative += probability
+            if sample < cumulative:
+                break
+
+        # Rounding may leave the sample above the total probability, keeping the last possible jump
+        return jump
+
+
+def simulate(
+    circuit,
+    photon_loss_rate,
+    trajectories: int = 100,
+    observables: dict = None,
+    wigner_qumode=None,
+    xvec=None,
+    confidence: float = 0.95,
+    processes: int = None,
+    seed: int = None,
+    dt: float = None,
+):
+    """Average observables and the Wigner function of a qumode over photon loss trajectories of the circuit
+
+    Args:
+        circuit (CVCircuit): circuit to simulate
+        photon_loss_rate (float or list): kappa, the rate of photon loss in Qiskit standard time units (seconds),
+                                          for all qumodes or one per qumode, see TrajectorySimulator
+        trajectories (int, optional): Number of trajectories. Defaults to 100.
+        observables (dict, optional): c2qa.evolution.Hamiltonian instances of the circuit keyed by name, whose
+                                      expectation values are averaged. Defaults to None.
+        wigner_qumode (list, optional): Qumode to average the Wigner function of. Defaults to None (no Wigner function).
+        xvec (ndarray, optional): x and p values of the Wigner function. Defaults to None (200 values from -6 to 6).
+        confidence (float, optional): confidence level of the intervals. Defaults to 0.95.
+        processes (int, optional): Number of parallel Python processes to start.
+                                   If None, perform serially in main process. Defaults to None.
+        seed (int, optional): Seed for sampling photon losses and measurements. Defaults to None.
+        dt (float, optional): duration of a 'dt' time unit, for instructions with 'dt' durations. Defaults to None.
+
+    Returns:
+        dict: TrajectoryEstimate keyed by observable name, and "wigner" for the Wigner function
+    """
+    if observables is None:
+        observables = {}
+    if wigner_qumode is not None and xvec is None:
+        xvec = numpy.linspace(-6, 6, 200)
+
+    if not processes or processes < 1:
+        processes = 1
+    chunks = min(processes, trajectories)
+
+    seeds = numpy.random.SeedSequence(seed).spawn(chunks)
+    sizes = [trajectories // chunks + (index < trajectories % chunks) for index in range(chunks)]
+    arguments = [
+        (circuit, photon_loss_rate, dt, observables, wigner_qumode, xvec, size, chunk_seed)
+        for size, chunk_seed in zip(sizes, seeds)
+    ]
+
+    if chunks == 1:
+        results = [_run_trajectories(*arguments[0])]
+    else:
+        with multiprocessing.Pool(chunks) as pool:
+            results = pool.starmap(_run_trajectories, arguments)
+
+    estimates = {}
+    for name in results[0][1]:
+        total = sum(result[1][name] for result in results)
+        squares = sum(result[2][name] for result in results)
+        estimates[name] = TrajectoryEstimate(trajectories, total, squares, confidence)
+
+    return estimates
+
+
+def _run_trajectories(circuit, photon_loss_rate, dt, observables, wigner_qumode, xvec, trajectories, seed):
+    """Simulate the trajectories, returning the number of trajectories and the sums of the samples and their squares"""
+    simulator = TrajectorySimulator(circuit, photon_loss_rate, dt, seed)
+
+    totals = {}
+    squares = {}
+    for _ in range(trajectories):
+        state = simulator.run()
+
+        samples = {name: observable.expectation(state) for name, observable in observables.items()}
+        if wigner_qumode is not None:
+            axis = simulator.simulator.axis[wigner_qumode[0]]
+            amplitudes = numpy.moveaxis(state, axis, 0).reshape(state.shape[axis], -1)
+            density_matrix = DensityMatrix(amplitudes @ amplitudes.conj().T)
+            samples["wigner"] = c2qa.util.wigner(density_matrix, state.shape[axis], xvec=xvec)
+
+        for name, sample in samples.items():
+            totals[name] = totals.get(name, 0) + sample
+            squares[name] = squares.get(name, 0) + numpy.square(sample)
+
+    return trajectories, totals, squares
@@ -5,6 +5,7 @@ import multiprocessing
 import os
 import pathlib
 from typing import List
+import warnings
 
 import matplotlib.animation
 import matplotlib.pyplot as plt
@@ -14,6 +15,12 @@ from qiskit.quantum_info import DensityMatrix, Statevector, partial_trace
 import scipy.stats
 
 from c2qa import CVCircuit
+import c2qa.evolution
+import c2qa.gaussian
+import c2qa.lindblad
+import c2qa.mps
+import c2qa.native
+import c2qa.sector
 
 from c2qa.operators import ParameterizedUnitaryGate
 
@@ -194,6 +201,8 @@ def simulate(
     conditional_state_vector: bool = False,
     per_shot_state_vector: bool = False,
     noise_pass = None,
+    fusion_pass = None,
+    method: str = "aer",
     **kwargs,
 ):
     """Convenience function to simulate using the given backend.
@@ -207,11 +216,94 @@ def simulate(
                                                should be added to the end of the circuit. Defaults to True.
         conditional_state_vector (bool, optional): Set to True if the saved state vector should be contional
                                                    (each state value gets its own state vector). Defaults to False.
+        fusion_pass (CVGateFusionPass, optional): Pass merging adjacent CV gates into single unitary gates, run after
+                                                  any noise pass. Defaults to None (no gate fusion).
+        method (str, optional): Simulator to use, the non-Aer methods don't support noise passes. Defaults to "aer".
+            "aer": transpile and simulate with AerSimulator, cutoffs must be powers of 2.
+            "native": c2qa.native.simulate(), passing through the keyword arguments seed, qubit_encoded and krylov.
+            "gaussian": c2qa.gaussian.run() for Gaussian circuits, exact amplitudes below the cutoff (opt-in only).
+            "sector": c2qa.sector.run() for photon number conserving circuits, returns a c2qa.sector.SectorState.
+            "mps": c2qa.mps.run() with max_bond_dimension, truncation_error and sites, returns a c2qa.mps.MPSState.
+            "lindblad": c2qa.lindblad.run() with photon_loss_rate, dephasing_rate, thermal_photons and dt, returns a
+                        DensityMatrix.
+            "auto": "sector" when possible (returning its state vector), "aer" otherwise.
 
     Returns:
         tuple: (state, result) tuple from simulation
     """
 
+    auto = method == "auto"
+    if auto:
+        # The Gaussian backend keeps exact Gaussian amplitudes instead of truncating the operators at the cutoff, so
+        # only the sector simulator (exact for photon number conserving gates) may replace Aer
+        plain = not (noise_pass or fusion_pass or conditional_state_vector or per_shot_state_vector)
+        if plain and c2qa.sector.conserves_photon_number(circuit):
+            method = "sector"
+        else:
+            method = "aer"
+
+    if method in ("gaussian", "sector", "mps", "lindblad", "native") and not add_save_statevector:
+        warnings.warn(f"Method {method} always returns the final state, add_save_statevector=False is ignored.", UserWarning)
+
+    if method == "gaussian":
+        if noise_pass or fusion_pass:
+            raise ValueError("The Gaussian backend does not support noise or fusion passes.")
+
+        return c2qa.gaussian.run(circuit, shots=shots, qubit_encoded=kwargs.get("qubit_encoded", True))
+    elif method == "sector":
+        if noise_pass or fusion_pass:
+            raise ValueError("The photon number sector simulator does not support noise or fusion passes.")
+
+        state, result = c2qa.sector.run(circuit, shots=shots)
+        if auto:
+            # "auto" stands in for Aer, so convert the sector state to a state vector
+            state = state.statevector(kwargs.get("qubit_encoded", True))
+        return state, result
+    elif method == "mps":
+        if noise_pass or fusion_pass:
+            raise ValueError("The MPS simulator does not support noise or fusion passes.")
+
+        return c2qa.mps.run(
+            circuit,
+            shots=shots,
+            max_bond_dimension=kwargs.get("max_bond_dimension"),
+            truncation_error=kwargs.get("truncation_error", 1e-12),
+            sites=kwargs.get("sites"),
+        )
+    elif method == "lindblad":
+        if noise_pass or fusion_pass:
+            raise ValueError("The Lindblad simulator integrates its own qumode noise, it does not support noise or fusion passes.")
+
+        return c2qa.lindblad.run(
+            circuit,
+            shots=shots,
+            photon_loss_rate=kwargs.get("photon_loss_rate", 0),
+            dephasing_rate=kwargs.get("dephasing_rate", 0),
+            thermal_photons=kwargs.get("thermal_photons", 0),
+            dt=kwargs.get("dt"),
+            qubit_encoded=kwargs.get("qubit_encoded", True),
+        )
+    elif method == "native":
+        if noise_pass:
+            raise ValueError("The native simulator does not support noise passes.")
+
+        return c2qa.native.simulate(
+            circuit,
+            shots=shots,
+            conditional_state_vector=conditional_state_vector,
+            per_shot_state_vector=per_shot_state_vector,
+            fusion_pass=fusion_pass,
+            seed=kwargs.get("seed"),
+            qubit_encoded=kwargs.get("qubit_encoded", True),
+            krylov=kwargs.get("krylov", False),
+        )
+    elif method != "aer":
+        raise ValueError(f"Unsupported simulation method {method}, use 'aer', 'native', 'gaussian', 'sector', 'mps', 'lindblad' or 'auto'.")
+
+    for qmreg in circuit.qmregs:
+        if qmreg.cutoff != 2 ** qmreg.num_qubits_per_qumode:
+            raise ValueError("Cutoffs that are not a power of 2 can only be simulated with method='native'.")
+
     # If this is false, the user must have already called save_statevector!
     if add_save_statevector:
         circuit.save_statevector(
@@ -224,6 +316,10 @@ def simulate(
     else:
         circuit_compiled = circuit
 
+    # Fuse CV gates, if requested
+    if fusion_pass:
+        circuit_compiled = fusion_pass(circuit_compiled)
+
     # Transpile for simulator
     simulator = qiskit.providers.aer.AerSimulator()
     circuit_compiled = qiskit.transpile(circuit_compiled, simulator)
@@ -254,6 +350,40 @@ def simulate(
     return state, result
 
 
+def evolve(
+    circuit: CVCircuit,
+    hamiltonian,
+    dt: float,
+    steps: int,
+    observables: dict = None,
+    method: str = "exact",
+    order: int = 2,
+    qubit_encoded: bool = True,
+):
+    """Evolve the state prepared by the circuit under a time-independent Hamiltonian, recording the expectation
+    values of observables after every time step.
+
+    Unlike appending Trotter steps to the circuit and simulating it again after each one, the state is stepped
+    directly, so the cost grows linearly with the number of steps. See c2qa.evolution.
+
+    Args:
+        circuit (CVCircuit): circuit preparing the initial state
+        hamiltonian (Hamiltonian): c2qa.evolution.Hamiltonian of the circuit's qumodes and qubits
+        dt (float): time step
+        steps (int): number of time steps
+        observables (dict, optional): c2qa.evolution.Hamiltonian instances keyed by name. Defaults to None.
+        method (str, optional): "exact" to propagate with scipy.sparse.linalg.expm_multiply or "trotter" to apply
+                                the exponential of each term in turn. Defaults to "exact".
+        order (int, optional): Trotter splitting order, 1 or 2. Defaults to 2.
+        qubit_encoded (bool, optional): Set to False to return the final state vector with the exact qumode cutoff
+                                        dimensions, instead of the qubit encoding. Defaults to True.
+
+    Returns:
+        tuple: (times, expectation values keyed by observable name, final state) tuple
+    """
+    return c2qa.evolution.evolve(circuit, hamiltonian, dt, steps, observables, method, order, qubit_encoded)
+
+
 def plot_wigner_projection(circuit: CVCircuit, qubit, file: str = None):
     """Plot the projection onto 0, 1, +, - for the given circuit.
 
@@ -757,6 +887,7 @@ def wigner(
         axes_max: int = 6,
         axes_steps: int = 200,
         hbar: int = 2,
+        xvec=None,
 ):
     """
     Calculate the Wigner function on the given state vector.
@@ -768,11 +899,14 @@ def wigner(
         axes_max (int, optional): Maximum axes plot value. Defaults to 6.
         axes_steps (int, optional): Steps between axes ticks. Defaults to 200.
         hbar (int, optional): hbar value to use in Wigner function calculation. Defaults to 2.
+        xvec (array-like, optional): Quadrature values of both axes, instead of axes_min, axes_max and axes_steps.
+                                     Defaults to None.
 
     Returns:
         array-like: Results of Wigner function calculation
     """
-    xvec = np.linspace(axes_min, axes_max, axes_steps)
+    if xvec is None:
+        xvec = np.linspace(axes_min, axes_max, axes_steps)
     return _wigner(state, xvec, xvec, cutoff, hbar)
 
 
@@ -0,0 +1,64 @@
+import c2qa
+from c2qa.cache import OperatorCache
+from c2qa.operators import CVOperators
+import numpy
+
+
+def test_hits_and_misses():
+    c2qa.cache.cache_clear()
+    ops = CVOperators(cutoff=4, num_qumodes=2)
+
+    first = ops.bs(0.5)
+    second = ops.bs(0.5 + 0j)
+    third = ops.bs(numpy.float64(0.5))
+
+    assert first is second
+    assert second is third
+
+    info = c2qa.cache.cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+    assert info.entries == 1
+
+
+def test_keyed_by_cutoff():
+    c2qa.cache.cache_clear()
+
+    small = CVOperators(cutoff=4, num_qumodes=1).d(0.5)
+    large = CVOperators(cutoff=8, num_qumodes=1).d(0.5)
+
+    assert small.shape != large.shape
+    assert c2qa.cache.cache_info().misses == 2
+
+
+def test_tolerance():
+    cache = OperatorCache(tolerance=1e-9)
+
+    assert cache.key("d", 4, [0.5 + 0.25j]) == cache.key("d", 4, [0.5 + 1e-12 + 0.25j])
+    assert cache.key("d", 4, [0.5]) != cache.key("d", 4, [0.5 + 1e-6])
+    assert cache.key("d", 4, [[0.5]]) is None
+
+
+def test_lru_eviction():
+    cache = OperatorCache(max_bytes=3 * 8 * 16)
+
+    for index in range(4):
+        cache.put(("op", index), numpy.zeros(16))
+
+    assert cache.get(("op", 0)) is None
+    assert cache.get(("op", 3)) is not None
+
+    info = cache.info()
+    assert info.entries == 3
+    assert info.evictions == 1
+    assert info.size_bytes <= info.max_bytes
+
+
+def test_disabled():
+    cache = OperatorCache(max_bytes=0)
+    ops = CVOperators(cutoff=4, num_qumodes=1)
+
+    func = cache.memoize(lambda ops, theta: ops.N * theta)
+
+    assert func(ops, 0.5) is not func(ops, 0.5)
+    assert cache.info().entries == 0
@@ -21,7 +21,46 @@ def test_only_qumoderegister():
 
 def test_multiple_qumoderegisters():
     with pytest.warns(UserWarning):
-        c2qa.CVCircuit(c2qa.QumodeRegister(1, 1), c2qa.QumodeRegister(1, 1))
+        c2qa.CVCircuit(c2qa.QumodeRegister(1, 1), c2qa.QumodeRegister(1, 2))
+
+
+def test_mixed_cutoffs(capsys):
+    with capsys.disabled():
+        qmr_large = c2qa.QumodeRegister(1, num_qubits_per_qumode=3)
+        qmr_small = c2qa.QumodeRegister(1, num_qubits_per_qumode=1)
+        qr = qiskit.QuantumRegister(1)
+        with pytest.warns(UserWarning):
+            circuit = c2qa.CVCircuit(qmr_large, qmr_small, qr)
+
+        assert circuit.get_qumode_cutoff(qmr_large[0]) == 8
+        assert circuit.get_qumode_cutoff(qmr_small[0]) == 2
+
+        circuit.cv_initialize(1, qmr_small[0])
+        circuit.cv_d(0.5, qmr_large[0])
+        circuit.h(qr[0])
+        circuit.cv_bs(0.4, qmr_large[0], qmr_small[0])
+        circuit.cv_cd(0.2, -0.3, qmr_small[0], qr[0])
+        circuit.cv_cnd_bs(0.3, -0.1, qr[0], qmr_small[0], qmr_large[0])
+
+        state, _ = c2qa.util.simulate(circuit)
+        native_state, _ = c2qa.util.simulate(circuit, method="native", qubit_encoded=False)
+
+        # Qubit, small qumode, large qumode from most to least significant
+        assert native_state.dims() == (8, 2, 2)
+        assert numpy.allclose(state.data, native_state.data)
+
+        # The beam splitter acts on kron(small qumode, large qumode)
+        partial = c2qa.CVCircuit(qmr_large, qmr_small)
+        partial.cv_initialize(1, qmr_small[0])
+        partial.cv_d(0.5, qmr_large[0])
+        partial.cv_bs(0.4, qmr_large[0], qmr_small[0])
+        partial_state, _ = c2qa.util.simulate(partial, method="native")
+
+        expected = numpy.zeros(16)
+        expected[8] = 1
+        expected = numpy.kron(numpy.eye(2), circuit.get_ops(qmr_large[0]).d(0.5).toarray()) @ expected
+        expected = circuit.get_ops(qmr_large[0], qmr_small[0]).bs(0.4).toarray() @ expected
+        assert numpy.allclose(partial_state.data, expected)
 
 
 def test_correct():
@@ -54,3 +93,22 @@ def test_with_initialize():
 
     state, result = c2qa.util.simulate(circuit)
     assert result.success
+
+
+def test_shared_operators():
+    circuit = c2qa.CVCircuit(c2qa.QumodeRegister(2, 2))
+    other = c2qa.CVCircuit(c2qa.QumodeRegister(1, 2))
+
+    assert circuit.ops is other.ops
+
+
+def test_conditional_definition():
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(1)
+    circuit = c2qa.CVCircuit(qmr, qr)
+    circuit.cv_cnd_bs(0.3, -0.1, qr[0], qmr[0], qmr[1])
+    inst = circuit.data[0][0]
+
+    # The controlled gates' definitions (simulated by Aer) match the exact block diagonal operator
+    definition = qiskit.quantum_info.Operator(qiskit.transpile(inst.definition, basis_gates=["unitary", "x"]))
+    assert numpy.allclose(definition.data, c2qa.fusion._matrix(inst))
@@ -0,0 +1,69 @@
+import c2qa
+from c2qa.evolution import Hamiltonian
+import numpy
+import pytest
+import qiskit
+
+
+def create_hamiltonian():
+    """Bose-Hubbard chain of 3 qumodes, with a qubit coupled to the first qumode"""
+    qmr = c2qa.QumodeRegister(3, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(1)
+    circuit = c2qa.CVCircuit(qmr, qr)
+    circuit.cv_initialize(2, qmr[0])
+    circuit.h(qr[0])
+
+    hamiltonian = Hamiltonian(circuit)
+    for index in range(2):
+        ops = circuit.get_ops(qmr[index], qmr[index + 1])
+        hamiltonian.add(ops.a1_dag * ops.a2 + ops.a1 * ops.a2_dag, qmr[index] + qmr[index + 1], -1)
+    for qumode in qmr:
+        ops = circuit.get_ops(qumode)
+        hamiltonian.add(ops.N * (ops.N - ops.eye), qumode, 0.25)
+    hamiltonian.add("X", [qr[0]], 0.3)
+    hamiltonian.add(numpy.kron(numpy.diag([1, -1]), circuit.ops.N.toarray()), qmr[0] + [qr[0]], 0.2)
+
+    observables = {f"n{index}": Hamiltonian(circuit).add(circuit.get_ops(qumode).N, qumode) for index, qumode in enumerate(qmr)}
+
+    return circuit, qmr, qr, hamiltonian, observables
+
+
+def test_exact(capsys):
+    with capsys.disabled():
+        circuit, _, _, hamiltonian, observables = create_hamiltonian()
+
+        times, expectations, state = c2qa.util.evolve(circuit, hamiltonian, 0.05, 40, observables)
+
+        assert numpy.allclose(times, numpy.arange(41) * 0.05)
+        assert numpy.isclose(expectations["n0"][0], 2)
+        # Hopping conserves the total photon number
+        assert numpy.allclose(expectations["n0"] + expectations["n1"] + expectations["n2"], 2)
+
+        # Same state as simulating the circuit with an appended evolution gate
+        circuit.cv_evolve(hamiltonian, 2.0)
+        expected, _ = c2qa.util.simulate(circuit)
+        assert numpy.isclose(abs(numpy.vdot(expected.data, state.data)), 1)
+
+
+def test_trotter():
+    circuit, _, _, hamiltonian, observables = create_hamiltonian()
+
+    _, exact, exact_state = c2qa.util.evolve(circuit, hamiltonian, 0.05, 40, observables)
+    _, first, first_state = c2qa.util.evolve(circuit, hamiltonian, 0.05, 40, observables, method="trotter", order=1)
+    _, second, second_state = c2qa.util.evolve(circuit, hamiltonian, 0.05, 40, observables, method="trotter")
+
+    first_error = 1 - abs(numpy.vdot(exact_state.data, first_state.data))
+    second_error = 1 - abs(numpy.vdot(exact_state.data, second_state.data))
+    assert second_error < first_error < 1e-2
+    assert numpy.allclose(exact["n1"], second["n1"], atol=1e-3)
+
+
+def test_invalid_terms():
+    circuit, qmr, qr, hamiltonian, _ = create_hamiltonian()
+
+    with pytest.raises(ValueError):
+        hamiltonian.add(circuit.ops.N, qmr[0][:1])
+    with pytest.raises(ValueError):
+        hamiltonian.add(circuit.ops.N, qmr[0] + [qr[0]])
+    with pytest.raises(ValueError):
+        c2qa.evolution.TimeEvolution(hamiltonian, None, method="euler")
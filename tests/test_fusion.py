@@ -0,0 +1,81 @@
+import c2qa
+import c2qa.fusion
+import numpy
+import qiskit
+from qiskit.quantum_info import Operator
+
+
+def create_circuit():
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(1)
+    circuit = c2qa.CVCircuit(qmr, qr)
+
+    circuit.cv_d(0.5, qmr[0])
+    circuit.cv_r(0.3, qmr[0])
+    circuit.h(qr[0])
+    circuit.cv_cd(0.2, -0.2, qmr[1], qr[0])
+    circuit.cv_bs(0.4, qmr[0], qmr[1])
+    circuit.cv_s(0.1, qmr[1])
+
+    return circuit, qmr, qr
+
+
+def test_fused_operator():
+    circuit, _, _ = create_circuit()
+
+    fused = c2qa.fusion.CVGateFusionPass(max_fused_qubits=5)(circuit)
+
+    assert len(fused.data) == 1
+    assert fused.data[0][0].name == "unitary"
+    assert Operator(fused).equiv(Operator(circuit))
+
+
+def test_max_fused_qubits():
+    circuit, _, _ = create_circuit()
+
+    fused = c2qa.fusion.CVGateFusionPass(max_fused_qubits=3)(circuit)
+
+    assert len(fused.data) > 1
+    assert all(len(qargs) <= 3 for inst, qargs, _ in fused.data if inst.name == "unitary")
+    assert Operator(fused).equiv(Operator(circuit))
+
+
+def test_parameterized_not_fused():
+    theta = qiskit.circuit.Parameter("theta")
+
+    qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+    circuit = c2qa.CVCircuit(qmr)
+    circuit.cv_d(0.5, qmr[0])
+    circuit.cv_r(theta, qmr[0])
+    circuit.cv_d(0.5, qmr[0])
+
+    fused = c2qa.fusion.CVGateFusionPass()(circuit)
+
+    assert [inst.name for inst, _, _ in fused.data] == ["D", "R", "D"]
+
+
+def test_simulate_fused(capsys):
+    with capsys.disabled():
+        circuit, _, _ = create_circuit()
+
+        state, result = c2qa.util.simulate(circuit)
+        fused_state, fused_result = c2qa.util.simulate(circuit, fusion_pass=c2qa.fusion.CVGateFusionPass())
+
+        assert result.success and fused_result.success
+        assert numpy.allclose(state.data, fused_state.data)
+
+
+def test_conditional_fused():
+    qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(1)
+    circuit = c2qa.CVCircuit(qmr, qr)
+
+    circuit.h(qr[0])
+    circuit.cv_cnd_d(0.3, -0.2, qr[0], qmr[0])
+    circuit.cv_r(0.4, qmr[0])
+    circuit.cv_cnd_s(0.1, 0.2, qr[0], qmr[0])
+
+    fused = c2qa.fusion.CVGateFusionPass()(circuit)
+
+    assert len(fused.data) == 1
+    assert Operator(fused).equiv(Operator(circuit))
@@ -0,0 +1,108 @@
+import c2qa
+import c2qa.gaussian
+import numpy
+import pytest
+import qiskit
+
+
+def create_circuit():
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=4)
+    circuit = c2qa.CVCircuit(qmr)
+
+    circuit.cv_initialize(0, qmr[0])
+    circuit.cv_d(0.4 + 0.2j, qmr[0])
+    circuit.cv_s(0.2 - 0.1j, qmr[0])
+    circuit.cv_bs(0.5 + 0.3j, qmr[0], qmr[1])
+    circuit.cv_r(0.7, qmr[1])
+    circuit.cv_s2(0.1 + 0.1j, qmr[1], qmr[0])
+    circuit.cv_d(-0.3j, qmr[1])
+
+    return circuit, qmr
+
+
+def test_is_gaussian():
+    circuit, qmr = create_circuit()
+    assert c2qa.gaussian.is_gaussian(circuit)
+
+    circuit.cv_snap(0.3, 1, qmr[0])
+    assert not c2qa.gaussian.is_gaussian(circuit)
+
+    circuit, qmr = create_circuit()
+    circuit.cv_initialize(1, qmr[1])
+    assert not c2qa.gaussian.is_gaussian(circuit)
+
+    with pytest.raises(ValueError):
+        c2qa.gaussian.simulate(circuit)
+
+
+def test_amplitudes(capsys):
+    with capsys.disabled():
+        circuit, _ = create_circuit()
+
+        fock_state, _ = c2qa.util.simulate(circuit, method="native")
+        gaussian_state, result = c2qa.util.simulate(circuit, method="gaussian")
+
+        assert result.success
+        # Fock simulation truncates the operators, compare the amplitudes far below the cutoff (including the global phase)
+        fock = fock_state.data.reshape(16, 16)[:6, :6]
+        gaussian = gaussian_state.data.reshape(16, 16)[:6, :6]
+        assert numpy.allclose(fock, gaussian, atol=1e-6)
+
+
+def test_auto(capsys):
+    with capsys.disabled():
+        # Gaussian circuits are truncated at the cutoff like Aer, the Gaussian backend is only used on request
+        qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+        circuit = c2qa.CVCircuit(qmr)
+        circuit.cv_d(1.5, qmr[0])
+
+        state, result = c2qa.util.simulate(circuit.copy(), method="auto")
+        expected, _ = c2qa.util.simulate(circuit.copy(), method="aer")
+        assert result.backend_name == "aer_simulator"
+        assert numpy.isclose(numpy.linalg.norm(state.data), 1)
+        assert numpy.allclose(state.data, expected.data)
+
+        gaussian, result = c2qa.util.simulate(circuit.copy(), method="gaussian")
+        assert result.backend_name == "c2qa_gaussian"
+        assert numpy.linalg.norm(gaussian.data) < 0.95
+
+        # Non-Gaussian circuits fall back on Aer
+        qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+        qr = qiskit.QuantumRegister(1)
+        circuit = c2qa.CVCircuit(qmr, qr)
+        circuit.cv_cd(0.2, -0.2, qmr[0], qr[0])
+        _, result = c2qa.util.simulate(circuit, method="auto")
+        assert result.backend_name == "aer_simulator"
+
+
+def test_ignored_save_statevector():
+    qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+    circuit = c2qa.CVCircuit(qmr)
+    circuit.cv_d(0.5, qmr[0])
+
+    with pytest.warns(UserWarning):
+        c2qa.util.simulate(circuit, add_save_statevector=False, method="gaussian")
+
+
+def test_photon_statistics():
+    circuit, _ = create_circuit()
+    state = c2qa.gaussian.simulate(circuit)
+
+    probabilities = state.fock_probabilities([30, 30])
+    assert numpy.isclose(numpy.sum(probabilities), 1)
+
+    photons = numpy.arange(30)
+    assert numpy.allclose(state.mean_photon_numbers(), [photons @ numpy.sum(probabilities, axis=1), photons @ numpy.sum(probabilities, axis=0)])
+
+
+def test_wigner():
+    qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=5)
+    circuit = c2qa.CVCircuit(qmr)
+    circuit.cv_d(1 - 0.5j, qmr[0])
+    circuit.cv_s(0.3j, qmr[0])
+
+    state = c2qa.gaussian.simulate(circuit)
+    xvec = numpy.linspace(-4, 4, 41)
+
+    fock = c2qa.util.wigner(state.fock_amplitudes([32]), 32, xvec=xvec)
+    assert numpy.allclose(state.wigner(0, xvec), fock, atol=1e-6)
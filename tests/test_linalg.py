@@ -0,0 +1,75 @@
+import random
+
+import c2qa.linalg
+import numpy
+import pytest
+import scipy.linalg
+import scipy.special
+
+
+def test_quadrature_eigenvalues():
+    cutoff = 10
+    eigenvalues, _ = c2qa.linalg.quadrature_eigensystem(cutoff)
+    roots, _ = scipy.special.roots_hermite(cutoff)
+
+    assert numpy.allclose(numpy.sort(eigenvalues), numpy.sqrt(2) * numpy.sort(roots))
+
+
+def test_squeezing_eigensystem():
+    cutoff = 7
+    eigenvalues, eigenvectors = c2qa.linalg.squeezing_eigensystem(cutoff)
+
+    a = numpy.diag(numpy.sqrt(numpy.arange(1, cutoff)), 1)
+    generator = (a @ a + a.T @ a.T) / 2
+
+    assert numpy.allclose(eigenvectors @ numpy.diag(eigenvalues) @ eigenvectors.T, generator)
+
+
+def test_spectrum_hermitian():
+    matrix = numpy.random.random((6, 6)) + 1j * numpy.random.random((6, 6))
+    generator = 1j * (matrix + matrix.conj().T)
+    spectrum = c2qa.linalg.GeneratorSpectrum(generator)
+
+    theta = random.random()
+    assert numpy.allclose(spectrum.exp(theta), scipy.linalg.expm(theta * generator))
+
+
+def test_spectrum_non_normal():
+    generator = numpy.triu(numpy.random.random((6, 6)))
+    spectrum = c2qa.linalg.GeneratorSpectrum(generator)
+
+    assert spectrum.triangular is not None
+
+    theta = complex(random.random(), random.random())
+    assert numpy.allclose(spectrum.exp(theta), scipy.linalg.expm(theta * generator))
+
+
+def test_rotate():
+    photons = numpy.arange(4)
+    matrix = numpy.random.random((4, 4))
+    angle = random.random()
+
+    rotation = numpy.diag(numpy.exp(1j * angle * photons))
+
+    assert numpy.allclose(c2qa.linalg.rotate(matrix, photons, angle), rotation @ matrix @ rotation.conj().T)
+
+
+def test_spectrum_sectors():
+    # Hopping between neighbouring sites conserves the number of particles, i.e., the popcount of the index
+    hopping = numpy.zeros((8, 8))
+    for index in range(8):
+        for bit in range(2):
+            if (index >> bit) & 3 == 1:
+                hopping[index, index ^ (3 << bit)] = hopping[index ^ (3 << bit), index] = 1
+    labels = [bin(index).count("1") for index in range(8)]
+
+    spectrum = c2qa.linalg.GeneratorSpectrum(1j * hopping, labels)
+    theta = random.random()
+
+    assert len(spectrum.blocks) == 4
+    assert numpy.allclose(spectrum.exp(theta).toarray(), scipy.linalg.expm(1j * theta * hopping))
+
+
+def test_spectrum_sectors_not_conserved():
+    with pytest.raises(ValueError):
+        c2qa.linalg.GeneratorSpectrum(numpy.ones((2, 2)), [0, 1])
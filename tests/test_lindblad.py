@@ -0,0 +1,80 @@
+import c2qa
+import c2qa.lindblad
+import numpy
+import pytest
+import qiskit
+from qiskit.quantum_info import DensityMatrix, partial_trace
+
+
+def test_unitary(capsys):
+    with capsys.disabled():
+        qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=2)
+        qr = qiskit.QuantumRegister(1)
+        circuit = c2qa.CVCircuit(qmr, qr)
+        circuit.cv_initialize(2, qmr[0])
+        circuit.h(qr[0])
+        circuit.cv_bs(0.4 + 0.2j, qmr[0], qmr[1])
+        circuit.cv_cd(0.2, -0.1, qmr[1], qr[0])
+        circuit.cx(qmr[0][0], qr[0])
+
+        # Without noise the density matrix is the native simulator's pure state
+        density_matrix = c2qa.lindblad.simulate(circuit)
+        state, _ = c2qa.util.simulate(circuit, method="native")
+        assert density_matrix == DensityMatrix(state)
+
+
+def test_photon_loss():
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=2)
+    circuit = c2qa.CVCircuit(qmr)
+    circuit.cv_initialize(3, qmr[0])
+    circuit.initialize(numpy.array([0, 1, 1, 0]) / numpy.sqrt(2), qmr[1])
+    circuit.cv_r(0.3, qmr[0])  # 100ns gate, kappa * t = 0.1 at a 1e6 loss rate
+    circuit.cv_r(0.2, qmr[1])
+
+    density_matrix = c2qa.lindblad.simulate(circuit, photon_loss_rate=[1e6, 0], dephasing_rate=[0, 1e6], qubit_encoded=False)
+
+    # Same as the photon loss Kraus channel
+    kraus = c2qa.kraus.photon_loss_kraus(1e6, 100e-9, 4)
+    expected = sum(operator[:, [3]] @ operator[:, [3]].T for operator in kraus)
+    assert numpy.allclose(partial_trace(density_matrix, [1]).data, expected)
+
+    # Dephasing decays the coherence of Fock states 1 and 2 by exp(-gamma * t / 2)
+    reduced = partial_trace(density_matrix, [0]).data
+    assert numpy.isclose(abs(reduced[1, 2]), 0.5 * numpy.exp(-0.05))
+    assert numpy.isclose(reduced[1, 1], 0.5)
+
+    # Same density matrix through c2qa.util.simulate()
+    state, result = c2qa.util.simulate(
+        circuit, method="lindblad", photon_loss_rate=[1e6, 0], dephasing_rate=[0, 1e6], qubit_encoded=False
+    )
+    assert result.backend_name == "c2qa_lindblad"
+    assert state == density_matrix
+
+    with pytest.raises(ValueError):
+        c2qa.lindblad.simulate(circuit, dephasing_rate=[1e6])
+
+
+def test_thermal():
+    qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=3)
+    circuit = c2qa.CVCircuit(qmr)
+
+    simulator = c2qa.lindblad.LindbladSimulator(circuit, photon_loss_rate=1, thermal_photons=0.2)
+    rho = simulator.evolve(simulator.run(), 20)
+
+    # Thermal state of the bath, truncated at the cutoff
+    photons = numpy.arange(8)
+    expected = 0.2 ** photons / 1.2 ** (photons + 1)
+    assert numpy.allclose(numpy.diag(simulator.density_matrix(rho).data).real, expected / numpy.sum(expected), atol=1e-6)
+
+
+def test_unsupported():
+    qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(1)
+    cr = qiskit.ClassicalRegister(1)
+    circuit = c2qa.CVCircuit(qmr, qr, cr)
+    circuit.measure(qr[0], cr[0])
+
+    with pytest.raises(NotImplementedError):
+        c2qa.lindblad.simulate(circuit)
+    with pytest.raises(ValueError):
+        c2qa.lindblad.LindbladSimulator(circuit, photon_loss_rate=[1, 1])
@@ -0,0 +1,83 @@
+import c2qa
+import c2qa.mps
+import numpy
+import pytest
+import qiskit
+from qiskit.quantum_info import DensityMatrix, partial_trace
+
+
+def create_circuit():
+    qmr = c2qa.QumodeRegister(3, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(2)
+    circuit = c2qa.CVCircuit(qmr, qr)
+
+    circuit.cv_initialize(1, qmr[0])
+    circuit.cv_initialize(2, qmr[2])
+    circuit.h(qr[0])
+    circuit.cv_d(0.3, qmr[1])
+    circuit.cv_bs(0.4 + 0.2j, qmr[0], qmr[1])
+    circuit.cv_cpbs(0.7, qmr[1], qmr[2], qr[0])
+    circuit.cv_cd(0.2, 0.1, qmr[2], qr[1])
+    circuit.cx(qr[0], qr[1])
+    circuit.cv_rh1(0.3, qmr[0], qmr[1], qr[0])
+
+    return circuit, qmr, qr
+
+
+def test_statevector(capsys):
+    with capsys.disabled():
+        circuit, _, _ = create_circuit()
+
+        state, result = c2qa.util.simulate(circuit, method="mps")
+        native_state, _ = c2qa.util.simulate(circuit, method="native")
+
+        # The MPS is only contracted to a dense state vector on request
+        assert isinstance(state, c2qa.mps.MPSState)
+        assert result.success
+        assert result.backend_name == "c2qa_mps"
+        assert numpy.allclose(state.statevector().data, native_state.data)
+
+
+def test_occupations_and_reduced_density_matrix():
+    circuit, qmr, qr = create_circuit()
+
+    # Place the ancilla qubits between the qumodes they couple
+    state = c2qa.mps.simulate(circuit, sites=[qmr[0], qr[0], qmr[1], qmr[2], qr[1]])
+    full = DensityMatrix(c2qa.util.simulate(circuit, method="native", qubit_encoded=False)[0])
+
+    # Qiskit subsystems are the circuit's qumodes, then qubits
+    photons = numpy.arange(4)
+    for index in range(3):
+        reduced = partial_trace(full, [other for other in range(5) if other != index])
+        assert numpy.isclose(state.occupations()[index], numpy.real(numpy.trace(reduced.data @ numpy.diag(photons))))
+
+    reduced = partial_trace(full, [0, 1, 4])
+    assert numpy.allclose(state.reduced_density_matrix([qmr[2], qr[0]]).data, reduced.data)
+
+
+def test_truncation():
+    qmr = c2qa.QumodeRegister(8, num_qubits_per_qumode=2)
+    circuit = c2qa.CVCircuit(qmr)
+    for index in range(0, 8, 2):
+        circuit.cv_initialize(2, qmr[index])
+    for layer in range(4):
+        for index in range(layer % 2, 7, 2):
+            circuit.cv_bs(0.5 + 0.2j, qmr[index], qmr[index + 1])
+
+    exact = c2qa.mps.simulate(circuit)
+    truncated = c2qa.mps.simulate(circuit, max_bond_dimension=4)
+
+    assert exact.truncation_error < 1e-10
+    assert max(truncated.bond_dimensions()) <= 4
+    assert 0 < truncated.truncation_error < 1
+    # Truncation renormalizes the state
+    assert numpy.isclose(numpy.sum(truncated.occupations()), 8)
+    assert numpy.allclose(exact.occupations(), truncated.occupations(), atol=0.5)
+
+
+def test_unsupported():
+    circuit, qmr, _ = create_circuit()
+    circuit.cv_initialize(1, qmr[0])
+
+    with pytest.raises(NotImplementedError):
+        c2qa.mps.simulate(circuit)
@@ -0,0 +1,202 @@
+import c2qa
+import c2qa.fusion
+import numpy
+import pytest
+import qiskit
+
+
+def create_circuit(qumodes_first: bool = True):
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(2)
+    cr = qiskit.ClassicalRegister(2)
+    registers = [qmr, qr] if qumodes_first else [qr, qmr]
+    circuit = c2qa.CVCircuit(*registers, cr)
+
+    circuit.cv_initialize(1, qmr[0])
+    circuit.h(qr[0])
+    circuit.cv_d(0.5, qmr[0])
+    circuit.cv_cd(0.2, -0.3, qmr[1], qr[0])
+    circuit.cv_bs(0.4, qmr[0], qmr[1])
+    circuit.cv_cnd_d(0.3, -0.1, qr[0], qmr[0])
+    circuit.cx(qr[0], qr[1])
+    circuit.x(qmr[0][1])  # Gate on a single qubit of a qumode
+    circuit.cv_snap(0.3, 1, qmr[1])
+
+    return circuit, qmr, qr, cr
+
+
+@pytest.mark.parametrize("qumodes_first", [True, False])
+def test_statevector(capsys, qumodes_first):
+    with capsys.disabled():
+        circuit, _, _, _ = create_circuit(qumodes_first)
+
+        state, result = c2qa.util.simulate(circuit)
+        native_state, native_result = c2qa.util.simulate(circuit, method="native")
+
+        assert native_result.success
+        assert numpy.allclose(state.data, native_state.data)
+        assert numpy.allclose(native_result.get_statevector(circuit).data, native_state.data)
+
+
+def test_fusion(capsys):
+    with capsys.disabled():
+        circuit, _, _, _ = create_circuit()
+
+        state, _ = c2qa.util.simulate(circuit, method="native")
+        fused_state, _ = c2qa.util.simulate(circuit, method="native", fusion_pass=c2qa.fusion.CVGateFusionPass())
+
+        assert numpy.allclose(state.data, fused_state.data)
+
+
+def test_krylov(capsys):
+    with capsys.disabled():
+        circuit, _, _, _ = create_circuit()
+
+        state, _ = c2qa.util.simulate(circuit, method="native")
+        krylov_state, _ = c2qa.util.simulate(circuit, method="native", krylov=True)
+
+        assert numpy.allclose(state.data, krylov_state.data)
+
+
+def test_counts(capsys):
+    with capsys.disabled():
+        circuit, _, qr, cr = create_circuit()
+        circuit.measure(qr, cr)
+
+        _, result = c2qa.util.simulate(circuit, method="native", shots=1000, seed=1234)
+        counts = result.get_counts(circuit)
+
+        # CX entangles the qubits, both measure the same value with equal probability
+        assert set(counts.keys()) == {"00", "11"}
+        assert sum(counts.values()) == 1000
+        assert abs(counts["00"] - 500) < 100
+
+
+def test_mid_circuit_measurement(capsys):
+    with capsys.disabled():
+        qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+        qr = qiskit.QuantumRegister(1)
+        cr = qiskit.ClassicalRegister(1)
+        circuit = c2qa.CVCircuit(qmr, qr, cr)
+
+        circuit.h(qr[0])
+        circuit.measure(qr[0], cr[0])
+        circuit.cv_d(0.5, qmr[0]).c_if(cr, 1)
+
+        states, result = c2qa.util.simulate(circuit, method="native", shots=100, conditional_state_vector=True, seed=1234)
+
+        assert sum(result.get_counts(circuit).values()) == 100
+        # Qubit measured 0 leaves the vacuum, qubit measured 1 displaces the qumode (qubit is the index's high bit)
+        assert numpy.isclose(abs(states["0x0"].data[0]), 1)
+        assert numpy.isclose(numpy.linalg.norm(states["0x1"].data[4:]), 1)
+        assert abs(states["0x1"].data[4]) < 0.99
+
+
+def test_initialize_entangled(capsys):
+    with capsys.disabled():
+        qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=1)
+        qr = qiskit.QuantumRegister(1)
+        cr = qiskit.ClassicalRegister(1)
+        circuit = c2qa.CVCircuit(qmr, qr, cr)
+
+        circuit.h(qr[0])
+        circuit.cx(qr[0], qmr[0][0])
+        circuit.initialize([1, 0], qr[0])  # Resets the entangled qubit, collapsing the qumode in each shot
+        circuit.measure(qmr[0][0], cr[0])
+
+        _, result = c2qa.util.simulate(circuit, method="native", shots=1000, seed=1234)
+
+        counts = result.get_counts(circuit)
+        assert sum(counts.values()) == 1000
+        assert 400 < counts.get("1", 0) < 600
+
+
+def test_noise_unsupported():
+    circuit, _, _, _ = create_circuit()
+
+    with pytest.raises(ValueError):
+        c2qa.util.simulate(circuit, method="native", noise_pass=lambda circuit: circuit)
+
+
+def test_cutoff_not_power_of_two(capsys):
+    with capsys.disabled():
+        qmr = c2qa.QumodeRegister(2, cutoff=5)
+        qr = qiskit.QuantumRegister(1)
+        circuit = c2qa.CVCircuit(qmr, qr)
+
+        circuit.cv_initialize(1, qmr[0])
+        circuit.cv_d(0.4, qmr[1])
+        circuit.cv_bs(0.3, qmr[0], qmr[1])
+        circuit.cv_cd(0.2, -0.2, qmr[1], qr[0])
+
+        state, _ = c2qa.util.simulate(circuit, method="native", qubit_encoded=False)
+
+        # Subsystems are (qumode 0, qumode 1, qubit), least significant first
+        ops = circuit.ops
+        identity = numpy.eye(5)
+        expected = numpy.zeros(50)
+        expected[1] = 1
+        expected = numpy.kron(numpy.eye(2), numpy.kron(ops.d(0.4).toarray(), identity)) @ expected
+        expected = numpy.kron(numpy.eye(2), ops.bs(0.3).toarray()) @ expected
+        expected = numpy.kron(ops.cd(0.2, -0.2).toarray(), identity) @ expected
+
+        assert qmr.num_qubits_per_qumode == 3
+        assert state.dims() == (5, 5, 2)
+        assert numpy.allclose(state.data, expected)
+
+        # Qubit-encoded state vector pads each qumode from 5 to 8 Fock states
+        encoded, _ = c2qa.util.simulate(circuit, method="native")
+        padded = numpy.zeros((2, 8, 8), dtype=complex)
+        padded[:, :5, :5] = expected.reshape(2, 5, 5)
+        assert numpy.allclose(encoded.data, padded.reshape(-1))
+
+        with pytest.raises(ValueError):
+            c2qa.util.simulate(circuit)
+
+
+def test_session(capsys):
+    with capsys.disabled():
+        circuit, qmr, qr, _ = create_circuit()
+        session = c2qa.native.SimulationSession(circuit)
+
+        state, result = session.run()
+        expected, _ = c2qa.util.simulate(circuit, method="native")
+        assert result.success
+        assert numpy.allclose(state.data, expected.data)
+
+        # Only the appended instructions are simulated by the next run
+        applied = session.applied
+        circuit.cv_bs(0.2, qmr[1], qmr[0])
+        circuit.h(qr[1])
+        state, _ = session.run()
+        expected, _ = c2qa.util.simulate(circuit, method="native")
+        assert session.applied == applied + 2
+        assert numpy.allclose(state.data, expected.data)
+
+
+def test_session_checkpoint(capsys, tmp_path):
+    with capsys.disabled():
+        checkpoint = str(tmp_path / "session.npz")
+
+        circuit, qmr, _, _ = create_circuit()
+        c2qa.native.SimulationSession(circuit, checkpoint=checkpoint).run()
+
+        # A new session resumes from the checkpoint instead of simulating the circuit again
+        circuit.cv_r(0.4, qmr[0])
+        session = c2qa.native.SimulationSession(circuit, checkpoint=checkpoint)
+        assert session.applied == len(circuit.data) - 1
+        state, _ = session.run()
+        expected, _ = c2qa.util.simulate(circuit, method="native")
+        assert numpy.allclose(state.data, expected.data)
+
+        other, _, _, _ = create_circuit()
+        other.data.pop()
+        with pytest.raises(ValueError):
+            c2qa.native.SimulationSession(other, checkpoint=checkpoint)
+
+        # Same instruction names, but a different parameter or qumode
+        for qumode, phi in ((0, 0.5), (1, 0.4)):
+            other, qmr, _, _ = create_circuit()
+            other.cv_r(phi, qmr[qumode])
+            with pytest.raises(ValueError):
+                c2qa.native.SimulationSession(other, checkpoint=checkpoint)
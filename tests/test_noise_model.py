@@ -1,3 +1,4 @@
+import math
 import pytest
 import random
 
@@ -6,6 +7,7 @@ import c2qa
 import numpy as np
 import qiskit
 from qiskit.transpiler import PassManager
+import scipy.sparse.linalg
 
 
 def test_noise_model(capsys):
@@ -84,6 +86,113 @@ def test_kraus_operators(capsys):
         assert kraus.is_cptp(), "Is not CPTP"
 
 
+def test_kraus_closed_form():
+    cutoff = 8
+    photon_loss_rate = 0.3
+    time = 2.0
+    operators = c2qa.kraus.photon_loss_kraus(photon_loss_rate, time, cutoff)
+
+    # Equation 44 from Bosonic Operations and Measurements, Girvin
+    ops = c2qa.operators.CVOperators(cutoff)
+    decay = scipy.sparse.linalg.expm(-1 * (photon_loss_rate / 2) * time * ops.N.tocsc()).toarray()
+    for photons in range(cutoff):
+        expected = math.sqrt((1 - math.exp(-photon_loss_rate * time)) ** photons / math.factorial(photons))
+        expected = expected * decay @ np.linalg.matrix_power(ops.a.toarray(), photons)
+        assert np.allclose(operators[photons], expected)
+
+    # Memoized by (rate, time, cutoff)
+    assert c2qa.kraus.photon_loss_kraus(photon_loss_rate, time, cutoff) is operators
+    assert c2qa.kraus.photon_loss_kraus(photon_loss_rate, time, cutoff + 1) is not operators
+
+
+def test_kraus_tolerance():
+    cutoff = 16
+    photon_loss_rate = 1e6
+    time = 100e-9
+    operators = c2qa.kraus.photon_loss_kraus(photon_loss_rate, time, cutoff, tolerance=1e-6)
+
+    assert 1 < len(operators) < cutoff
+    # Renormalized to a CPTP channel
+    assert np.allclose(sum(operator.T @ operator for operator in operators), np.eye(cutoff))
+    # Kept operators still lose 0, 1, ... photons
+    full = c2qa.kraus.photon_loss_kraus(photon_loss_rate, time, cutoff)
+    assert np.allclose(operators[1][0, 1], full[1][0, 1])
+    assert np.allclose(operators, full[:len(operators)], atol=1e-3)
+
+
+def test_photon_loss_pass_shared_error():
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=2)
+    circuit = c2qa.CVCircuit(qmr)
+    circuit.cv_r(0.3, qmr[0])
+    circuit.cv_d(0.5, qmr[1])
+    circuit.cv_bs(0.2, qmr[0], qmr[1])
+
+    noise_pass = c2qa.kraus.PhotonLossNoisePass(1e6, circuit)
+    noise = [
+        noise_pass._photon_loss_error(inst, [circuit.find_bit(qubit).index for qubit in qargs])
+        for inst, qargs, _ in circuit.data
+    ]
+
+    # Same 100ns loss channel on every qumode
+    assert len(noise_pass._errors) == 1
+    assert [len(noise_circuit.data) for noise_circuit in noise] == [1, 1, 2]
+    assert noise_pass._photon_loss_error(circuit.data[0][0], [0, 1]) is noise[0]
+
+
+def test_photon_loss_pass_per_qumode():
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=2)
+    qmr_large = c2qa.QumodeRegister(1, num_qubits_per_qumode=3)
+    qr = qiskit.QuantumRegister(1)
+    circuit = c2qa.CVCircuit(qmr, qmr_large, qr)
+    circuit.cv_bs(0.2, qmr[1], qmr[0])
+    circuit.cv_cd(0.5, -0.5, qmr_large[0], qr[0])
+    circuit.delay(100, qr[0], unit="ns")
+    circuit.cv_r(0.3, qmr[0])
+
+    noise_pass = c2qa.kraus.PhotonLossNoisePass([1e6, 2e6, 0], circuit)
+    qubits = [[circuit.find_bit(qubit).index for qubit in qargs] for _, qargs, _ in circuit.data]
+    noise = [noise_pass._photon_loss_error(inst, indices) for (inst, _, _), indices in zip(circuit.data, qubits)]
+
+    # Loss on each qumode of the beam splitter, sized by its cutoff, on its operand positions
+    expected = qiskit.quantum_info.Kraus(list(c2qa.kraus.photon_loss_kraus(1e6, 100e-9, 4)))
+    expected = expected.tensor(qiskit.quantum_info.Kraus(list(c2qa.kraus.photon_loss_kraus(2e6, 100e-9, 4))))
+    assert qiskit.quantum_info.SuperOp(noise[0]) == qiskit.quantum_info.SuperOp(expected)
+
+    # No loss on the lossless qumode, the ancilla or the idle qumodes
+    assert noise[1] is None
+    assert noise[2] is None
+    assert [len(noise_circuit.data) for noise_circuit in (noise[0], noise[3])] == [2, 1]
+
+    with pytest.raises(ValueError):
+        c2qa.kraus.PhotonLossNoisePass([1e6, 1e6], circuit)
+
+
+def test_photon_loss_pass_fuse():
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(1)
+    circuit = c2qa.CVCircuit(qmr, qr)
+    circuit.cv_d(0.5, qmr[0])
+    circuit.cv_bs(0.3, qmr[0], qmr[1])
+    circuit.cv_d(0, qmr[1])
+    circuit.cv_d(0, qmr[1])
+    circuit.cv_cd(0.2, -0.2, qmr[0], qr[0])
+    circuit.h(qr[0])
+
+    noisy = c2qa.kraus.PhotonLossNoisePass([1e6, 2e6], circuit)(circuit)
+    fused_pass = c2qa.kraus.PhotonLossNoisePass([1e6, 2e6], circuit, fuse=True)
+    fused = fused_pass(circuit)
+
+    assert qiskit.quantum_info.SuperOp(fused) == qiskit.quantum_info.SuperOp(noisy)
+    # One channel per unitary, the two identity displacements' loss merged into one channel
+    assert len(fused.data) == 5
+    assert len(noisy.data) == 12
+    assert any(np.isclose(loss, 0.4) for loss, _ in fused_pass._errors)
+    # The merged loss channel is identified by its label
+    labels = [inst.label for inst, _, _ in fused.data if inst.label in fused_pass._losses]
+    assert len(labels) == 1
+    assert np.isclose(fused_pass._losses[labels[0]][0], 0.4)
+
+
 @pytest.mark.skip(reason="GitHub actions build environments do not have ffmpeg")
 def test_photon_loss_pass_no_displacement(capsys):
     with capsys.disabled():
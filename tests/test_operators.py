@@ -1,6 +1,11 @@
+import pickle
 import random
 
-from c2qa.operators import CVOperators
+import pytest
+import scipy.sparse
+import scipy.sparse.linalg
+
+from c2qa.operators import CVOperators, diagonal
 import numpy
 
 
@@ -128,3 +133,265 @@ class TestMatrices:
         rand = self.ops.s2(random.random())
 
         assert not allclose(one, rand)
+
+
+class TestClosedForm:
+    """Verify the closed-form engine matches scipy.sparse.linalg.expm"""
+
+    def setup_method(self, method):
+        self.ops = CVOperators(cutoff=16, num_qumodes=2)
+        self.ops_expm = CVOperators(cutoff=16, num_qumodes=2, use_expm=True)
+
+    def test_d(self):
+        alpha = complex(random.random(), random.random())
+        assert allclose(self.ops.d(alpha), self.ops_expm.d(alpha))
+
+    def test_cd(self):
+        alpha = complex(random.random(), random.random())
+        beta = complex(random.random(), random.random())
+        assert allclose(self.ops.cd(alpha, beta), self.ops_expm.cd(alpha, beta))
+        assert allclose(self.ops.cd(alpha), self.ops_expm.cd(alpha))
+
+    def test_ecd(self):
+        alpha = complex(random.random(), random.random())
+        assert allclose(self.ops.ecd(alpha), self.ops_expm.ecd(alpha))
+
+    def test_s(self):
+        zeta = complex(random.random(), random.random())
+        assert allclose(self.ops.s(zeta), self.ops_expm.s(zeta))
+
+    def test_odd_cutoff(self):
+        ops = CVOperators(cutoff=5, num_qumodes=1)
+        ops_expm = CVOperators(cutoff=5, num_qumodes=1, use_expm=True)
+
+        assert allclose(ops.d(-1.5j), ops_expm.d(-1.5j))
+        assert allclose(ops.s(0.5), ops_expm.s(0.5))
+
+
+class TestBatch:
+    """Verify batch operators match the single parameter operators"""
+
+    def setup_method(self, method):
+        self.ops = CVOperators(cutoff=8, num_qumodes=1)
+        self.params = numpy.array([complex(random.random(), random.random()) for _ in range(5)])
+
+    def assert_batch(self, batch, op, params):
+        assert batch.shape[0] == len(params)
+        for index, param in enumerate(params):
+            assert allclose(batch[index], op(param))
+
+    def test_d_batch(self):
+        self.assert_batch(self.ops.d_batch(self.params), self.ops.d, self.params)
+
+    def test_cd_batch(self):
+        self.assert_batch(self.ops.cd_batch(self.params), self.ops.cd, self.params)
+
+    def test_ecd_batch(self):
+        self.assert_batch(self.ops.ecd_batch(self.params), self.ops.ecd, self.params)
+
+    def test_s_batch(self):
+        self.assert_batch(self.ops.s_batch(self.params), self.ops.s, self.params)
+
+    def test_r_batch(self):
+        thetas = self.params.real
+        self.assert_batch(self.ops.r_batch(thetas), self.ops.r, thetas)
+
+    def test_bs_batch(self):
+        ops = CVOperators(cutoff=4, num_qumodes=2)
+        self.assert_batch(ops.bs_batch(self.params), ops.bs, self.params)
+
+    def test_s2_batch(self):
+        ops = CVOperators(cutoff=4, num_qumodes=2)
+        self.assert_batch(ops.s2_batch(self.params), ops.s2, self.params)
+
+    def test_not_1d(self):
+        with pytest.raises(ValueError):
+            self.ops.d_batch(numpy.ones((2, 2)))
+
+    def test_cd_batch_lengths(self):
+        with pytest.raises(ValueError):
+            self.ops.cd_batch(self.params, self.params[:2])
+
+
+class TestSpectral:
+    """Verify the cached spectral decompositions match scipy.sparse.linalg.expm"""
+
+    def setup_method(self, method):
+        self.ops = CVOperators(cutoff=4, num_qumodes=2)
+        self.ops_expm = CVOperators(cutoff=4, num_qumodes=2, use_expm=True)
+
+    def assert_expm(self, name, *params):
+        assert allclose(getattr(self.ops, name)(*params), getattr(self.ops_expm, name)(*params))
+
+    def test_bs(self):
+        self.assert_expm("bs", random.random())
+        self.assert_expm("bs", complex(random.random(), random.random()))
+
+    def test_s2(self):
+        self.assert_expm("s2", random.random())
+        self.assert_expm("s2", complex(random.random(), random.random()))
+
+    def test_controlled_beamsplitters(self):
+        for name in ["rh1", "rh2", "cpbs", "cpbs_z2vqe"]:
+            self.assert_expm(name, random.random())
+
+    def test_cavity_rotations(self):
+        for name in ["qubitDependentCavityRotation", "qubitDependentCavityRotationX", "qubitDependentCavityRotationY", "controlledparity"]:
+            self.assert_expm(name, random.random())
+
+    def test_eswap(self):
+        self.assert_expm("eswap", random.random())
+
+    def test_schwinger(self):
+        self.assert_expm("schwinger_U4", random.random())
+        self.assert_expm("schwinger_U5", random.random())
+
+    def test_spectrum_reused(self):
+        self.ops.bs(random.random())
+        spectrum = self.ops.spectrum("bs", None)
+        self.ops.bs(random.random())
+
+        assert self.ops.spectrum("bs", None) is spectrum
+
+
+class TestGenerators:
+    """Verify the exponentials of the gate generators match the operators"""
+
+    def setup_method(self, method):
+        self.ops = CVOperators(cutoff=4, num_qumodes=2)
+
+    def assert_generator(self, name, *params):
+        generator = getattr(self.ops, f"{name}_generator")(*params)
+        assert allclose(scipy.sparse.linalg.expm(scipy.sparse.csc_matrix(generator)), getattr(self.ops, name)(*params))
+
+    def test_single_qumode(self):
+        for name in ["d", "s", "ecd", "cd"]:
+            self.assert_generator(name, complex(random.random(), random.random()))
+        for name in ["r", "qubitDependentCavityRotation", "qubitDependentCavityRotationX", "qubitDependentCavityRotationY", "controlledparity"]:
+            self.assert_generator(name, random.random())
+        self.assert_generator("snap", random.random(), 2)
+
+    def test_two_qumodes(self):
+        for name in ["bs", "s2"]:
+            self.assert_generator(name, complex(random.random(), random.random()))
+        for name in ["rh1", "rh2", "cpbs", "cpbs_z2vqe", "eswap", "schwinger_U4", "schwinger_U5"]:
+            self.assert_generator(name, random.random())
+
+
+class TestMixedCutoffs:
+    """Verify two-qumode operators with a different cutoff for each qumode"""
+
+    def setup_method(self, method):
+        self.ops = CVOperators(cutoff=4, second_cutoff=3)
+        self.ops_expm = CVOperators(cutoff=4, use_expm=True, second_cutoff=3)
+
+    def test_two_qumode_operators(self):
+        for name in ["bs", "s2", "rh1", "rh2", "cpbs", "schwinger_U4", "schwinger_U5"]:
+            param = random.random()
+            op = getattr(self.ops, name)(param)
+            assert op.shape[0] % 12 == 0
+            assert allclose(op, getattr(self.ops_expm, name)(param))
+
+    def test_number_operators(self):
+        assert allclose(self.ops.a1_dag @ self.ops.a1, scipy.sparse.diags(self.ops.n1))
+        assert allclose(self.ops.a2_dag @ self.ops.a2, scipy.sparse.diags(self.ops.n2))
+
+    def test_shared(self):
+        assert CVOperators.shared(cutoff=4, second_cutoff=4) is CVOperators.shared(cutoff=4)
+        assert CVOperators.shared(cutoff=4, second_cutoff=3) is not CVOperators.shared(cutoff=3, second_cutoff=4)
+
+    def test_swap_requires_equal_cutoffs(self):
+        with pytest.raises(ValueError):
+            self.ops.eswap(random.random())
+
+
+class TestDiagonal:
+    """Verify diagonal operators are built as diagonal matrices"""
+
+    def setup_method(self, method):
+        self.ops = CVOperators(cutoff=4, num_qumodes=2)
+        self.ops_expm = CVOperators(cutoff=4, num_qumodes=2, use_expm=True)
+
+    def test_diagonal_operators(self):
+        for name, params in [
+            ("r", [random.random()]),
+            ("snap", [random.random(), 2]),
+            ("qubitDependentCavityRotation", [random.random()]),
+            ("controlledparity", [random.random()]),
+        ]:
+            op = getattr(self.ops, name)(*params)
+
+            assert diagonal(op) is not None
+            assert allclose(op, getattr(self.ops_expm, name)(*params))
+
+    def test_non_diagonal(self):
+        assert diagonal(self.ops.d(random.random())) is None
+        assert diagonal(numpy.ones((2, 2))) is None
+        assert allclose(diagonal(numpy.diag([1, 1j])), [1, 1j])
+
+
+class TestControlled:
+    """Verify qubit-controlled operators are assembled from their cutoff-sized blocks"""
+
+    def setup_method(self, method):
+        self.ops = CVOperators(cutoff=4, num_qumodes=2)
+        self.ops_expm = CVOperators(cutoff=4, num_qumodes=2, use_expm=True)
+
+    def test_conditional_displacements(self):
+        alpha = complex(random.random(), random.random())
+        beta = complex(random.random(), random.random())
+
+        assert allclose(self.ops.cd(alpha, beta), self.ops_expm.cd(alpha, beta))
+        assert allclose(self.ops.ecd(alpha), self.ops_expm.ecd(alpha))
+
+    def test_block_spectrum(self):
+        self.ops.rh1(random.random())
+
+        # Beam splitter blocks only couple Fock states with equal total photon number
+        blocks = self.ops.spectrum("rh1", None).blocks
+        assert len(blocks) == 7
+        assert max(len(indices) for indices, _ in blocks) == 4
+
+    def test_controlled(self):
+        op_0 = self.ops.d(random.random())
+        op_1 = self.ops.d(random.random())
+
+        expected = numpy.kron([[1, 0], [0, 0]], op_0.toarray()) + numpy.kron([[0, 0], [0, 1]], op_1.toarray())
+        assert allclose(self.ops.controlled(op_0, op_1), expected)
+        # Dense blocks are copied straight into the CSC arrays
+        assert allclose(self.ops.controlled(op_0.toarray(), op_1.toarray()), expected)
+
+
+class TestShared:
+    """Verify lazy attributes and the shared CVOperators registry"""
+
+    def test_shared(self):
+        ops = CVOperators.shared(cutoff=4)
+
+        assert CVOperators.shared(cutoff=4) is ops
+        assert CVOperators.shared(cutoff=8) is not ops
+        assert CVOperators.shared(cutoff=4, use_expm=True) is not ops
+
+    def test_pickle(self):
+        ops = CVOperators.shared(cutoff=4)
+
+        assert pickle.loads(pickle.dumps(ops)) is ops
+        assert pickle.loads(pickle.dumps(ops.d)).__self__ is ops
+
+    def test_lazy(self):
+        ops = CVOperators(cutoff=4)
+        assert "mat" not in vars(ops)
+
+        ops.mat
+        assert "sparse_mat" in vars(ops)
+        assert "a1" not in vars(ops)
+
+    def test_swap(self):
+        ops = CVOperators(cutoff=4)
+
+        # Every basis state |i>|j> is mapped to |j>|i>
+        for i in range(4):
+            for j in range(4):
+                assert ops.mat[i + (j * 4)][i * 4 + j] == 1
+        assert numpy.count_nonzero(ops.mat) == 16
+        assert allclose(ops.eswap(numpy.pi), 1j * ops.sparse_mat)
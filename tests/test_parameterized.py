@@ -1,3 +1,5 @@
+import pickle
+
 import c2qa
 import numpy
 import qiskit
@@ -96,4 +98,46 @@ def test_complex_parameters_float(capsys):
         minimal_circuit.cv_cd(1j*a,-1j*a,qmr[0],qbr[0])
 
         bound_circuit = minimal_circuit.bind_parameters({a: 2})
-        c2qa.util.simulate(bound_circuit)
\ No newline at end of file
+        c2qa.util.simulate(bound_circuit)
+
+
+def test_diagonal_definition(capsys):
+    with capsys.disabled():
+        theta = qiskit.circuit.Parameter("theta")
+
+        qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+        circuit = c2qa.CVCircuit(qmr)
+        circuit.cv_initialize(1, qmr[0])
+        circuit.cv_r(theta, qmr[0])
+        circuit.cv_d(1, qmr[0])
+
+        bound_circuit = circuit.bind_parameters({theta: 0.5})
+
+        definitions = [inst.definition.data[0][0].name for inst, _, _ in bound_circuit.data if inst.name in ["R", "D"]]
+        assert definitions == ["diagonal", "unitary"]
+
+        state, result = c2qa.util.simulate(bound_circuit)
+        assert result.success
+
+
+def test_matrix_cache(capsys):
+    with capsys.disabled():
+        alpha = qiskit.circuit.Parameter("alpha")
+
+        qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+        circuit = c2qa.CVCircuit(qmr)
+        circuit.cv_d(alpha, qmr[0])
+
+        bound = circuit.bind_parameters({alpha: 1})
+        gate = bound.data[0][0]
+        matrix = gate.to_matrix()
+
+        # Cached matrix is reused by copies (and pickled copies) of the gate
+        assert gate.to_matrix() is matrix
+        assert gate.copy().to_matrix() is matrix
+        assert numpy.allclose(pickle.loads(pickle.dumps(gate)).to_matrix(), matrix)
+
+        # Rebinding to a different value rebuilds the matrix
+        rebound = circuit.bind_parameters({alpha: 2})
+        assert not numpy.allclose(rebound.data[0][0].to_matrix(), matrix)
+        assert numpy.allclose(rebound.data[0][0].to_matrix(), circuit.ops.d(2).toarray())
@@ -1,4 +1,5 @@
 import c2qa
+import pytest
 
 
 def test_qumode_iterate(capsys):
@@ -15,3 +16,15 @@ def test_qumode_iterate(capsys):
             assert len(qumode) == num_qubits_per_qumode
 
         assert index == num_qumodes
+
+
+def test_cutoff():
+    qmr = c2qa.QumodeRegister(2, cutoff=20)
+    assert qmr.cutoff == 20
+    assert qmr.num_qubits_per_qumode == 5
+    assert qmr.size == 10
+
+    assert c2qa.QumodeRegister(1, 3).cutoff == 8
+
+    with pytest.raises(ValueError):
+        c2qa.QumodeRegister(1, num_qubits_per_qumode=2, cutoff=5)
@@ -0,0 +1,76 @@
+import c2qa
+import c2qa.sector
+import numpy
+import pytest
+import qiskit
+
+
+def create_circuit():
+    qmr = c2qa.QumodeRegister(3, num_qubits_per_qumode=2)
+    qr = qiskit.QuantumRegister(2)
+    circuit = c2qa.CVCircuit(qr, qmr)
+
+    circuit.cv_initialize(1, qmr[0])
+    circuit.cv_initialize(2, qmr[2])
+    circuit.h(qr[0])
+    circuit.cv_bs(0.4 + 0.2j, qmr[0], qmr[1])
+    circuit.cv_r(0.3, qmr[2])
+    circuit.cv_cp(0.5, qmr[1], qr[0])
+    circuit.cv_cpbs(0.7, qmr[1], qmr[2], qr[0])
+    circuit.cx(qr[0], qr[1])
+    circuit.cv_snap(0.3, 1, qmr[1])
+    circuit.cv_cnd_bs(0.2, 0.3, qr[1], qmr[0], qmr[2])
+
+    return circuit, qmr, qr
+
+
+def test_photon_sector():
+    sector = c2qa.sector.PhotonSector([3, 4, 2], 3)
+    occupations = sector.occupations()
+
+    # Every Fock state below the cutoffs holding 3 photons, ranked in lexicographic order
+    expected = [state for state in numpy.ndindex(3, 4, 2) if sum(state) == 3]
+    assert sector.size == len(expected)
+    assert occupations.tolist() == [list(state) for state in expected]
+    assert numpy.array_equal(sector.rank(occupations), numpy.arange(sector.size))
+
+
+def test_statevector(capsys):
+    with capsys.disabled():
+        circuit, _, _ = create_circuit()
+        assert c2qa.sector.conserves_photon_number(circuit)
+
+        state, result = c2qa.util.simulate(circuit, method="sector")
+        native_state, _ = c2qa.util.simulate(circuit, method="native")
+
+        # The sector state is only expanded to the full state vector on request
+        assert isinstance(state, c2qa.sector.SectorState)
+        assert result.success
+        assert result.backend_name == "c2qa_sector"
+        assert numpy.allclose(state.statevector().data, native_state.data)
+
+        auto_state, result = c2qa.util.simulate(circuit, method="auto")
+        assert result.backend_name == "c2qa_sector"
+        assert numpy.allclose(auto_state.data, native_state.data)
+
+
+def test_photon_numbers():
+    circuit, _, _ = create_circuit()
+    state = c2qa.sector.simulate(circuit)
+
+    # 3 photons in 3 qumodes with cutoff 4
+    assert state.sector.size == 10
+    assert numpy.isclose(numpy.sum(state.probabilities()), 1)
+    assert numpy.isclose(numpy.sum(state.mean_photon_numbers()), 3)
+
+    distribution = state.photon_number_distribution(1)
+    assert numpy.isclose(distribution @ numpy.arange(4), state.mean_photon_numbers()[1])
+
+
+def test_not_conserved():
+    circuit, qmr, qr = create_circuit()
+    circuit.cv_cd(0.2, -0.2, qmr[0], qr[0])
+
+    assert not c2qa.sector.conserves_photon_number(circuit)
+    with pytest.raises(ValueError):
+        c2qa.sector.simulate(circuit)
@@ -0,0 +1,74 @@
+import c2qa
+import c2qa.trajectories
+from c2qa.evolution import Hamiltonian
+import numpy
+import pytest
+from qiskit.quantum_info import DensityMatrix
+
+
+def create_circuit():
+    qmr = c2qa.QumodeRegister(2, num_qubits_per_qumode=3)
+    circuit = c2qa.CVCircuit(qmr)
+    circuit.cv_initialize(3, qmr[0])
+    circuit.cv_r(0.3, qmr[0])  # 100ns gate, kappa * t = 0.1 at a 1e6 loss rate
+    circuit.cv_d(0.5, qmr[1])
+
+    observables = {f"n{index}": Hamiltonian(circuit).add(circuit.ops.N, qumode) for index, qumode in enumerate(qmr)}
+
+    return circuit, qmr, observables
+
+
+def test_photon_loss(capsys):
+    with capsys.disabled():
+        circuit, qmr, observables = create_circuit()
+        xvec = numpy.linspace(-3, 3, 11)
+
+        estimates = c2qa.trajectories.simulate(
+            circuit, [1e6, 0], trajectories=400, observables=observables, wigner_qumode=qmr[0], xvec=xvec, seed=1234
+        )
+
+        # Fock state 3 decays to a mixture of fewer photons, mean photon number 3 * exp(-kappa * t)
+        estimate = estimates["n0"]
+        assert estimate.trajectories == 400
+        assert 0 < estimate.error < 0.1
+        assert abs(estimate.mean - 3 * numpy.exp(-0.1)) < 2 * estimate.error
+
+        # No loss on the second qumode
+        assert numpy.isclose(estimates["n1"].mean, 0.25, atol=1e-3)
+        assert numpy.isclose(estimates["n1"].error, 0, atol=1e-6)
+
+        # Averaged Wigner function of the Kraus channel's mixed state
+        kraus = c2qa.kraus.calculate_kraus(1e6, 100e-9, circuit)
+        density_matrix = sum(operator[:, [3]] @ operator[:, [3]].conj().T for operator in kraus)
+        expected = c2qa.util.wigner(DensityMatrix(density_matrix), circuit.cutoff, xvec=xvec)
+        wigner = estimates["wigner"]
+        assert numpy.all(numpy.abs(wigner.mean - expected) <= 3 * wigner.error + 1e-3)
+
+
+def test_processes(capsys):
+    with capsys.disabled():
+        circuit, _, observables = create_circuit()
+
+        estimates = c2qa.trajectories.simulate(circuit, 1e6, trajectories=40, observables=observables, processes=2, seed=1)
+        assert estimates["n0"].trajectories == 40
+        assert estimates["n0"].lower < estimates["n0"].mean < estimates["n0"].upper
+
+
+def test_rates_per_qumode():
+    circuit, _, _ = create_circuit()
+
+    with pytest.raises(ValueError):
+        c2qa.trajectories.TrajectorySimulator(circuit, [1e6, 1e6, 1e6])
+
+
+def test_mixed_cutoffs():
+    qmr = c2qa.QumodeRegister(1, num_qubits_per_qumode=2)
+    qmr_large = c2qa.QumodeRegister(1, num_qubits_per_qumode=3)
+    circuit = c2qa.CVCircuit(qmr, qmr_large)
+    circuit.cv_initialize(5, qmr_large[0])
+    circuit.cv_r(0.3, qmr_large[0])
+
+    observables = {"n": Hamiltonian(circuit).add(circuit.get_ops(qmr_large[0]).N, qmr_large[0])}
+    estimate = c2qa.trajectories.simulate(circuit, 1e6, trajectories=200, observables=observables, seed=7)["n"]
+
+    assert abs(estimate.mean - 5 * numpy.exp(-0.1)) < 2 * estimate.error
@@ -27,6 +27,9 @@ def trotterise_Z2LGT(circuit, numberofmodes, numberofqubits, qmr, qbr, cutoff, N
     # stateop, _ = c2qa.util.simulate(circuit)
     # util.stateread(stateop, qbr.size, numberofmodes, cutoff)
 
+    # Simulate only the layers appended since the previous time step
+    session = c2qa.native.SimulationSession(circuit)
+
     # Trotterise. i*dt corresponds to the timestep i of length from the previous timestep dt.
     for i in range(N):
         print("dt+1", i*dt)
@@ -35,7 +38,7 @@ def trotterise_Z2LGT(circuit, numberofmodes, numberofqubits, qmr, qbr, cutoff, N
             eiht(circuit, qmr[j+1], qmr[j], qbr[j], m, g, dt)
         for j in range(1,numberofmodes-1,2):
             eiht(circuit, qmr[j+1], qmr[j], qbr[j], m, g, dt)
-        stateop, result = c2qa.util.simulate(circuit)
+        stateop, result = session.run()
         occupation = util.stateread(stateop, qbr.size, numberofmodes, 4)
         occs[0][i]=np.array(list(occupation[0]))
         occs[1][i]=np.array(list(occupation[1]))